@@ -17,37 +17,106 @@ def create_app(config_name: str = 'development'):
     Args:
         config_name: 'development' | 'production' | 'testing'
     """
-    app = Flask(__name__)
+    from app.core.startup import StartupTimer
+    timer = StartupTimer()
+
+    with timer.phase('flask'):
+        app = Flask(__name__)
+
+        # Serialización JSON con soporte nativo de fechas y Decimal
+        from app.core.json_provider import FastJSONProvider
+        app.json = FastJSONProvider(app)
 
     # -------- Configuración --------
     # Ejemplo: app/core/config.py define un dict 'config' con claves por entorno
-    from app.core.config import config
-    if config_name not in config:
-        # fallback seguro si llega 'default'
-        config_name = 'development'
-    app.config.from_object(config[config_name])
+    with timer.phase('config'):
+        from app.core.config import config
+        if config_name not in config:
+            # fallback seguro si llega 'default'
+            config_name = 'development'
+        app.config.from_object(config[config_name])
 
     # -------- Extensiones / DB --------
     # Ejemplo: app/core/database.py expone init_extensions(app) y db
-    from app.core.database import init_extensions
-    init_extensions(app)
+    with timer.phase('extensions'):
+        from app.core.database import init_extensions
+        init_extensions(app)
+
+    with timer.phase('components'):
+        # -------- Réplicas de lectura --------
+        from app.core.database import db
+        from app.core.replicas import init_replicas
+        init_replicas(app, db)
+
+        # -------- Caché de respuestas --------
+        from app.utils.cache import init_cache
+        init_cache(app)
+
+        # -------- Caché de usuarios autenticados --------
+        from app.utils.auth_cache import init_auth_cache
+        init_auth_cache(app)
+
+        # -------- Revocación de tokens --------
+        from app.utils.revocation import init_revocation
+        init_revocation(app)
+
+        # -------- Hashing de contraseñas --------
+        from app.core.hashing import init_password_hasher
+        init_password_hasher(app)
+
+        # -------- Escritura diferida de último acceso --------
+        from app.utils.last_access import init_last_access
+        init_last_access(app)
+
+        # -------- Cliente HTTP saliente --------
+        from app.utils.http_client import init_http_client
+        init_http_client(app)
+
+        # -------- Verificación local de ID tokens de Google --------
+        from app.utils.google_tokens import init_google_tokens
+        init_google_tokens(app)
+
+        # -------- Limitación de tasa --------
+        from app.utils.rate_limit import init_rate_limiter
+        init_rate_limiter(app)
+
+        # -------- Tiempos por petición (Server-Timing) --------
+        from app.core.request_timing import init_request_timing
+        init_request_timing(app, db)
 
     # -------- Blueprints --------
-    register_blueprints(app)
+    with timer.phase('blueprints'):
+        register_blueprints(app)
 
-    # -------- Errores --------
-    register_error_handlers(app)
+    # -------- Documentación (con FAST_STARTUP se construye al primer uso) --------
+    with timer.phase('docs'):
+        from app.core.docs import init_docs
+        init_docs(app)
 
-    # -------- DB init (opcional si usas migraciones) --------
-    try:
-        from app.core.database import db
-        with app.app_context():
-            db.create_all()
-            print("Base de datos inicializada")
-    except Exception as e:
-        # No fallar el arranque por esto si usas Alembic/Flask-Migrate
-        print(f"Advertencia: no se pudo inicializar la base de datos: {e}")
+    # -------- Proxy inverso (la IP real del cliente para límites y réplicas) --------
+    if app.config['PROXY_FIX_X_FOR'] or app.config['PROXY_FIX_X_PROTO']:
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(
+            app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'], x_proto=app.config['PROXY_FIX_X_PROTO']
+        )
 
+    # -------- Errores --------
+    with timer.phase('error_handlers'):
+        register_error_handlers(app)
+
+    # -------- DB init (solo sin migraciones: el esquema se gestiona con `flask db upgrade`) --------
+    if app.config['AUTO_CREATE_TABLES']:
+        with timer.phase('create_all'):
+            try:
+                from app.core.database import db
+                with app.app_context():
+                    db.create_all()
+                    print("Base de datos inicializada")
+            except Exception as e:
+                # No fallar el arranque por esto si usas Alembic/Flask-Migrate
+                print(f"Advertencia: no se pudo inicializar la base de datos: {e}")
+
+    timer.finish(app)
     return app
 
 
@@ -79,6 +148,15 @@ def register_blueprints(app: Flask) -> None:
             'version': '1.0.0'
         })
 
+    # Métricas internas (caché, etc.)
+    from app.utils.decorators import require_role
+    from app.utils.metrics import collect_metrics
+
+    @app.get('/metrics')
+    @require_role('admin')
+    def metrics():
+        return jsonify(collect_metrics())
+
     # Ruta raíz
     @app.get('/')
     def index():
@@ -2,14 +2,32 @@
 API endpoints para gestión de personas
 """
 
-from flask import Blueprint, request
-from flasgger import swag_from
+import csv
+import io
+from flask import Blueprint, Response, request, current_app
+from app.core.docs import swag_from
+from marshmallow import ValidationError
 from datetime import datetime
+from sqlalchemy import select, any_, bindparam
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.exc import IntegrityError
 
-from app.core.database import db
+from app.core.database import db, is_unique_violation
+from app.core.replicas import read_engine
 from app.models import PersonaBase
-from app.schemas import PersonaCreateSchema, PersonaUpdateSchema
-from app.utils import success_response, error_response, validate_json, validation_error_response
+from app.models.serializers import get_serializer
+from app.schemas import PersonaCreateSchema, PersonaUpdateSchema, PersonaBatchSchema
+from app.utils import (
+    success_response, error_response, validate_json, validation_error_response,
+    encode_cursor, decode_cursor, InvalidCursorError, count_rows, COUNT_STRATEGIES,
+    parse_fields, fields_options, InvalidFieldsError, read_only
+)
+from app.utils.conditional import (
+    resource_etag, collection_etag, parse_resource_versions, timestamp_from_version,
+    is_not_modified, not_modified_response, with_validators
+)
+from app.utils.cache import cached_response, invalidate
+from app.utils.bulk import detect_format, iter_rows, chunked, upsert_rows, InvalidRowError
 
 # Crear Blueprint para personas
 personas_bp = Blueprint('personas', __name__, url_prefix='/api/personas')
@@ -26,10 +44,16 @@ def parse_date(date_string):
 
 
 @personas_bp.route('/', methods=['GET'])
+@read_only
+@cached_response(tags=lambda: ('personas:lista',))
 @swag_from({
     'tags': ['Personas'],
     'summary': 'Listar todas las personas',
-    'description': 'Obtiene una lista paginada de todas las personas registradas en el sistema',
+    'description': (
+        'Obtiene una lista paginada de todas las personas registradas en el sistema. '
+        'Si se envía el parámetro cursor (vacío para la primera página) se usa paginación '
+        'por cursor ordenada por CI, que no degrada en páginas profundas.'
+    ),
     'parameters': [
         {
             'name': 'page',
@@ -50,6 +74,28 @@ def parse_date(date_string):
             'in': 'query',
             'type': 'boolean',
             'description': 'Filtrar por estado activo'
+        },
+        {
+            'name': 'cursor',
+            'in': 'query',
+            'type': 'string',
+            'description': 'Cursor opaco devuelto como next_cursor por la página anterior'
+        },
+        {
+            'name': 'count',
+            'in': 'query',
+            'type': 'string',
+            'enum': ['exact', 'estimated', 'none'],
+            'description': (
+                'Estrategia para el total: exact (COUNT, por defecto en modo página), '
+                'estimated (estimación del planificador) o none (por defecto en modo cursor)'
+            )
+        },
+        {
+            'name': 'fields',
+            'in': 'query',
+            'type': 'string',
+            'description': 'Campos a devolver separados por coma (ej. ci,nombres,activo)'
         }
     ],
     'responses': {
@@ -78,7 +124,9 @@ def parse_date(date_string):
                                     }
                                 }
                             },
-                            'total': {'type': 'integer'}
+                            'total': {'type': 'integer'},
+                            'count_strategy': {'type': 'string', 'example': 'exact'},
+                            'next_cursor': {'type': 'string', 'description': 'Solo en modo cursor'}
                         }
                     }
                 }
@@ -91,18 +139,42 @@ def listar_personas():
     try:
         # Parámetros de paginación
         page = request.args.get('page', 1, type=int)
-        per_page = min(request.args.get('per_page', 10, type=int), 100)
+        # Entre 1 y 100 para todas las estrategias (LIMIT 0 o negativo no es una página)
+        per_page = max(1, min(request.args.get('per_page', 10, type=int), 100))
         
         # Filtros
         activo = request.args.get('activo', type=bool)
         
-        # Query base
-        query = PersonaBase.query
+        # Campos pedidos: solo esas columnas se leen de la base de datos
+        try:
+            fields = parse_fields(request.args.get('fields'), PersonaBase)
+        except InvalidFieldsError as e:
+            return error_response(str(e), 400)
+        
+        # Query base (fecha_actualizacion siempre se lee para los validadores HTTP)
+        query = PersonaBase.query.options(
+            *fields_options(PersonaBase, fields, always=('fecha_actualizacion',))
+        )
         
         # Aplicar filtros
         if activo is not None:
             query = query.filter_by(activo=activo)
         
+        # Estrategia de conteo del total
+        cursor_mode = 'cursor' in request.args
+        count_strategy = request.args.get('count', 'none' if cursor_mode else 'exact')
+        if count_strategy not in COUNT_STRATEGIES:
+            return error_response(
+                f"Estrategia de conteo inválida. Use: {', '.join(COUNT_STRATEGIES)}", 400
+            )
+        
+        # Paginación por cursor (seek sobre la clave primaria)
+        if cursor_mode:
+            return _listar_personas_por_cursor(query, request.args['cursor'], per_page, count_strategy, fields)
+        
+        if count_strategy != 'exact':
+            return _listar_personas_sin_conteo_exacto(query, page, per_page, count_strategy, fields)
+        
         # Paginación
         pagination = query.paginate(
             page=page, 
@@ -110,22 +182,101 @@ def listar_personas():
             error_out=False
         )
         
-        personas_data = [persona.to_dict() for persona in pagination.items]
-        
-        return success_response({
-            'personas': personas_data,
-            'total': pagination.total,
-            'page': page,
-            'per_page': per_page,
-            'pages': pagination.pages,
-            'has_next': pagination.has_next,
-            'has_prev': pagination.has_prev
-        })
+        return _responder_pagina(
+            pagination.items,
+            fields,
+            total=pagination.total,
+            count_strategy='exact',
+            # Valores efectivos de paginate (page < 1 se lleva a 1)
+            page=pagination.page,
+            per_page=pagination.per_page,
+            pages=pagination.pages,
+            has_next=pagination.has_next,
+            has_prev=pagination.has_prev
+        )
         
     except Exception as e:
         return error_response(f'Error al obtener personas: {str(e)}', 500)
 
 
+def _listar_personas_sin_conteo_exacto(query, page, per_page, count_strategy, fields):
+    """Obtener una página por OFFSET con un total estimado o sin total"""
+    page = max(page, 1)
+    total, count_strategy = count_rows(query, count_strategy)
+    
+    # Se pide una fila extra para saber si existe una página siguiente sin contar
+    personas = query.order_by(PersonaBase.ci).offset((page - 1) * per_page).limit(per_page + 1).all()
+    has_next = len(personas) > per_page
+    personas = personas[:per_page]
+    
+    return _responder_pagina(
+        personas,
+        fields,
+        total=total,
+        count_strategy=count_strategy,
+        page=page,
+        per_page=per_page,
+        pages=(total + per_page - 1) // per_page if total is not None else None,
+        has_next=has_next,
+        has_prev=page > 1
+    )
+
+
+def _listar_personas_por_cursor(query, cursor, per_page, count_strategy, fields):
+    """Obtener una página ordenada por CI a partir del cursor recibido"""
+    if cursor:
+        try:
+            posicion = decode_cursor(cursor, {'ci': str})
+        except InvalidCursorError as e:
+            return error_response(str(e), 400)
+    
+    # El total se calcula sobre el filtro completo, no sobre el tramo restante
+    total, count_strategy = count_rows(query, count_strategy)
+    
+    if cursor:
+        query = query.filter(PersonaBase.ci > posicion['ci'])
+    
+    # Se pide una fila extra para saber si existe una página siguiente sin contar
+    personas = query.order_by(PersonaBase.ci).limit(per_page + 1).all()
+    has_next = len(personas) > per_page
+    personas = personas[:per_page]
+    
+    return _responder_pagina(
+        personas,
+        fields,
+        total=total,
+        count_strategy=count_strategy,
+        per_page=per_page,
+        has_next=has_next,
+        next_cursor=encode_cursor({'ci': personas[-1].ci}) if has_next else None
+    )
+
+
+def _responder_pagina(personas, fields, **meta):
+    """
+    Responder una página de personas con ETag y Last-Modified
+    
+    El ETag agrega los CI y fechas de actualización de la página junto con los
+    metadatos de paginación; si el cliente ya tiene esa versión se responde 304
+    sin serializar las filas.
+    """
+    etag = collection_etag(
+        ((persona.ci, persona.fecha_actualizacion) for persona in personas),
+        sorted(meta.items()),
+        fields
+    )
+    fechas = [persona.fecha_actualizacion for persona in personas if persona.fecha_actualizacion]
+    last_modified = max(fechas) if fechas else None
+    
+    if is_not_modified(etag, last_modified):
+        return not_modified_response(etag, last_modified)
+    
+    return with_validators(success_response({
+        'personas': [persona.to_dict(fields) for persona in personas],
+        **meta
+    }), etag, last_modified)
+
+
 @personas_bp.route('/', methods=['POST'])
 @validate_json(PersonaCreateSchema)
 @swag_from({
@@ -184,45 +335,440 @@ def crear_persona():
     """Crear una nueva persona"""
     try:
         data = request.validated_data
+        ahora = datetime.utcnow()
+        tabla = PersonaBase.__table__
         
-        # Verificar si ya existe una persona con el mismo CI
-        existing_persona = PersonaBase.query.filter_by(ci=data['ci']).first()
-        if existing_persona:
-            return error_response('Ya existe una persona registrada con este CI', 400)
-        
-        # Obtener fecha - Marshmallow ya la convierte
-        fecha_nacimiento = data.get('fecha_nacimiento')
-        
-        # Crear nueva persona
-        nueva_persona = PersonaBase(
-            ci=data['ci'],
-            nombres=data['nombres'],
-            apellido_paterno=data.get('apellido_paterno'),
-            apellido_materno=data.get('apellido_materno'),
-            fecha_nacimiento=fecha_nacimiento,
-            sexo=data.get('sexo'),
-            telefono=data.get('telefono'),
-            correo=data.get('correo'),
-            direccion=data.get('direccion'),
-            foto_url=data.get('foto_url'),
-            activo=data.get('activo', True)
-        )
-        
-        # Guardar en base de datos
-        db.session.add(nueva_persona)
+        # Un solo INSERT ... RETURNING; el CI duplicado se detecta por la clave primaria
+        persona = db.session.execute(
+            tabla.insert().values(
+                ci=data['ci'],
+                nombres=data['nombres'],
+                apellido_paterno=data.get('apellido_paterno'),
+                apellido_materno=data.get('apellido_materno'),
+                fecha_nacimiento=data.get('fecha_nacimiento'),
+                sexo=data.get('sexo'),
+                telefono=data.get('telefono'),
+                correo=data.get('correo'),
+                direccion=data.get('direccion'),
+                foto_url=data.get('foto_url'),
+                activo=data.get('activo', True),
+                fecha_creacion=ahora,
+                fecha_actualizacion=ahora
+            ).returning(*tabla.columns)
+        ).one()
         db.session.commit()
+        invalidate('personas:lista', f'personas:{persona.ci}')
         
         return success_response({
             'message': 'Persona creada exitosamente',
-            'persona': nueva_persona.to_dict()
+            'persona': PersonaBase.row_to_dict(persona)
         }, 201)
         
+    except IntegrityError as e:
+        db.session.rollback()
+        if is_unique_violation(e):
+            return error_response('Ya existe una persona registrada con este CI', 400)
+        return error_response(f'Error interno del servidor: {str(e)}', 500)
+        
     except Exception as e:
         db.session.rollback()
         return error_response(f'Error interno del servidor: {str(e)}', 500)
 
 
+@personas_bp.route('/bulk', methods=['POST'])
+@swag_from({
+    'tags': ['Personas'],
+    'summary': 'Importación masiva de personas',
+    'description': (
+        'Importa personas desde un cuerpo NDJSON (una persona por línea) o CSV con cabecera. '
+        'Las filas se validan y guardan por lotes; las personas existentes (mismo CI) se actualizan. '
+        'El formato se toma del parámetro format o del Content-Type.'
+    ),
+    'consumes': ['application/x-ndjson', 'text/csv'],
+    'parameters': [
+        {
+            'name': 'format',
+            'in': 'query',
+            'type': 'string',
+            'enum': ['ndjson', 'csv'],
+            'description': 'Formato del cuerpo (opcional si el Content-Type lo indica)'
+        },
+        {
+            'name': 'body',
+            'in': 'body',
+            'required': True,
+            'schema': {'type': 'string', 'example': '{"ci": "12345678", "nombres": "Juan Carlos"}'}
+        }
+    ],
+    'responses': {
+        200: {
+            'description': 'Importación procesada; incluye el reporte de errores por fila',
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'success': {'type': 'boolean', 'example': True},
+                    'data': {
+                        'type': 'object',
+                        'properties': {
+                            'procesadas': {'type': 'integer'},
+                            'importadas': {'type': 'integer'},
+                            'con_errores': {'type': 'integer'},
+                            'errores': {
+                                'type': 'array',
+                                'items': {
+                                    'type': 'object',
+                                    'properties': {
+                                        'fila': {'type': 'integer'},
+                                        'ci': {'type': 'string'},
+                                        'errores': {'type': 'object'}
+                                    }
+                                }
+                            },
+                            'errores_omitidos': {'type': 'integer'}
+                        }
+                    }
+                }
+            }
+        },
+        415: {
+            'description': 'Formato no soportado'
+        }
+    }
+})
+def importar_personas():
+    """Importar personas de forma masiva desde un flujo NDJSON o CSV"""
+    fmt = detect_format(request.args.get('format'), request.mimetype)
+    if fmt is None:
+        return error_response(
+            'Formato no soportado. Use NDJSON (application/x-ndjson) o CSV (text/csv)', 415
+        )
+    
+    chunk_size = current_app.config['PERSONAS_BULK_CHUNK_SIZE']
+    max_errors = current_app.config['PERSONAS_BULK_MAX_ERRORS']
+    schema = PersonaCreateSchema()
+    table = PersonaBase.__table__
+    plantilla = {column.name: None for column in table.columns}
+    # Columnas que una fila puede sobrescribir en una persona existente (solo si las envía)
+    actualizables = set(plantilla) - {'ci', 'fecha_creacion', 'fecha_actualizacion'}
+    # En PgBouncer modo transaction no se usa COPY sobre una tabla temporal
+    usar_copy = current_app.config.get('DB_POOL_PROFILE') != 'pgbouncer'
+    
+    resumen = {'procesadas': 0, 'importadas': 0, 'con_errores': 0, 'errores': [], 'errores_omitidos': 0}
+    
+    def registrar_error(fila, ci, mensajes):
+        resumen['con_errores'] += 1
+        if len(resumen['errores']) < max_errors:
+            resumen['errores'].append({'fila': fila, 'ci': ci, 'errores': mensajes})
+        else:
+            resumen['errores_omitidos'] += 1
+    
+    try:
+        for lote in chunked(iter_rows(request.stream, fmt), chunk_size):
+            ahora = datetime.utcnow()
+            validas = {}
+            filas_validas = []
+            
+            for fila, datos in lote:
+                resumen['procesadas'] += 1
+                if isinstance(datos, InvalidRowError):
+                    registrar_error(fila, None, {'_schema': [str(datos)]})
+                    continue
+                try:
+                    persona = schema.load(datos)
+                except ValidationError as e:
+                    registrar_error(fila, datos.get('ci'), e.messages)
+                    continue
+                
+                # Si un CI se repite dentro del lote prevalece la última fila. Una
+                # persona existente solo cambia en las columnas que la fila trae
+                # (activo incluido): las ausentes conservan su valor
+                enviadas = frozenset(actualizables.intersection(datos)) | {'fecha_actualizacion'}
+                validas[persona['ci']] = ({
+                    **plantilla,
+                    **persona,
+                    'fecha_creacion': ahora,
+                    'fecha_actualizacion': ahora
+                }, enviadas)
+                filas_validas.append((fila, persona['ci']))
+            
+            # Un upsert por combinación de columnas enviadas (normalmente una por archivo)
+            grupos = {}
+            for row, enviadas in validas.values():
+                grupos.setdefault(enviadas, []).append(row)
+            
+            try:
+                for enviadas, rows in grupos.items():
+                    upsert_rows(db.session, table, rows, 'ci', enviadas, use_copy=usar_copy)
+                db.session.commit()
+                # Un CI repetido en el lote se escribe una sola vez
+                resumen['importadas'] += len(validas)
+                if validas:
+                    invalidate('personas:lista', *_etiquetas_ci(validas))
+            except Exception as e:
+                db.session.rollback()
+                for fila, ci in filas_validas:
+                    registrar_error(fila, ci, {'_db': [f'Error al guardar el lote: {str(e)}']})
+    
+    except (UnicodeDecodeError, csv.Error) as e:
+        registrar_error(None, None, {'_archivo': [f'No se pudo leer el archivo: {str(e)}']})
+    
+    except Exception as e:
+        db.session.rollback()
+        return error_response(f'Error en la importación: {str(e)}', 500, errors=resumen)
+    
+    return success_response(resumen)
+
+
+@personas_bp.route('/export', methods=['GET'])
+@read_only
+@swag_from({
+    'tags': ['Personas'],
+    'summary': 'Exportar todas las personas',
+    'description': (
+        'Descarga todas las personas como NDJSON o CSV. La respuesta se genera en flujo '
+        'a partir de un cursor del servidor y refleja una única instantánea consistente de la tabla.'
+    ),
+    'produces': ['application/x-ndjson', 'text/csv'],
+    'parameters': [
+        {
+            'name': 'format',
+            'in': 'query',
+            'type': 'string',
+            'enum': ['ndjson', 'csv'],
+            'default': 'ndjson',
+            'description': 'Formato de salida'
+        }
+    ],
+    'responses': {
+        200: {
+            'description': 'Flujo con una persona por línea'
+        },
+        400: {
+            'description': 'Formato no soportado'
+        }
+    }
+})
+def exportar_personas():
+    """Exportar todas las personas en flujo (NDJSON o CSV)"""
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in ('ndjson', 'csv'):
+        return error_response('Formato no soportado. Use ndjson o csv', 400)
+    
+    # El generador se ejecuta fuera del contexto de la aplicación
+    engine = read_engine(db)
+    batch_size = current_app.config['PERSONAS_EXPORT_BATCH_SIZE']
+    cabecera, serializar_lote = _serializador_exportacion(fmt, current_app.json)
+    
+    def generar():
+        with engine.connect() as connection:
+            if connection.dialect.name == 'postgresql':
+                # Todas las lecturas del cursor ven la misma instantánea
+                connection.execution_options(isolation_level='REPEATABLE READ')
+            
+            with connection.begin():
+                # Filas de Core: sin objetos ORM ni identity map
+                result = connection.execution_options(
+                    stream_results=True, yield_per=batch_size
+                ).execute(select(*PersonaBase.__table__.columns).order_by(PersonaBase.ci))
+                
+                if cabecera:
+                    yield cabecera
+                for partition in result.partitions():
+                    yield serializar_lote(partition)
+    
+    mimetype = 'application/x-ndjson' if fmt == 'ndjson' else 'text/csv'
+    return Response(
+        generar(),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename=personas.{fmt}'}
+    )
+
+
+_CSV_COLUMNAS_EXPORTACION = (
+    'ci', 'nombres', 'apellido_paterno', 'apellido_materno', 'nombre_completo',
+    'fecha_nacimiento', 'sexo', 'telefono', 'correo', 'direccion', 'foto_url',
+    'activo', 'fecha_creacion', 'fecha_actualizacion'
+)
+
+
+def _serializador_exportacion(fmt, json_provider):
+    """
+    Funciones para generar la exportación en el formato pedido
+    
+    Returns:
+        Tupla (cabecera, serializar_lote): la cabecera es el texto inicial
+        ('' si el formato no tiene) y serializar_lote convierte un lote de
+        filas en su texto
+    """
+    if fmt == 'ndjson':
+        a_dict = get_serializer(PersonaBase)
+        return '', lambda filas: ''.join(json_provider.dumps(a_dict(fila)) + '\n' for fila in filas)
+    
+    # Un solo writer y buffer para toda la exportación; se vacía tras cada lote.
+    # Las fechas ya vienen en ISO 8601, igual que en JSON
+    a_dict = get_serializer(PersonaBase, _CSV_COLUMNAS_EXPORTACION)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    
+    def vaciar():
+        texto = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return texto
+    
+    def a_csv(filas):
+        writer.writerows(a_dict(fila).values() for fila in filas)
+        return vaciar()
+    
+    writer.writerow(_CSV_COLUMNAS_EXPORTACION)
+    return vaciar(), a_csv
+
+
+@personas_bp.route('/batch', methods=['GET'])
+@read_only
+@cached_response(tags=lambda: _etiquetas_ci(_cis_de_consulta()))
+@swag_from({
+    'tags': ['Personas'],
+    'summary': 'Obtener varias personas por CI',
+    'description': 'Resuelve una lista de CIs en una sola consulta. Los CIs inexistentes se listan en faltantes.',
+    'parameters': [
+        {
+            'name': 'ci',
+            'in': 'query',
+            'type': 'string',
+            'required': True,
+            'description': 'CIs separados por coma (ej. 123,456,789)'
+        },
+        {
+            'name': 'fields',
+            'in': 'query',
+            'type': 'string',
+            'description': 'Campos a devolver separados por coma (ej. ci,nombres,activo)'
+        }
+    ],
+    'responses': {
+        200: {
+            'description': 'Personas encontradas indexadas por CI',
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'success': {'type': 'boolean', 'example': True},
+                    'data': {
+                        'type': 'object',
+                        'properties': {
+                            'personas': {'type': 'object', 'additionalProperties': {'type': 'object'}},
+                            'faltantes': {'type': 'array', 'items': {'type': 'string'}}
+                        }
+                    }
+                }
+            }
+        },
+        400: {
+            'description': 'Lista de CIs vacía o demasiado grande'
+        }
+    }
+})
+def obtener_personas_lote():
+    """Obtener varias personas por CI (parámetro de consulta)"""
+    return _responder_lote(_cis_de_consulta(), request.args.get('fields'))
+
+
+def _cis_de_consulta():
+    """CIs enviados en el parámetro ?ci= separados por coma"""
+    return [ci.strip() for ci in request.args.get('ci', '').split(',') if ci.strip()]
+
+
+def _etiquetas_ci(cis):
+    """Etiquetas de caché de cada persona incluida en una respuesta"""
+    return [f'personas:{ci}' for ci in cis]
+
+
+@personas_bp.route('/batch', methods=['POST'])
+@read_only
+@validate_json(PersonaBatchSchema)
+@swag_from({
+    'tags': ['Personas'],
+    'summary': 'Obtener varias personas por CI (cuerpo JSON)',
+    'description': 'Variante POST para listas largas de CIs que no caben en la URL',
+    'parameters': [
+        {
+            'name': 'body',
+            'in': 'body',
+            'required': True,
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'ci': {'type': 'array', 'items': {'type': 'string'}, 'example': ['12345678', '87654321']},
+                    'fields': {'type': 'string', 'example': 'ci,nombres,activo'}
+                },
+                'required': ['ci']
+            }
+        }
+    ],
+    'responses': {
+        200: {
+            'description': 'Personas encontradas indexadas por CI'
+        },
+        400: {
+            'description': 'Lista de CIs demasiado grande'
+        },
+        422: {
+            'description': 'Errores de validación'
+        }
+    }
+})
+def obtener_personas_lote_post():
+    """Obtener varias personas por CI (cuerpo JSON)"""
+    data = request.validated_data
+    return _responder_lote(data['ci'], data.get('campos'))
+
+
+def _responder_lote(cis, raw_fields):
+    """Resolver una lista de CIs con una sola consulta"""
+    try:
+        cis = list(dict.fromkeys(cis))
+        if not cis:
+            return error_response('Debe enviar al menos un CI', 400)
+        
+        limite = current_app.config['PERSONAS_BATCH_MAX']
+        if len(cis) > limite:
+            return error_response(f'Se permiten como máximo {limite} CIs por consulta', 400)
+        
+        try:
+            fields = parse_fields(raw_fields, PersonaBase)
+        except InvalidFieldsError as e:
+            return error_response(str(e), 400)
+        
+        personas = PersonaBase.query.options(
+            *fields_options(PersonaBase, fields)
+        ).filter(_ci_en(cis)).all()
+        
+        encontradas = {persona.ci: persona.to_dict(fields) for persona in personas}
+        
+        return success_response({
+            'personas': encontradas,
+            'faltantes': [ci for ci in cis if ci not in encontradas]
+        })
+        
+    except Exception as e:
+        return error_response(f'Error al obtener personas: {str(e)}', 500)
+
+
+def _ci_en(cis):
+    """
+    Condición ci IN (...) para una lista de CIs
+    
+    En PostgreSQL se envía como un único parámetro de tipo arreglo
+    (ci = ANY(:cis)), así el texto de la consulta no crece con la lista.
+    """
+    if db.session.get_bind().dialect.name == 'postgresql':
+        return PersonaBase.ci == any_(bindparam('cis', cis, type_=ARRAY(PersonaBase.ci.type)))
+    return PersonaBase.ci.in_(cis)
+
+
 @personas_bp.route('/<ci>', methods=['GET'])
+@read_only
+@cached_response(tags=lambda ci: (f'personas:{ci}',))
 @swag_from({
     'tags': ['Personas'],
     'summary': 'Obtener persona por CI',
@@ -234,12 +780,21 @@ def crear_persona():
             'type': 'string',
             'required': True,
             'description': 'CI de la persona'
+        },
+        {
+            'name': 'fields',
+            'in': 'query',
+            'type': 'string',
+            'description': 'Campos a devolver separados por coma (ej. ci,nombres,activo)'
         }
     ],
     'responses': {
         200: {
             'description': 'Persona encontrada'
         },
+        304: {
+            'description': 'La persona no cambió desde la versión indicada en If-None-Match / If-Modified-Since'
+        },
         404: {
             'description': 'Persona no encontrada'
         }
@@ -248,14 +803,33 @@ def crear_persona():
 def obtener_persona(ci):
     """Obtener una persona por CI"""
     try:
-        persona = PersonaBase.query.filter_by(ci=ci).first()
+        try:
+            fields = parse_fields(request.args.get('fields'), PersonaBase)
+        except InvalidFieldsError as e:
+            return error_response(str(e), 400)
+        
+        # Si el cliente envía validadores basta con leer la fecha de actualización
+        if request.if_none_match or request.if_modified_since:
+            fecha_actualizacion = db.session.execute(
+                select(PersonaBase.fecha_actualizacion).where(PersonaBase.ci == ci)
+            ).first()
+            if fecha_actualizacion is None:
+                return error_response('Persona no encontrada', 404)
+            
+            etag = resource_etag(fecha_actualizacion[0], fields)
+            if is_not_modified(etag, fecha_actualizacion[0]):
+                return not_modified_response(etag, fecha_actualizacion[0])
+        
+        persona = PersonaBase.query.options(
+            *fields_options(PersonaBase, fields, always=('fecha_actualizacion',))
+        ).filter_by(ci=ci).first()
         
         if not persona:
             return error_response('Persona no encontrada', 404)
         
-        return success_response({
-            'persona': persona.to_dict()
-        })
+        return with_validators(success_response({
+            'persona': persona.to_dict(fields)
+        }), resource_etag(persona.fecha_actualizacion, fields), persona.fecha_actualizacion)
         
     except Exception as e:
         return error_response(f'Error al obtener persona: {str(e)}', 500)
@@ -275,6 +849,12 @@ def obtener_persona(ci):
             'required': True,
             'description': 'CI de la persona'
         },
+        {
+            'name': 'If-Match',
+            'in': 'header',
+            'type': 'string',
+            'description': 'ETag obtenido en un GET previo; si la persona cambió se responde 412'
+        },
         {
             'name': 'body',
             'in': 'body',
@@ -303,6 +883,9 @@ def obtener_persona(ci):
         404: {
             'description': 'Persona no encontrada'
         },
+        412: {
+            'description': 'El ETag de If-Match no corresponde a la versión actual'
+        },
         422: {
             'description': 'Errores de validación'
         }
@@ -311,27 +894,37 @@ def obtener_persona(ci):
 def actualizar_persona(ci):
     """Actualizar una persona existente"""
     try:
-        persona = PersonaBase.query.filter_by(ci=ci).first()
+        data = request.validated_data
+        tabla = PersonaBase.__table__
         
-        if not persona:
-            return error_response('Persona no encontrada', 404)
+        # Actualizar campos y timestamp en un solo UPDATE ... RETURNING
+        valores = {field: value for field, value in data.items() if field in tabla.c}
+        valores['fecha_actualizacion'] = datetime.utcnow()
         
-        data = request.validated_data
+        statement = tabla.update().where(tabla.c.ci == ci).values(**valores).returning(*tabla.columns)
+        
+        # Concurrencia optimista: el ETag enviado en If-Match debe ser la versión actual
+        condicional = bool(request.if_match) and not request.if_match.star_tag
+        if condicional:
+            versiones = [timestamp_from_version(version) for version in parse_resource_versions(request.if_match)]
+            statement = statement.where(tabla.c.fecha_actualizacion.in_(versiones))
         
-        # Actualizar campos
-        for field, value in data.items():
-            if hasattr(persona, field):
-                setattr(persona, field, value)
+        persona = db.session.execute(statement).first()
         
-        # Actualizar timestamp
-        persona.fecha_actualizacion = datetime.utcnow()
+        if persona is None:
+            db.session.rollback()
+            # Solo en el caso de fallo se distingue entre inexistente y versión desactualizada
+            if condicional and db.session.execute(select(tabla.c.ci).where(tabla.c.ci == ci)).first():
+                return error_response('La persona fue modificada por otra petición (If-Match no coincide)', 412)
+            return error_response('Persona no encontrada', 404)
         
         db.session.commit()
+        invalidate('personas:lista', f'personas:{ci}')
         
-        return success_response({
+        return with_validators(success_response({
             'message': 'Persona actualizada exitosamente',
-            'persona': persona.to_dict()
-        })
+            'persona': PersonaBase.row_to_dict(persona)
+        }), resource_etag(persona.fecha_actualizacion), persona.fecha_actualizacion)
         
     except Exception as e:
         db.session.rollback()
@@ -364,16 +957,22 @@ def actualizar_persona(ci):
 def eliminar_persona(ci):
     """Eliminar una persona (eliminación suave)"""
     try:
-        persona = PersonaBase.query.filter_by(ci=ci).first()
+        tabla = PersonaBase.__table__
         
-        if not persona:
-            return error_response('Persona no encontrada', 404)
+        # Eliminación suave - marcar como inactiva en un solo UPDATE ... RETURNING
+        persona = db.session.execute(
+            tabla.update()
+            .where(tabla.c.ci == ci)
+            .values(activo=False, fecha_actualizacion=datetime.utcnow())
+            .returning(tabla.c.ci)
+        ).first()
         
-        # Eliminación suave - marcar como inactiva
-        persona.activo = False
-        persona.fecha_actualizacion = datetime.utcnow()
+        if persona is None:
+            db.session.rollback()
+            return error_response('Persona no encontrada', 404)
         
         db.session.commit()
+        invalidate('personas:lista', f'personas:{ci}')
         
         return success_response({
             'message': 'Persona eliminada exitosamente'
@@ -381,4 +980,4 @@ def eliminar_persona(ci):
         
     except Exception as e:
         db.session.rollback()
-        return error_response(f'Error al eliminar persona: {str(e)}', 500)
\ No newline at end of file
+        return error_response(f'Error al eliminar persona: {str(e)}', 500)
@@ -3,17 +3,29 @@ API endpoints para autenticación y gestión de usuarios con OAuth
 """
 
 import json
-import requests
+import os
+import threading
+import time
+from urllib.parse import urlsplit
 from flask import Blueprint, request, current_app, url_for, redirect, session
-from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity
-from flasgger import swag_from
+from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity, get_jwt, decode_token
+from app.core.docs import swag_from
 from datetime import datetime
 from authlib.integrations.flask_client import OAuth
+from authlib.integrations.requests_client import OAuth2Session
 
 from app.core.database import db
+from app.core.hashing import HashingBusyError
 from app.models import User
 from app.schemas import UserRegistrationSchema, UserLoginSchema
-from app.utils import success_response, error_response, validate_json
+from app.utils import (
+    success_response, error_response, validate_json, parse_fields, fields_options, InvalidFieldsError, read_only
+)
+from app.utils.auth_cache import get_auth_cache, token_claims
+from app.utils.last_access import touch_last_access
+from app.utils.google_tokens import verify_google_id_token, InvalidGoogleTokenError
+from app.utils.http_client import get_http_client
+from app.utils.revocation import get_revocation_store
 
 # Crear Blueprint para autenticación
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
@@ -22,6 +34,13 @@ auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 oauth = OAuth()
 
 
+def _hashing_busy_response(error):
+    """Respuesta 503 con Retry-After cuando el pool de hashing está saturado"""
+    response, status_code = error_response(str(error), 503)
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response, status_code
+
+
 @auth_bp.route('/register', methods=['POST'])
 @validate_json(UserRegistrationSchema)
 @swag_from({
@@ -76,6 +95,12 @@ oauth = OAuth()
         },
         422: {
             'description': 'Errores de validación'
+        },
+        429: {
+            'description': 'Demasiadas solicitudes (ver encabezado Retry-After)'
+        },
+        503: {
+            'description': 'Servicio de autenticación saturado (ver encabezado Retry-After)'
         }
     }
 })
@@ -86,7 +111,7 @@ def register():
         
         # Verificar si ya existe un usuario con el mismo CI o correo
         existing_user = User.query.filter(
-            (User.ci == data['ci']) | (User.correo == data['correo'])
+            (User.ci == data['ci']) | (db.func.lower(User.correo) == data['correo'].lower())
         ).first()
         
         if existing_user:
@@ -117,7 +142,7 @@ def register():
         db.session.commit()
         
         # Crear tokens
-        access_token = create_access_token(identity=new_user.ci)
+        access_token = create_access_token(identity=new_user.ci, additional_claims=token_claims(new_user))
         refresh_token = create_refresh_token(identity=new_user.ci)
         
         return success_response({
@@ -127,6 +152,9 @@ def register():
             'refresh_token': refresh_token
         }, 201)
         
+    except HashingBusyError as e:
+        db.session.rollback()
+        return _hashing_busy_response(e)
     except Exception as e:
         db.session.rollback()
         return error_response(f'Error interno del servidor: {str(e)}', 500)
@@ -177,6 +205,12 @@ def register():
         },
         422: {
             'description': 'Errores de validación'
+        },
+        429: {
+            'description': 'Demasiadas solicitudes (ver encabezado Retry-After)'
+        },
+        503: {
+            'description': 'Servicio de autenticación saturado (ver encabezado Retry-After)'
         }
     }
 })
@@ -186,7 +220,7 @@ def login():
         data = request.validated_data
         
         # Buscar usuario por correo
-        user = User.query.filter_by(correo=data['correo']).first()
+        user = User.query.filter(db.func.lower(User.correo) == data['correo'].lower()).first()
         
         if not user or not user.check_password(data['password']):
             return error_response('Credenciales inválidas', 401)
@@ -194,12 +228,15 @@ def login():
         if not user.activo:
             return error_response('Cuenta de usuario inactiva', 401)
         
-        # Actualizar último acceso
-        user.ultimo_acceso = datetime.utcnow()
-        db.session.commit()
+        # Regenerar el hash si se creó con un costo desactualizado
+        if user.upgrade_password_hash(data['password']):
+            db.session.commit()
+        
+        # Registrar último acceso (se escribe en segundo plano)
+        touch_last_access(user)
         
         # Crear tokens
-        access_token = create_access_token(identity=user.ci)
+        access_token = create_access_token(identity=user.ci, additional_claims=token_claims(user))
         refresh_token = create_refresh_token(identity=user.ci)
         
         return success_response({
@@ -209,6 +246,8 @@ def login():
             'refresh_token': refresh_token
         })
         
+    except HashingBusyError as e:
+        return _hashing_busy_response(e)
     except Exception as e:
         return error_response(f'Error interno del servidor: {str(e)}', 500)
 
@@ -247,12 +286,12 @@ def refresh():
         current_user_ci = get_jwt_identity()
         
         # Verificar que el usuario aún existe y está activo
-        user = User.query.get(current_user_ci)
+        user = get_auth_cache().get_user(current_user_ci)
         if not user or not user.activo:
             return error_response('Usuario no válido o inactivo', 401)
         
         # Crear nuevo token de acceso
-        access_token = create_access_token(identity=current_user_ci)
+        access_token = create_access_token(identity=current_user_ci, additional_claims=token_claims(user))
         
         return success_response({
             'access_token': access_token
@@ -263,12 +302,21 @@ def refresh():
 
 
 @auth_bp.route('/me', methods=['GET'])
+@read_only
 @jwt_required()
 @swag_from({
     'tags': ['Autenticación'],
     'summary': 'Obtener perfil de usuario',
     'description': 'Obtiene la información del usuario autenticado',
     'security': [{'Bearer': []}],
+    'parameters': [
+        {
+            'name': 'fields',
+            'in': 'query',
+            'type': 'string',
+            'description': 'Campos del usuario a devolver separados por coma (ej. ci,nombres,rol)'
+        }
+    ],
     'responses': {
         200: {
             'description': 'Perfil de usuario obtenido exitosamente',
@@ -293,14 +341,19 @@ def refresh():
 def get_current_user():
     """Obtener información del usuario autenticado"""
     try:
+        try:
+            fields = parse_fields(request.args.get('fields'), User)
+        except InvalidFieldsError as e:
+            return error_response(str(e), 400)
+        
         current_user_ci = get_jwt_identity()
-        user = User.query.get(current_user_ci)
+        user = User.query.options(*fields_options(User, fields, always=('activo',))).get(current_user_ci)
         
         if not user or not user.activo:
             return error_response('Usuario no válido o inactivo', 401)
         
         return success_response({
-            'user': user.to_dict()
+            'user': user.to_dict(fields=fields)
         })
         
     except Exception as e:
@@ -312,26 +365,129 @@ def get_current_user():
 @swag_from({
     'tags': ['Autenticación'],
     'summary': 'Cerrar sesión',
-    'description': 'Cierra la sesión del usuario (informativo, los tokens JWT deben manejarse en el cliente)',
+    'description': 'Revoca el token de acceso usado y, si se envía, el refresh token del mismo usuario',
     'security': [{'Bearer': []}],
+    'parameters': [
+        {
+            'name': 'body',
+            'in': 'body',
+            'required': False,
+            'schema': {
+                'type': 'object',
+                'properties': {
+                    'refresh_token': {'type': 'string', 'description': 'Refresh token a revocar'}
+                }
+            }
+        }
+    ],
     'responses': {
         200: {
             'description': 'Sesión cerrada exitosamente'
+        },
+        400: {
+            'description': 'Refresh token inválido o de otro usuario'
         }
     }
 })
 def logout():
     """Cerrar sesión"""
-    # Nota: JWT son stateless, por lo que el logout es principalmente informativo
-    # En una implementación más avanzada se podría usar una blacklist de tokens
-    
-    return success_response({
-        'message': 'Sesión cerrada exitosamente. El token debe ser eliminado del cliente.'
-    })
+    try:
+        store = get_revocation_store()
+        access = get_jwt()
+        
+        refresh = None
+        refresh_token = (request.get_json(silent=True) or {}).get('refresh_token')
+        if refresh_token:
+            try:
+                refresh = decode_token(refresh_token)
+            except Exception:
+                return error_response('Refresh token inválido', 400)
+            if refresh.get('type') != 'refresh' or refresh['sub'] != access['sub']:
+                return error_response('Refresh token inválido', 400)
+        
+        store.revoke(access['jti'], access['exp'])
+        if refresh:
+            store.revoke(refresh['jti'], refresh['exp'])
+        
+        return success_response({
+            'message': 'Sesión cerrada exitosamente'
+        })
+        
+    except Exception as e:
+        return error_response(f'Error interno del servidor: {str(e)}', 500)
 
 
 # ========== OAUTH GOOGLE ==========
 
+class PooledOAuth2Session(OAuth2Session):
+    """
+    Sesión de Authlib que usa el cliente HTTP compartido
+
+    Authlib crea y cierra una sesión por operación; esta variante monta el
+    pool keep-alive del host, aplica los timeouts por defecto y pasa cada
+    petición por el circuit breaker del host.
+    """
+
+    def request(self, method, url, withhold_token=False, auth=None, **kwargs):
+        http_client = current_app.extensions['http_client']
+        prefix = '{0.scheme}://{0.netloc}/'.format(urlsplit(url))
+        if prefix not in self.adapters:
+            self.mount(prefix, http_client.adapter_for(url))
+        kwargs.setdefault('timeout', http_client.timeout)
+        parent = super().request
+        return http_client.guarded(
+            url, lambda: parent(method, url, withhold_token=withhold_token, auth=auth, **kwargs)
+        )
+
+    def close(self):
+        # Los adaptadores montados son compartidos: no cerrar sus pools
+        for prefix in [p for p in self.adapters if p not in ('http://', 'https://')]:
+            del self.adapters[prefix]
+        super().close()
+
+
+class _GoogleMetadataPrefetch:
+    """
+    Descargar el discovery de Google en segundo plano, una vez por proceso
+
+    Se inicia con la primera petición de cada worker y no al crear la
+    aplicación: con preload_app la aplicación se crea en el maestro, y un hilo
+    suyo en pleno fork dejaría a los workers con su socket y sus locks.
+    """
+
+    def __init__(self, app, google):
+        self.app = app
+        self.google = google
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def ensure_started(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            threading.Thread(
+                target=_prefetch_google_metadata, args=(self.app, self.google),
+                name='google-discovery', daemon=True
+            ).start()
+            self._pid = os.getpid()
+
+
+def _prefetch_google_metadata(app, google):
+    """Descargar el documento de discovery para que el primer login no espere por él"""
+    with app.app_context():
+        try:
+            response = get_http_client().get(app.config['GOOGLE_DISCOVERY_URL'])
+            response.raise_for_status()
+            metadata = response.json()
+        except Exception as e:
+            app.logger.warning('No se pudo obtener el discovery de Google: %s', e)
+            return
+        metadata['_loaded_at'] = time.time()
+        google.server_metadata.update(metadata)
+
+
 def init_oauth(app):
     """Inicializar OAuth con la aplicación Flask"""
     oauth.init_app(app)
@@ -345,6 +501,11 @@ def init_oauth(app):
             'scope': 'openid email profile'
         }
     )
+    google.client_cls = PooledOAuth2Session
+    
+    # Sin credenciales configuradas el login con Google no se usa
+    if app.config['GOOGLE_CLIENT_ID']:
+        app.before_request(_GoogleMetadataPrefetch(app, google).ensure_started)
     return google
 
 
@@ -399,14 +560,13 @@ def google_callback():
             return error_response('Email no proporcionado por Google', 400)
         
         # Buscar usuario existente
-        user = User.query.filter_by(correo=email).first()
+        user = User.query.filter(db.func.lower(User.correo) == email.lower()).first()
         
         if user:
             # Usuario existente - actualizar información OAuth
             user.provider = 'google'
             user.provider_id = user_info.get('sub')
             user.avatar_url = user_info.get('picture')
-            user.ultimo_acceso = datetime.utcnow()
             
         else:
             # Crear nuevo usuario OAuth
@@ -431,9 +591,10 @@ def google_callback():
             db.session.add(user)
         
         db.session.commit()
+        touch_last_access(user)
         
         # Crear tokens JWT
-        access_token = create_access_token(identity=user.ci)
+        access_token = create_access_token(identity=user.ci, additional_claims=token_claims(user))
         refresh_token = create_refresh_token(identity=user.ci)
         
         # Para frontend web, podemos devolver los tokens en query params
@@ -481,28 +642,25 @@ def google_user_auth():
         if not id_token:
             return error_response('Token ID requerido', 400)
         
-        # Verificar token con Google
-        google_verify_url = f"https://oauth2.googleapis.com/tokeninfo?id_token={id_token}"
-        response = requests.get(google_verify_url)
-        
-        if response.status_code != 200:
+        # Verificar firma y claims del token con las claves públicas de Google
+        try:
+            user_info = verify_google_id_token(id_token)
+        except InvalidGoogleTokenError:
             return error_response('Token inválido', 400)
         
-        user_info = response.json()
         email = user_info.get('email')
         
         if not email:
             return error_response('Email no encontrado en token', 400)
         
         # Buscar o crear usuario
-        user = User.query.filter_by(correo=email).first()
+        user = User.query.filter(db.func.lower(User.correo) == email.lower()).first()
         
         if user:
             # Actualizar información OAuth
             user.provider = 'google'
             user.provider_id = user_info.get('sub')
             user.avatar_url = user_info.get('picture')
-            user.ultimo_acceso = datetime.utcnow()
             
         else:
             # Crear nuevo usuario
@@ -524,9 +682,10 @@ def google_user_auth():
             db.session.add(user)
         
         db.session.commit()
+        touch_last_access(user)
         
         # Crear tokens JWT
-        access_token = create_access_token(identity=user.ci)
+        access_token = create_access_token(identity=user.ci, additional_claims=token_claims(user))
         refresh_token = create_refresh_token(identity=user.ci)
         
         return success_response({
@@ -541,12 +700,21 @@ def google_user_auth():
 
 
 @auth_bp.route('/verify', methods=['GET'])
+@read_only
 @jwt_required()
 @swag_from({
     'tags': ['Autenticación'],
     'summary': 'Verificar token de acceso',
     'description': 'Verifica la validez del token JWT y retorna la información del usuario',
     'security': [{'Bearer': []}],
+    'parameters': [
+        {
+            'name': 'fields',
+            'in': 'query',
+            'type': 'string',
+            'description': 'Campos del usuario a devolver separados por coma (ej. ci,nombres,rol)'
+        }
+    ],
     'responses': {
         200: {
             'description': 'Token válido',
@@ -572,17 +740,22 @@ def google_user_auth():
 def verify_token():
     """Verificar token de acceso y obtener información del usuario"""
     try:
+        try:
+            fields = parse_fields(request.args.get('fields'), User)
+        except InvalidFieldsError as e:
+            return error_response(str(e), 400)
+        
         # Obtener CI del usuario desde el token
         user_ci = get_jwt_identity()
         
         # Buscar usuario en la base de datos
-        user = User.query.filter_by(ci=user_ci).first()
+        user = User.query.options(*fields_options(User, fields)).filter_by(ci=user_ci).first()
         
         if not user:
             return error_response('Usuario no encontrado', 404)
         
         return success_response({
-            'user': user.to_dict(),
+            'user': user.to_dict(fields=fields),
             'is_valid': True
         })
         
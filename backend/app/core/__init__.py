@@ -2,7 +2,7 @@
 Core del sistema
 """
 
-from .database import db, init_extensions
+from .database import db, init_extensions, is_unique_violation
 from .config import config
 
-__all__ = ['db', 'init_extensions', 'config']
\ No newline at end of file
+__all__ = ['db', 'init_extensions', 'is_unique_violation', 'config']
\ No newline at end of file
@@ -3,6 +3,7 @@ Configuración de la aplicación
 """
 
 import os
+import tempfile
 from datetime import timedelta
 
 class Config:
@@ -17,21 +18,126 @@ class Config:
     DB_NAME = os.environ.get('DB_NAME') or 'Edificio'
     
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or f'postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
+    # Crear las tablas con db.create_all() al arrancar. El esquema se gestiona con
+    # migraciones (flask db upgrade); TestingConfig lo activa para SQLite en memoria
+    AUTO_CREATE_TABLES = os.environ.get('AUTO_CREATE_TABLES', 'false').lower() == 'true'
+    # Arranque rápido: Swagger y Flask-Migrate se cargan solo cuando se usan
+    # (la primera petición a /docs/ o un comando flask db)
+    FAST_STARTUP = os.environ.get('FAST_STARTUP', 'false').lower() == 'true'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Réplicas de lectura (URLs separadas por coma). Las vistas @read_only leen de
+    # ellas; un cliente que escribe lee del primario durante REPLICA_STICKY_SECONDS
+    # y las réplicas con más de REPLICA_MAX_LAG_SECONDS de retraso salen de rotación
+    DATABASE_REPLICA_URLS = [url.strip() for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+    REPLICA_STICKY_SECONDS = float(os.environ.get('REPLICA_STICKY_SECONDS', 5.0))
+    REPLICA_MAX_LAG_SECONDS = float(os.environ.get('REPLICA_MAX_LAG_SECONDS', 10.0))
+    REPLICA_CHECK_INTERVAL = float(os.environ.get('REPLICA_CHECK_INTERVAL', 5.0))
+    
+    # Pool de conexiones: perfil 'dev', 'prod' o 'pgbouncer' (ver app/core/pooling.py).
+    # Los tamaños vacíos toman el valor del perfil
+    DB_POOL_PROFILE = os.environ.get('DB_POOL_PROFILE', 'dev')
+    DB_POOL_SIZE = os.environ.get('DB_POOL_SIZE')
+    DB_MAX_OVERFLOW = os.environ.get('DB_MAX_OVERFLOW')
+    DB_POOL_TIMEOUT = os.environ.get('DB_POOL_TIMEOUT')
+    DB_POOL_RECYCLE = os.environ.get('DB_POOL_RECYCLE')
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 30000))
+    DB_LOCK_TIMEOUT_MS = int(os.environ.get('DB_LOCK_TIMEOUT_MS', 5000))
+    # Checkouts que esperan más que esto se cuentan como lentos y se avisan en el log
+    DB_SLOW_CHECKOUT_MS = float(os.environ.get('DB_SLOW_CHECKOUT_MS', 100))
+    
     # JWT Configuration
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-string'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
+    # Cada cuántos segundos cada proceso trae las revocaciones hechas por otros
+    JWT_REVOCATION_SYNC_INTERVAL = float(os.environ.get('JWT_REVOCATION_SYNC_INTERVAL', 5.0))
     
     # OAuth Configuration
     GOOGLE_CLIENT_ID = os.environ.get('GOOGLE_CLIENT_ID')
     GOOGLE_CLIENT_SECRET = os.environ.get('GOOGLE_CLIENT_SECRET')
-    GOOGLE_DISCOVERY_URL = "https://accounts.google.com/.well-known/openid-connect-configuration"
+    GOOGLE_DISCOVERY_URL = os.environ.get(
+        'GOOGLE_DISCOVERY_URL', 'https://accounts.google.com/.well-known/openid-configuration'
+    )
+    # Claves públicas para verificar ID tokens localmente (se cachean en memoria y en disco)
+    GOOGLE_JWKS_URL = os.environ.get('GOOGLE_JWKS_URL', 'https://www.googleapis.com/oauth2/v3/certs')
+    GOOGLE_JWKS_CACHE_PATH = os.environ.get(
+        'GOOGLE_JWKS_CACHE_PATH', os.path.join(tempfile.gettempdir(), 'veridian_google_jwks.json')
+    )
+    GOOGLE_JWKS_TIMEOUT = float(os.environ.get('GOOGLE_JWKS_TIMEOUT', 5.0))
+    
+    # Carga masiva de personas
+    PERSONAS_BULK_CHUNK_SIZE = int(os.environ.get('PERSONAS_BULK_CHUNK_SIZE', 1000))
+    PERSONAS_BULK_MAX_ERRORS = int(os.environ.get('PERSONAS_BULK_MAX_ERRORS', 1000))
+    
+    # Máximo de CIs por consulta en lote
+    PERSONAS_BATCH_MAX = int(os.environ.get('PERSONAS_BATCH_MAX', 5000))
+    
+    # Exportación de personas (filas por lectura del cursor del servidor)
+    PERSONAS_EXPORT_BATCH_SIZE = int(os.environ.get('PERSONAS_EXPORT_BATCH_SIZE', 1000))
+    
+    # Caché de respuestas de lectura ('memory', 'null' o 'paquete.modulo:Clase')
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory')
+    CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', 1024))
+    CACHE_DEFAULT_TTL = int(os.environ.get('CACHE_DEFAULT_TTL', 30))
+    
+    # Caché del estado (rol, activo) de los usuarios autenticados
+    AUTH_USER_CACHE_TTL = int(os.environ.get('AUTH_USER_CACHE_TTL', 60))
+    AUTH_USER_CACHE_MAX_ENTRIES = int(os.environ.get('AUTH_USER_CACHE_MAX_ENTRIES', 10000))
+    # Confiar en los claims 'rol'/'activo' del access token y omitir la consulta
+    AUTH_TRUST_TOKEN_CLAIMS = os.environ.get('AUTH_TRUST_TOKEN_CLAIMS', 'false').lower() == 'true'
+    
+    # Hashing de contraseñas (los hashes con otro costo se regeneran al iniciar sesión)
+    BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', 12))
+    BCRYPT_MAX_CONCURRENCY = int(os.environ.get('BCRYPT_MAX_CONCURRENCY', max(1, (os.cpu_count() or 2) // 2)))
+    BCRYPT_QUEUE_TIMEOUT = float(os.environ.get('BCRYPT_QUEUE_TIMEOUT', 2.0))
+    
+    # Escritura diferida de ultimo_acceso (cada N segundos o al acumular M usuarios)
+    LAST_ACCESS_FLUSH_INTERVAL = float(os.environ.get('LAST_ACCESS_FLUSH_INTERVAL', 5.0))
+    LAST_ACCESS_FLUSH_MAX_PENDING = int(os.environ.get('LAST_ACCESS_FLUSH_MAX_PENDING', 500))
+    
+    # Limitación de tasa por endpoint ('blueprint.funcion') o blueprint; el más específico gana.
+    # La regla de un blueprint es un bucket compartido por sus endpoints; {} exime a un endpoint.
+    # 'ip' limita por dirección de origen y 'account' por el campo 'correo' del cuerpo JSON.
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    RATE_LIMIT_SHARDS = int(os.environ.get('RATE_LIMIT_SHARDS', 16))
+    RATE_LIMITS = {
+        'auth.login': {'ip': '20/minute', 'account': '5/minute'},
+        'auth.register': {'ip': '5/minute', 'account': '3/minute'},
+        'auth.google_user_auth': {'ip': '20/minute'},
+        # Sesión ya autenticada: sin el límite del blueprint
+        'auth.get_current_user': {},
+        'auth.verify_token': {},
+        'auth.refresh': {},
+        'auth': {'ip': '120/minute'},
+    }
+    
+    # Proxies inversos de confianza delante de la aplicación: cuántos valores de
+    # X-Forwarded-For / X-Forwarded-Proto tomar (0 = no hay proxy). Sin esto
+    # request.remote_addr es la IP del proxy para todos los clientes.
+    PROXY_FIX_X_FOR = int(os.environ.get('PROXY_FIX_X_FOR', 0))
+    PROXY_FIX_X_PROTO = int(os.environ.get('PROXY_FIX_X_PROTO', 0))
+    
+    # Cliente HTTP saliente (OAuth, JWKS y servicios externos)
+    HTTP_CONNECT_TIMEOUT = float(os.environ.get('HTTP_CONNECT_TIMEOUT', 3.05))
+    HTTP_READ_TIMEOUT = float(os.environ.get('HTTP_READ_TIMEOUT', 10.0))
+    HTTP_MAX_RETRIES = int(os.environ.get('HTTP_MAX_RETRIES', 2))
+    HTTP_POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE', 10))
+    HTTP_BREAKER_FAILURES = int(os.environ.get('HTTP_BREAKER_FAILURES', 5))
+    HTTP_BREAKER_RESET_TIMEOUT = float(os.environ.get('HTTP_BREAKER_RESET_TIMEOUT', 30.0))
+    
+    # Tiempos por petición (encabezado Server-Timing y línea de log); sin costo si está apagado.
+    # Solo se registran en el log las peticiones de al menos REQUEST_TIMING_LOG_MS.
+    REQUEST_TIMING = os.environ.get('REQUEST_TIMING', 'false').lower() == 'true'
+    REQUEST_TIMING_LOG_MS = float(os.environ.get('REQUEST_TIMING_LOG_MS', 0))
     
     # CORS
     CORS_ORIGINS = os.environ.get('CORS_ORIGINS', 'http://localhost:5173').split(',')
     
+    # Especificación OpenAPI precalculada (flask openapi build); por defecto en instance/openapi
+    OPENAPI_SPEC_DIR = os.environ.get('OPENAPI_SPEC_DIR')
+    OPENAPI_SPEC_MAX_AGE = int(os.environ.get('OPENAPI_SPEC_MAX_AGE', 86400))
+    
     # Swagger Configuration
     SWAGGER = {
         'title': 'Sistema de Gestión del Edificio Multifuncional',
@@ -81,11 +187,23 @@ class ProductionConfig(Config):
     """Configuración para producción"""
     DEBUG = False
     FLASK_ENV = 'production'
+    AUTO_CREATE_TABLES = False
+    DB_POOL_PROFILE = os.environ.get('DB_POOL_PROFILE', 'prod')
+    FAST_STARTUP = os.environ.get('FAST_STARTUP', 'true').lower() == 'true'
+    # La caché en memoria es por worker: una escritura no invalida la de los
+    # demás. Sin un backend compartido (CACHE_BACKEND='paquete.modulo:Clase')
+    # la caché de respuestas queda desactivada
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'null')
 
 class TestingConfig(Config):
     """Configuración para testing"""
     TESTING = True
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    # TEST_DATABASE_URL permite correr las pruebas de PostgreSQL (COPY, etc.)
+    SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL', 'sqlite:///:memory:')
+    AUTO_CREATE_TABLES = True
+    DB_POOL_PROFILE = None
+    DATABASE_REPLICA_URLS = []
+    BCRYPT_ROUNDS = 4
 
 config = {
     'development': DevelopmentConfig,
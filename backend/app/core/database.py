@@ -2,23 +2,83 @@
 Configuración central de la base de datos
 """
 
+import click
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
-from flasgger import Swagger
 
-# Extensiones
-db = SQLAlchemy()
-migrate = Migrate()
+from app.core.replicas import RoutingSession, replica_binds
+
+# Extensiones (Swagger se registra en app.core.docs)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 jwt = JWTManager()
 cors = CORS()
-swagger = Swagger()
 
 def init_extensions(app):
     """Inicializar todas las extensiones"""
+    from app.core.pooling import engine_options, init_pool_instrumentation
+
+    # Flask-SQLAlchemy no aplica SQLALCHEMY_ENGINE_OPTIONS a los binds dados
+    # como URL: cada réplica recibe las opciones del perfil explícitamente
+    replicas = {
+        name: {'url': url, **engine_options(app.config, url)}
+        for name, url in replica_binds(app.config['DATABASE_REPLICA_URLS']).items()
+    }
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config)
+    app.config['SQLALCHEMY_BINDS'] = {
+        **(app.config.get('SQLALCHEMY_BINDS') or {}),
+        **replicas
+    }
     db.init_app(app)
-    migrate.init_app(app, db)
+    init_pool_instrumentation(app, db)
     jwt.init_app(app)
     cors.init_app(app)
-    swagger.init_app(app)
\ No newline at end of file
+
+    # Flask-Migrate importa Alembic; con FAST_STARTUP solo se carga para
+    # comandos de la CLI (flask db ...), no al arrancar el servidor
+    if not app.config['FAST_STARTUP'] or click.get_current_context(silent=True) is not None:
+        from flask_migrate import Migrate
+        Migrate(app, db)
+
+
+def reset_after_fork(app):
+    """
+    Descartar en un worker recién creado las conexiones heredadas del proceso padre
+
+    Con la aplicación precargada (gunicorn --preload) el proceso maestro pudo
+    abrir conexiones al crearla; compartir el mismo socket entre procesos
+    corrompe el protocolo. close=False deja esas conexiones intactas para el
+    padre y el worker abre las suyas en un pool nuevo.
+
+    Args:
+        app: Aplicación Flask
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+
+def sqlstate(error):
+    """
+    SQLSTATE de PostgreSQL de un error de SQLAlchemy (None si el driver no lo expone)
+    
+    Args:
+        error: sqlalchemy.exc.DBAPIError
+    """
+    orig = getattr(error, 'orig', None)
+    # pgcode en psycopg2, sqlstate en psycopg 3
+    return getattr(orig, 'pgcode', None) or getattr(orig, 'sqlstate', None)
+
+
+def is_unique_violation(error):
+    """
+    Indica si un IntegrityError proviene de una restricción única / clave primaria
+    
+    Args:
+        error: sqlalchemy.exc.IntegrityError
+    """
+    # PostgreSQL: unique_violation
+    if sqlstate(error) == '23505':
+        return True
+    # SQLite
+    return 'UNIQUE constraint failed' in str(getattr(error, 'orig', None))
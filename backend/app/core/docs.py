@@ -0,0 +1,357 @@
+"""
+Documentación Swagger (flasgger)
+
+Los blueprints declaran sus especificaciones con swag_from, que solo anota la
+vista (lo mismo que hace flasgger con especificaciones en dict) sin importar
+flasgger. Con FAST_STARTUP la interfaz /docs/ vive en una aplicación aparte
+que se construye con la primera petición a esas rutas: arrancar un worker no
+importa flasgger/jsonschema ni registra su blueprint.
+
+El JSON de la especificación (/apispec_1.json) no se genera por petición: se
+construye una vez (en el despliegue con `flask openapi build` o con la
+primera petición), se guarda como bytes junto con sus variantes gzip y
+brotli en memoria y en disco, y se sirve con ETag y Cache-Control de larga
+duración. El archivo en disco lleva la huella de la tabla de rutas y de las
+especificaciones; solo se regenera cuando esa huella cambia.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+
+import click
+from flask.cli import AppGroup
+from werkzeug.wrappers import Request, Response
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependencia opcional
+    brotli = None
+
+
+def swag_from(specs):
+    """
+    Asociar una especificación Swagger (dict) a una vista
+
+    Equivalente a flasgger.swag_from para dicts, sin envolver la vista.
+    """
+    def decorator(function):
+        function.specs_dict = specs
+        return function
+    return decorator
+
+
+def _docs_prefixes(swagger_config):
+    """Rutas de la interfaz de flasgger según Config.SWAGGER"""
+    return (
+        swagger_config.get('specs_route', '/apidocs/').rstrip('/'),
+        swagger_config.get('static_url_path') or '/flasgger_static',
+        swagger_config.get('oauth_redirect', '/oauth2-redirect.html'),
+    )
+
+
+def _spec_routes(swagger_config):
+    """Ruta -> endpoint de cada especificación configurada"""
+    return {spec['route']: spec['endpoint'] for spec in swagger_config.get('specs', [])}
+
+
+# ---------- Especificación precalculada ----------
+
+SpecArtifact = namedtuple('SpecArtifact', ['fingerprint', 'etag', 'variants', 'built_ms'])
+
+
+class OpenAPISpecCache:
+    """
+    Especificaciones OpenAPI serializadas y precomprimidas
+
+    Args:
+        app: Aplicación principal
+        get_swagger: Función que devuelve la instancia de flasgger (solo se
+            llama si hay que construir la especificación)
+        directory: Carpeta donde se guardan los artefactos
+        max_age: Segundos de Cache-Control: max-age
+    """
+
+    def __init__(self, app, get_swagger, directory, max_age=86400):
+        self.app = app
+        self.get_swagger = get_swagger
+        self.directory = directory
+        self.max_age = max_age
+        self._artifacts = {}  # endpoint -> SpecArtifact
+        self._fingerprint = None
+        self._lock = threading.Lock()
+        self.builds = 0
+        self.disk_loads = 0
+        self.not_modified = 0
+        self.served = {}  # codificación -> respuestas
+
+    def fingerprint(self):
+        """Huella de la tabla de rutas, las especificaciones de cada vista y Config.SWAGGER"""
+        if self._fingerprint is None:
+            swagger_config = self.app.config['SWAGGER']
+            ui_prefix = swagger_config.get('endpoint', 'flasgger') + '.'
+            digest = hashlib.sha256()
+            for rule in sorted(self.app.url_map.iter_rules(), key=lambda r: (r.rule, r.endpoint)):
+                if rule.endpoint.startswith(ui_prefix):
+                    continue
+                digest.update(repr((rule.rule, rule.endpoint, sorted(rule.methods or ()))).encode('utf-8'))
+                specs = getattr(self.app.view_functions.get(rule.endpoint), 'specs_dict', None)
+                if specs:
+                    digest.update(json.dumps(specs, sort_keys=True, default=str).encode('utf-8'))
+            digest.update(json.dumps(swagger_config, sort_keys=True, default=_qualname).encode('utf-8'))
+            self._fingerprint = digest.hexdigest()[:16]
+        return self._fingerprint
+
+    def get(self, endpoint):
+        """Artefacto de la especificación (desde memoria, disco o construyéndolo)"""
+        artifact = self._artifacts.get(endpoint)
+        if artifact is None:
+            with self._lock:
+                artifact = self._artifacts.get(endpoint)
+                if artifact is None:
+                    artifact = self._load(endpoint) or self.build(endpoint)
+                    self._artifacts[endpoint] = artifact
+        return artifact
+
+    def build(self, endpoint, save=True):
+        """Generar la especificación con flasgger, serializarla y comprimirla"""
+        inicio = time.perf_counter()
+        swagger = self.get_swagger()
+        with self.app.test_request_context():
+            spec = swagger.get_apispecs(endpoint)
+        body = json.dumps(spec, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+        artifact = SpecArtifact(
+            fingerprint=self.fingerprint(),
+            etag=hashlib.sha256(body).hexdigest()[:20],
+            variants=_compress(body),
+            built_ms=round((time.perf_counter() - inicio) * 1000, 2)
+        )
+        self.builds += 1
+        if save:
+            self._save(endpoint, artifact)
+        return artifact
+
+    def _paths(self, endpoint):
+        base = os.path.join(self.directory, endpoint)
+        return base + '.meta.json', {
+            'identity': base + '.json',
+            'gzip': base + '.json.gz',
+            'br': base + '.json.br'
+        }
+
+    def _load(self, endpoint):
+        """Artefacto guardado en disco si corresponde a la tabla de rutas actual"""
+        meta_path, paths = self._paths(endpoint)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta['fingerprint'] != self.fingerprint():
+                return None
+            variants = {}
+            for encoding in meta['variants']:
+                with open(paths[encoding], 'rb') as f:
+                    variants[encoding] = f.read()
+        except (OSError, ValueError, KeyError):
+            return None
+        # Otro worker pudo estar reescribiendo los archivos al mismo tiempo
+        if hashlib.sha256(variants.get('identity', b'')).hexdigest()[:20] != meta['etag']:
+            return None
+        if brotli is not None and 'br' not in variants:
+            variants['br'] = brotli.compress(variants['identity'], quality=11)
+        self.disk_loads += 1
+        return SpecArtifact(meta['fingerprint'], meta['etag'], variants, meta.get('built_ms'))
+
+    def _save(self, endpoint, artifact):
+        meta_path, paths = self._paths(endpoint)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Escritura atómica: otros workers pueden estar leyendo los archivos
+            for encoding, body in artifact.variants.items():
+                _write_atomic(paths[encoding], body)
+            meta = {
+                'fingerprint': artifact.fingerprint,
+                'etag': artifact.etag,
+                'variants': sorted(artifact.variants),
+                'built_ms': artifact.built_ms
+            }
+            _write_atomic(meta_path, json.dumps(meta).encode('utf-8'))
+        except OSError as e:
+            self.app.logger.warning('No se pudo guardar la especificación en %s: %s', self.directory, e)
+
+    def response(self, request, endpoint):
+        """
+        Respuesta con la variante que acepta el cliente (o 304 si ya la tiene)
+
+        Args:
+            request: Petición de werkzeug/Flask
+            endpoint: Endpoint de la especificación ('apispec_1')
+        """
+        artifact = self.get(endpoint)
+        encoding = _negotiate(request, artifact.variants)
+        etag = artifact.etag if encoding == 'identity' else f'{artifact.etag}-{encoding}'
+
+        if request.if_none_match.contains(etag):
+            self.not_modified += 1
+            response = Response(status=304)
+        else:
+            self.served[encoding] = self.served.get(encoding, 0) + 1
+            response = Response(artifact.variants[encoding], mimetype='application/json')
+            if encoding != 'identity':
+                response.headers['Content-Encoding'] = encoding
+        response.set_etag(etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = self.max_age
+        response.vary.add('Accept-Encoding')
+        return response
+
+    def stats(self):
+        return {
+            'fingerprint': self._fingerprint,
+            'specs': {
+                endpoint: {
+                    'etag': artifact.etag,
+                    'built_ms': artifact.built_ms,
+                    'bytes': {encoding: len(body) for encoding, body in artifact.variants.items()}
+                }
+                for endpoint, artifact in self._artifacts.items()
+            },
+            'builds': self.builds,
+            'disk_loads': self.disk_loads,
+            'served': dict(self.served),
+            'not_modified': self.not_modified
+        }
+
+
+def _qualname(value):
+    """Serializar los rule_filter/model_filter de Config.SWAGGER para la huella"""
+    return getattr(value, '__qualname__', repr(value))
+
+
+def _compress(body):
+    variants = {'identity': body, 'gzip': gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['br'] = brotli.compress(body, quality=11)
+    return variants
+
+
+def _negotiate(request, variants):
+    """Codificación preferida entre las disponibles (br > gzip > sin comprimir)"""
+    accept = request.accept_encodings
+    for encoding in ('br', 'gzip'):
+        if encoding in variants and accept[encoding] > 0:
+            return encoding
+    return 'identity'
+
+
+def _write_atomic(path, body):
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(body)
+    os.replace(tmp_path, path)
+
+
+# ---------- Registro ----------
+
+class LazyDocsMiddleware:
+    """
+    Atender la documentación sin cargar flasgger al arrancar
+
+    La especificación se sirve desde OpenAPISpecCache; la interfaz /docs/ se
+    despacha a una aplicación construida al primer uso, cuya especificación
+    se genera dentro del contexto de la aplicación principal para que
+    flasgger vea sus rutas y vistas.
+    """
+
+    def __init__(self, app, wsgi_app):
+        self.app = app
+        self.wsgi_app = wsgi_app
+        self.prefixes = _docs_prefixes(app.config['SWAGGER'])
+        self.spec_routes = _spec_routes(app.config['SWAGGER'])
+        self._docs_app = None
+        self._lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        endpoint = self.spec_routes.get(path)
+        if endpoint is not None and environ['REQUEST_METHOD'] in ('GET', 'HEAD'):
+            response = self.app.extensions['openapi_spec'].response(Request(environ), endpoint)
+            return response(environ, start_response)
+        if path.startswith(self.prefixes):
+            return self.docs_app(environ, start_response)
+        return self.wsgi_app(environ, start_response)
+
+    @property
+    def docs_app(self):
+        if self._docs_app is None:
+            with self._lock:
+                if self._docs_app is None:
+                    self._docs_app = self._build()
+        return self._docs_app
+
+    def swagger(self):
+        """Instancia de flasgger (construye la aplicación de documentación si hace falta)"""
+        return self.docs_app and self.app.extensions['swagger']
+
+    def _build(self):
+        from flask import Flask
+        from flasgger import Swagger
+
+        main_app = self.app
+
+        class MainAppSwagger(Swagger):
+            def get_apispecs(self, endpoint='apispec_1'):
+                with main_app.app_context():
+                    return super().get_apispecs(endpoint)
+
+        docs_app = Flask(__name__)
+        docs_app.config.update(main_app.config)
+        main_app.extensions['swagger'] = MainAppSwagger(docs_app)
+        return docs_app
+
+
+openapi_cli = AppGroup('openapi', help='Especificación OpenAPI precalculada')
+
+
+@openapi_cli.command('build')
+def build_spec_command():
+    """Generar y guardar la especificación (paso de despliegue)"""
+    from flask import current_app
+
+    cache = current_app.extensions['openapi_spec']
+    for endpoint in _spec_routes(current_app.config['SWAGGER']).values():
+        artifact = cache.build(endpoint)
+        tamanos = ', '.join(f'{encoding}={len(body)}B' for encoding, body in sorted(artifact.variants.items()))
+        click.echo(f'{endpoint}: {tamanos} en {artifact.built_ms:.0f}ms '
+                   f'(huella {artifact.fingerprint}, ETag {artifact.etag}) -> {cache.directory}')
+
+
+def init_docs(app):
+    """Registrar la documentación Swagger (de inmediato o al primer uso con FAST_STARTUP)"""
+    from app.utils.metrics import register_metrics
+
+    directory = app.config['OPENAPI_SPEC_DIR'] or os.path.join(app.instance_path, 'openapi')
+    if app.config['FAST_STARTUP']:
+        middleware = LazyDocsMiddleware(app, app.wsgi_app)
+        app.wsgi_app = middleware
+        get_swagger = middleware.swagger
+    else:
+        from flask import request
+        from flasgger import Swagger
+
+        swagger = app.extensions['swagger'] = Swagger(app)
+        get_swagger = lambda: swagger  # noqa: E731
+        # Reemplazar la vista de flasgger (serializa la especificación en cada petición)
+        ui_endpoint = app.config['SWAGGER'].get('endpoint', 'flasgger')
+        for endpoint in _spec_routes(app.config['SWAGGER']).values():
+            app.view_functions[f'{ui_endpoint}.{endpoint}'] = (
+                lambda endpoint=endpoint: app.extensions['openapi_spec'].response(request, endpoint)
+            )
+
+    cache = OpenAPISpecCache(app, get_swagger, directory, max_age=app.config['OPENAPI_SPEC_MAX_AGE'])
+    app.extensions['openapi_spec'] = cache
+    app.cli.add_command(openapi_cli)
+    register_metrics(app, 'openapi_spec', cache.stats)
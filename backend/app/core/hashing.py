@@ -0,0 +1,166 @@
+"""
+Hashing de contraseñas con concurrencia acotada
+
+bcrypt libera el GIL y se ejecuta en el hilo de la petición, pero con un
+máximo de hashes simultáneos por proceso (BCRYPT_MAX_CONCURRENCY). Una ráfaga
+de logins ya no ocupa todos los núcleos ni compite por la CPU con el resto de
+endpoints: las peticiones que exceden el cupo esperan como máximo
+BCRYPT_QUEUE_TIMEOUT segundos y luego se rechazan con HashingBusyError
+(503 + Retry-After).
+
+Un hash solo se regenera al subir el costo configurado: bajar BCRYPT_ROUNDS
+no debilita los hashes existentes.
+"""
+
+import math
+import os
+import threading
+import time
+
+import bcrypt
+from flask import current_app, has_app_context
+
+
+class HashingBusyError(Exception):
+    """No hay cupo para hashear dentro del tiempo de espera configurado"""
+
+    def __init__(self, retry_after):
+        super().__init__('Servicio de autenticación saturado, intente nuevamente')
+        self.retry_after = retry_after
+
+
+def hash_rounds(password_hash):
+    """
+    Costo (log2 de rondas) con el que se generó un hash bcrypt
+
+    Returns:
+        Entero o None si el hash no tiene el formato $2b$<costo>$...
+    """
+    try:
+        return int(password_hash.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+class PasswordHasher:
+    """Hashing bcrypt con concurrencia acotada y métricas"""
+
+    def __init__(self, rounds=12, max_concurrency=2, queue_timeout=2.0):
+        self.rounds = rounds
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self.observer = None  # observer(espera, trabajo) en segundos, tras cada hash
+        self.completed = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self.waiting = 0
+        self._wait_seconds = 0.0
+        self._work_seconds = 0.0
+
+    def _get_slots(self):
+        """Cupos del proceso actual (un fork no hereda los hashes en curso del padre)"""
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._slots = threading.BoundedSemaphore(self.max_concurrency)
+                    self._pid = os.getpid()
+        return self._slots
+
+    def _run(self, fn, *args):
+        """Ejecutar fn esperando cupo como máximo queue_timeout segundos"""
+        slots = self._get_slots()
+        inicio = time.perf_counter()
+        with self._lock:
+            self.waiting += 1
+        try:
+            acquired = slots.acquire(timeout=self.queue_timeout)
+        finally:
+            with self._lock:
+                self.waiting -= 1
+        if not acquired:
+            with self._lock:
+                self.rejected += 1
+            raise HashingBusyError(self.retry_after())
+
+        inicio_trabajo = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            slots.release()
+            fin = time.perf_counter()
+            with self._lock:
+                self.completed += 1
+                self._wait_seconds += inicio_trabajo - inicio
+                self._work_seconds += fin - inicio_trabajo
+            if self.observer is not None:
+                self.observer(inicio_trabajo - inicio, fin - inicio_trabajo)
+
+    def hash(self, password):
+        """Generar el hash bcrypt de una contraseña con el costo configurado"""
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        return self._run(bcrypt.hashpw, password.encode('utf-8'), salt).decode('utf-8')
+
+    def verify(self, password, password_hash):
+        """Verificar una contraseña contra su hash"""
+        return self._run(bcrypt.checkpw, password.encode('utf-8'), password_hash.encode('utf-8'))
+
+    def rehash(self, password):
+        """Regenerar con el costo actual el hash de una contraseña ya verificada"""
+        password_hash = self.hash(password)
+        with self._lock:
+            self.rehashed += 1
+        return password_hash
+
+    def needs_rehash(self, password_hash):
+        """Indica si el hash se generó con un costo menor al configurado"""
+        rounds = hash_rounds(password_hash)
+        return rounds is not None and rounds < self.rounds
+
+    def retry_after(self):
+        """Segundos sugeridos al cliente antes de reintentar"""
+        promedio = self._work_seconds / self.completed if self.completed else 0.25
+        pendientes = self.waiting / self.max_concurrency
+        return max(1, math.ceil(promedio * pendientes))
+
+    def stats(self):
+        with self._lock:
+            completados = self.completed
+            return {
+                'rounds': self.rounds,
+                'max_concurrency': self.max_concurrency,
+                'waiting': self.waiting,
+                'completed': completados,
+                'rejected': self.rejected,
+                'rehashed': self.rehashed,
+                'avg_wait_ms': round(self._wait_seconds / completados * 1000, 2) if completados else None,
+                'avg_hash_ms': round(self._work_seconds / completados * 1000, 2) if completados else None
+            }
+
+
+# Usado fuera de un contexto de aplicación (scripts, consola)
+_default_hasher = PasswordHasher()
+
+
+def init_password_hasher(app):
+    """Crear el hasher con la configuración de la aplicación"""
+    # Import local: app.utils importa los modelos, que a su vez usan este módulo
+    from app.utils.metrics import register_metrics
+
+    hasher = PasswordHasher(
+        rounds=app.config['BCRYPT_ROUNDS'],
+        max_concurrency=app.config['BCRYPT_MAX_CONCURRENCY'],
+        queue_timeout=app.config['BCRYPT_QUEUE_TIMEOUT']
+    )
+    app.extensions['password_hasher'] = hasher
+    register_metrics(app, 'password_hashing', hasher.stats)
+    return hasher
+
+
+def get_password_hasher():
+    """Hasher de la aplicación actual"""
+    if has_app_context():
+        return current_app.extensions.get('password_hasher', _default_hasher)
+    return _default_hasher
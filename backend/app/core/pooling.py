@@ -0,0 +1,247 @@
+"""
+Perfiles del pool de conexiones de SQLAlchemy
+
+DB_POOL_PROFILE elige un perfil con nombre que se traduce en
+SQLALCHEMY_ENGINE_OPTIONS:
+
+  - dev:       un proceso con threaded=True; pool chico con pre-ping
+  - prod:      varios workers; pool por worker acotado, pre-ping, recycle y
+               LIFO (las conexiones sobrantes quedan ociosas y se reciclan)
+  - pgbouncer: PgBouncer en modo transaction; sin pool local (NullPool), sin
+               sentencias preparadas del lado del servidor y con los
+               timeouts fijados por transacción (SET LOCAL), porque en ese
+               modo los parámetros de sesión no se conservan
+
+Todos los perfiles fijan statement_timeout y lock_timeout por conexión en
+PostgreSQL. Los pools (primario y réplicas) registran cuánto espera cada
+checkout, así que un pool agotado aparece en /metrics ('db_pool') y en el log en lugar de como
+latencia aleatoria. Cualquier clave de SQLALCHEMY_ENGINE_OPTIONS definida
+explícitamente tiene prioridad sobre el perfil.
+"""
+
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool, QueuePool
+
+
+class CheckoutStats:
+    """Tiempos de espera de checkout de un pool"""
+
+    def __init__(self, slow_ms=100.0, window=1024, logger=None, warn_interval=10.0):
+        self.slow_ms = slow_ms
+        self.logger = logger
+        self.warn_interval = warn_interval
+        self._last_warning = 0.0
+        self.checkouts = 0
+        self.slow = 0
+        self.timeouts = 0
+        self.max_wait_ms = 0.0
+        self.total_wait_ms = 0.0
+        self._recent = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, wait_ms, pool_status):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_ms += wait_ms
+            self._recent.append(wait_ms)
+            if wait_ms > self.max_wait_ms:
+                self.max_wait_ms = wait_ms
+            if wait_ms < self.slow_ms:
+                return
+            self.slow += 1
+            now = time.monotonic()
+            # Con el pool agotado todos los checkouts son lentos: un aviso cada warn_interval
+            if self.logger is None or now - self._last_warning < self.warn_interval:
+                return
+            self._last_warning = now
+        self.logger.warning('Checkout lento del pool de conexiones: %.1fms (%s)', wait_ms, pool_status())
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self):
+        with self._lock:
+            recent = sorted(self._recent)
+            checkouts = self.checkouts
+            stats = {
+                'checkouts': checkouts,
+                'avg_wait_ms': round(self.total_wait_ms / checkouts, 3) if checkouts else None,
+                'max_wait_ms': round(self.max_wait_ms, 3),
+                'slow_checkouts': self.slow,
+                'slow_threshold_ms': self.slow_ms,
+                'timeouts': self.timeouts
+            }
+        if recent:
+            stats['p50_wait_ms'] = round(recent[len(recent) // 2], 3)
+            stats['p99_wait_ms'] = round(recent[min(len(recent) - 1, int(len(recent) * 0.99))], 3)
+        return stats
+
+
+class _TimedPoolMixin:
+    """Medir la espera de cada checkout (incluye abrir la conexión si hace falta)"""
+
+    stats = None
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            if self.stats is not None:
+                self.stats.record_timeout()
+            raise
+        if self.stats is not None:
+            self.stats.record((time.perf_counter() - inicio) * 1000, self.status)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() y los forks crean un pool nuevo: conservar las métricas
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    """QueuePool que registra la espera de checkout"""
+
+
+class TimedNullPool(_TimedPoolMixin, NullPool):
+    """NullPool que registra el tiempo de conexión (la cola de PgBouncer aparece aquí)"""
+
+
+POOL_PROFILES = {
+    'dev': {
+        'poolclass': TimedQueuePool,
+        'pool_size': 5,
+        'max_overflow': 10,
+        'pool_timeout': 10,
+        'pool_recycle': 1800,
+        'pool_pre_ping': True,
+    },
+    'prod': {
+        'poolclass': TimedQueuePool,
+        'pool_size': 10,
+        'max_overflow': 5,
+        'pool_timeout': 5,
+        'pool_recycle': 1800,
+        'pool_pre_ping': True,
+        'pool_use_lifo': True,
+    },
+    'pgbouncer': {
+        'poolclass': TimedNullPool,
+    },
+}
+
+
+def engine_options(config, url=None):
+    """
+    Construir SQLALCHEMY_ENGINE_OPTIONS a partir de DB_POOL_PROFILE
+
+    Args:
+        config: app.config
+        url: URL del engine (por defecto SQLALCHEMY_DATABASE_URI; las réplicas
+             pasan la suya)
+
+    Returns:
+        Opciones para create_engine (las explícitas de la configuración ganan)
+    """
+    explicit = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    profile_name = config.get('DB_POOL_PROFILE')
+    url = make_url(url or config['SQLALCHEMY_DATABASE_URI'])
+    # SQLite en memoria usa StaticPool (lo fija Flask-SQLAlchemy): no hay pool que ajustar
+    if not profile_name or (url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')):
+        return explicit
+    if profile_name not in POOL_PROFILES:
+        raise ValueError(f'Perfil de pool desconocido: {profile_name} (opciones: {", ".join(POOL_PROFILES)})')
+
+    options = dict(POOL_PROFILES[profile_name])
+    if options['poolclass'] is TimedQueuePool:
+        for key, setting in (('pool_size', 'DB_POOL_SIZE'), ('max_overflow', 'DB_MAX_OVERFLOW'),
+                             ('pool_timeout', 'DB_POOL_TIMEOUT'), ('pool_recycle', 'DB_POOL_RECYCLE')):
+            if config.get(setting):
+                options[key] = int(config[setting])
+
+    if url.get_backend_name() == 'postgresql':
+        connect_args = {}
+        if profile_name == 'pgbouncer':
+            # psycopg 3 prepara sentencias tras varias ejecuciones; en modo
+            # transaction la sentencia preparada puede no existir en el servidor
+            # asignado. psycopg2 no usa sentencias preparadas.
+            if url.get_driver_name() == 'psycopg':
+                connect_args['prepare_threshold'] = None
+        else:
+            # Parámetros de arranque de libpq: sin viaje extra por conexión
+            connect_args['options'] = ' '.join(
+                f'-c {name}={value}' for name, value in _timeouts(config).items()
+            )
+        options['connect_args'] = connect_args
+
+    options.update(explicit)
+    return options
+
+
+def _timeouts(config):
+    return {
+        'statement_timeout': int(config['DB_STATEMENT_TIMEOUT_MS']),
+        'lock_timeout': int(config['DB_LOCK_TIMEOUT_MS']),
+    }
+
+
+def init_pool_instrumentation(app, db):
+    """
+    Conectar métricas y timeouts por transacción a todos los engines ya creados
+
+    El primario y cada réplica (binds de Flask-SQLAlchemy) tienen su propio
+    pool: cada uno registra sus checkouts y, con PgBouncer, fija los timeouts
+    al iniciar cada transacción.
+
+    Args:
+        app: Aplicación Flask
+        db: Instancia de Flask-SQLAlchemy
+    """
+    from app.utils.metrics import register_metrics
+
+    with app.app_context():
+        engines = dict(db.engines)
+
+    set_local = None
+    if app.config.get('DB_POOL_PROFILE') == 'pgbouncer':
+        set_local = ';'.join(f"SET LOCAL {name} = {value}" for name, value in _timeouts(app.config).items())
+
+    for engine in engines.values():
+        if isinstance(engine.pool, _TimedPoolMixin):
+            engine.pool.stats = CheckoutStats(slow_ms=app.config['DB_SLOW_CHECKOUT_MS'], logger=app.logger)
+        if set_local is not None and engine.dialect.name == 'postgresql':
+            event.listen(engine, 'begin', _set_local_listener(set_local))
+
+    def stats():
+        data = {'profile': app.config.get('DB_POOL_PROFILE')}
+        data.update(_pool_stats(engines[None]))
+        binds = {name: _pool_stats(engine) for name, engine in engines.items() if name is not None}
+        if binds:
+            data['binds'] = binds
+        return data
+
+    register_metrics(app, 'db_pool', stats)
+
+
+def _set_local_listener(set_local):
+    """Listener 'begin' que fija los timeouts de la transacción (SET LOCAL)"""
+    def _set_timeouts(connection):
+        connection.exec_driver_sql(set_local)
+    return _set_timeouts
+
+
+def _pool_stats(engine):
+    """Estado y esperas de checkout del pool actual del engine"""
+    current = engine.pool
+    data = {'pool': current.status()}
+    if getattr(current, 'stats', None) is not None:
+        data.update(current.stats.snapshot())
+    return data
@@ -0,0 +1,236 @@
+"""
+Réplicas de lectura
+
+Con DATABASE_REPLICA_URLS cada réplica se registra como un bind de
+Flask-SQLAlchemy ('replica_0', 'replica_1', ...). Las vistas marcadas con
+@read_only envían sus SELECT a una réplica sana elegida al comienzo de la
+petición; todo lo demás (escrituras, SELECT ... FOR UPDATE, vistas sin
+marcar) sigue yendo al primario.
+
+Lectura de las propias escrituras: después de una petición que escribe
+(método distinto de GET/HEAD/OPTIONS con respuesta exitosa) el cliente queda
+fijado al primario durante REPLICA_STICKY_SECONDS. Se recuerda por dirección
+de origen en este proceso y con una cookie para los demás workers.
+
+Un hilo de fondo mide el retraso de cada réplica cada REPLICA_CHECK_INTERVAL
+segundos; las que superan REPLICA_MAX_LAG_SECONDS o no responden salen de la
+rotación hasta la siguiente medición correcta. Sin réplicas sanas se lee del
+primario.
+"""
+
+import math
+import os
+import random
+import threading
+import time
+
+from flask import g, has_app_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import text
+
+
+STICKY_COOKIE = 'db_primary_until'
+
+_SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Retraso de una réplica de PostgreSQL: 0 si está al día con lo recibido
+# (pg_last_xact_replay_timestamp envejece en un primario sin escrituras)
+_PG_LAG_QUERY = text(
+    'SELECT CASE'
+    ' WHEN NOT pg_is_in_recovery() THEN 0'
+    ' WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0'
+    ' ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)'
+    ' END'
+)
+
+
+def replica_binds(urls):
+    """Binds de Flask-SQLAlchemy para las URLs de réplica configuradas"""
+    return {f'replica_{i}': url for i, url in enumerate(urls)}
+
+
+class RoutingSession(Session):
+    """Sesión que envía los SELECT de las vistas @read_only a la réplica elegida"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and clause is not None and has_app_context():
+            name = g.get('db_replica')
+            if name is not None and _is_plain_select(clause):
+                return self._db.engines[name]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def read_engine(db):
+    """
+    Engine para lecturas hechas fuera de la sesión (ej. cursores de streaming)
+
+    Args:
+        db: Instancia de Flask-SQLAlchemy
+
+    Returns:
+        El engine de la réplica elegida para la petición o el del primario
+    """
+    name = g.get('db_replica')
+    return db.engines[name] if name is not None else db.engine
+
+
+def _is_plain_select(clause):
+    return getattr(clause, 'is_select', False) and getattr(clause, '_for_update_arg', None) is None
+
+
+def default_lag_probe(connection):
+    """Segundos de retraso de la réplica de la conexión dada"""
+    if connection.dialect.name == 'postgresql':
+        return float(connection.execute(_PG_LAG_QUERY).scalar() or 0)
+    # Sin replicación nativa que consultar (ej. SQLite en pruebas): basta con responder
+    connection.execute(text('SELECT 1'))
+    return 0.0
+
+
+class ReplicaRouter:
+    """Elige réplica por petición, aplica la fijación al primario y vigila el retraso"""
+
+    def __init__(self, app, db, names, sticky_seconds=5.0, max_lag=10.0, check_interval=5.0,
+                 lag_probe=default_lag_probe, max_sticky_clients=10000):
+        self.app = app
+        self.db = db
+        self.names = list(names)
+        self.sticky_seconds = sticky_seconds
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.lag_probe = lag_probe
+        self.max_sticky_clients = max_sticky_clients
+        self.healthy = []  # réplicas en rotación (vacío hasta la primera medición)
+        self.lags = {}  # réplica -> segundos de retraso o None si no respondió
+        self._sticky = {}  # dirección de origen -> time.time() hasta el que lee del primario
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self.replica_reads = {name: 0 for name in self.names}
+        self.primary_reads = 0
+        self.sticky_reads = 0
+        self.removed = 0
+        self.checks = 0
+
+    # ---------- Por petición ----------
+
+    def before_request(self):
+        self._ensure_checker()
+        if not getattr(self.app.view_functions.get(request.endpoint), 'read_only', False):
+            return
+        if self._is_sticky():
+            g.db_read_your_writes = True
+            self.sticky_reads += 1
+            return
+        healthy = self.healthy
+        if not healthy:
+            self.primary_reads += 1
+            return
+        name = random.choice(healthy)
+        g.db_replica = name
+        self.replica_reads[name] += 1
+
+    def after_request(self, response):
+        if request.method in _SAFE_METHODS or response.status_code >= 400:
+            return response
+        if getattr(self.app.view_functions.get(request.endpoint), 'read_only', False):
+            # Ej. consultas en lote por POST: no escriben
+            return response
+        until = time.time() + self.sticky_seconds
+        with self._lock:
+            if len(self._sticky) >= self.max_sticky_clients:
+                now = time.time()
+                self._sticky = {key: t for key, t in self._sticky.items() if t > now}
+            self._sticky[request.remote_addr] = until
+        response.set_cookie(
+            STICKY_COOKIE, str(math.ceil(until)),
+            max_age=math.ceil(self.sticky_seconds), httponly=True, samesite='Lax'
+        )
+        return response
+
+    def _is_sticky(self):
+        now = time.time()
+        if self._sticky.get(request.remote_addr, 0) > now:
+            return True
+        try:
+            return float(request.cookies.get(STICKY_COOKIE, 0)) > now
+        except ValueError:
+            return False
+
+    # ---------- Retraso ----------
+
+    def check(self):
+        """Medir el retraso de cada réplica y actualizar la rotación"""
+        with self.app.app_context():
+            engines = self.db.engines
+        healthy = []
+        for name in self.names:
+            try:
+                with engines[name].connect() as connection:
+                    lag = self.lag_probe(connection)
+            except Exception as e:
+                lag = None
+                self.app.logger.warning('Réplica %s no disponible: %s', name, e)
+            self.lags[name] = lag
+            if lag is not None and lag <= self.max_lag:
+                healthy.append(name)
+            elif name in self.healthy:
+                self.removed += 1
+                self.app.logger.warning('Réplica %s fuera de rotación (retraso: %s)', name, lag)
+        self.healthy = healthy
+        self.checks += 1
+        return healthy
+
+    def _ensure_checker(self):
+        """Iniciar el hilo de medición en este proceso (los hilos no sobreviven a un fork)"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._thread = threading.Thread(target=self._run, name='replica-lag-checker', daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def _run(self):
+        while True:
+            try:
+                self.check()
+            except Exception as e:
+                self.app.logger.warning('No se pudo medir el retraso de las réplicas: %s', e)
+            time.sleep(self.check_interval)
+
+    def stats(self):
+        return {
+            'replicas': self.names,
+            'healthy': list(self.healthy),
+            'lag_seconds': {name: (round(lag, 3) if lag is not None else None) for name, lag in self.lags.items()},
+            'max_lag_seconds': self.max_lag,
+            'replica_reads': dict(self.replica_reads),
+            'primary_reads': self.primary_reads,
+            'sticky_reads': self.sticky_reads,
+            'sticky_clients': len(self._sticky),
+            'removed_from_rotation': self.removed,
+            'checks': self.checks
+        }
+
+
+def init_replicas(app, db):
+    """Registrar el enrutamiento a réplicas si hay réplicas configuradas"""
+    names = list(replica_binds(app.config['DATABASE_REPLICA_URLS']))
+    if not names:
+        return None
+
+    from app.utils.metrics import register_metrics
+
+    router = ReplicaRouter(
+        app, db, names,
+        sticky_seconds=app.config['REPLICA_STICKY_SECONDS'],
+        max_lag=app.config['REPLICA_MAX_LAG_SECONDS'],
+        check_interval=app.config['REPLICA_CHECK_INTERVAL']
+    )
+    app.extensions['db_replicas'] = router
+    app.before_request(router.before_request)
+    app.after_request(router.after_request)
+    register_metrics(app, 'db_replicas', router.stats)
+    return router
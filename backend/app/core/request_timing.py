@@ -0,0 +1,171 @@
+"""
+Tiempos por petición
+
+Con REQUEST_TIMING cada petición acumula:
+
+  - total:     desde el primer before_request hasta el último after_request
+  - db:        sentencias SQL ejecutadas y tiempo en el cursor (todos los
+               engines, réplicas incluidas)
+  - serialize: codificación JSON de las respuestas (app.json.dumps)
+  - bcrypt:    hashing de contraseñas, separado de la espera por cupo
+
+y los devuelve en el encabezado Server-Timing (visible en la pestaña de red
+del navegador) y en una línea de log clave=valor. Apagado no se registra
+ningún hook ni listener: el único costo es el de no hacer nada.
+
+El acumulador vive en una ContextVar, así que los listeners de SQLAlchemy lo
+encuentran sin contexto de Flask y las consultas hechas fuera de una petición
+(hilos de fondo, CLI) no se cuentan. Lo que ocurre después de after_request
+(el cuerpo de una respuesta en streaming) queda fuera de la medición.
+"""
+
+import time
+from contextvars import ContextVar
+
+from flask import request
+from sqlalchemy import event
+
+
+_current = ContextVar('request_timing', default=None)
+
+
+class RequestTiming:
+    """Acumulador de tiempos de una petición"""
+
+    __slots__ = ('started', 'db_count', 'db_seconds', 'serialize_seconds',
+                 'bcrypt_count', 'bcrypt_seconds', 'bcrypt_wait_seconds')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_count = 0
+        self.db_seconds = 0.0
+        self.serialize_seconds = 0.0
+        self.bcrypt_count = 0
+        self.bcrypt_seconds = 0.0
+        self.bcrypt_wait_seconds = 0.0
+
+    def metrics(self):
+        """Métricas en milisegundos: {nombre: (duración, descripción)}"""
+        metrics = {
+            'total': (time.perf_counter() - self.started, None),
+            'db': (self.db_seconds, f'{self.db_count} queries'),
+            'serialize': (self.serialize_seconds, None),
+        }
+        if self.bcrypt_count:
+            metrics['bcrypt'] = (self.bcrypt_seconds, f'{self.bcrypt_count} hashes')
+            metrics['bcrypt-wait'] = (self.bcrypt_wait_seconds, None)
+        return {name: (round(seconds * 1000, 2), desc) for name, (seconds, desc) in metrics.items()}
+
+
+def server_timing_header(metrics):
+    """Valor del encabezado Server-Timing"""
+    partes = []
+    for name, (ms, desc) in metrics.items():
+        parte = f'{name};dur={ms}'
+        if desc:
+            parte += f';desc="{desc}"'
+        partes.append(parte)
+    return ', '.join(partes)
+
+
+# ---------- Fuentes de tiempo ----------
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current.get() is not None:
+        context.request_timing_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timing = _current.get()
+    inicio = getattr(context, 'request_timing_start', None)
+    if timing is None or inicio is None:
+        return
+    timing.db_count += 1
+    timing.db_seconds += time.perf_counter() - inicio
+
+
+def _timed_dumps(dumps):
+    def timed(obj, **kwargs):
+        timing = _current.get()
+        if timing is None:
+            return dumps(obj, **kwargs)
+        inicio = time.perf_counter()
+        try:
+            return dumps(obj, **kwargs)
+        finally:
+            timing.serialize_seconds += time.perf_counter() - inicio
+    return timed
+
+
+def _observe_hash(wait_seconds, work_seconds):
+    timing = _current.get()
+    if timing is not None:
+        timing.bcrypt_count += 1
+        timing.bcrypt_seconds += work_seconds
+        timing.bcrypt_wait_seconds += wait_seconds
+
+
+# ---------- Registro ----------
+
+def init_request_timing(app, db):
+    """
+    Registrar los hooks de tiempos por petición si REQUEST_TIMING está activo
+
+    Debe llamarse después de crear las extensiones y el pool de hashing.
+
+    Args:
+        app: Aplicación Flask
+        db: Instancia de Flask-SQLAlchemy
+    """
+    if not app.config['REQUEST_TIMING']:
+        return False
+
+    log_ms = app.config['REQUEST_TIMING_LOG_MS']
+
+    with app.app_context():
+        engines = list(db.engines.values())
+    for engine in engines:
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+    app.json.dumps = _timed_dumps(app.json.dumps)
+
+    hasher = app.extensions.get('password_hasher')
+    if hasher is not None:
+        hasher.observer = _observe_hash
+
+    def start_timing():
+        request.environ['request_timing.token'] = _current.set(RequestTiming())
+
+    def finish_timing(response):
+        timing = _current.get()
+        if timing is None:
+            return response
+        metrics = timing.metrics()
+        response.headers['Server-Timing'] = server_timing_header(metrics)
+        if metrics['total'][0] >= log_ms:
+            app.logger.info(
+                'request method=%s path=%s endpoint=%s status=%s total_ms=%s db_queries=%s db_ms=%s '
+                'serialize_ms=%s bcrypt_ms=%s bcrypt_wait_ms=%s',
+                request.method, request.path, request.endpoint, response.status_code,
+                metrics['total'][0], timing.db_count, metrics['db'][0], metrics['serialize'][0],
+                metrics.get('bcrypt', (0.0,))[0], metrics.get('bcrypt-wait', (0.0,))[0]
+            )
+        return response
+
+    def reset_timing(error=None):
+        token = request.environ.pop('request_timing.token', None)
+        if token is None:
+            return
+        try:
+            _current.reset(token)
+        except ValueError:
+            # Teardown en otro contexto (ej. fin de una respuesta en streaming)
+            _current.set(None)
+
+    # Primero en before_request y último en after_request (Flask los ejecuta
+    # en orden inverso): la medición cubre los demás hooks
+    app.before_request_funcs.setdefault(None, []).insert(0, start_timing)
+    app.after_request_funcs.setdefault(None, []).insert(0, finish_timing)
+    app.teardown_request(reset_timing)
+    return True
@@ -0,0 +1,47 @@
+"""
+Tiempos de arranque de la aplicación
+
+create_app mide cada fase (configuración, extensiones, blueprints, ...) y
+deja el desglose en app.extensions['startup'] y en /metrics, para ver en qué
+se va el arranque en frío de cada worker.
+"""
+
+import time
+from contextlib import contextmanager
+
+
+class StartupTimer:
+    """Acumula la duración de cada fase del arranque"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}  # fase -> milisegundos (en orden de ejecución)
+
+    @contextmanager
+    def phase(self, name):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = round((time.perf_counter() - inicio) * 1000, 2)
+
+    @property
+    def total_ms(self):
+        return round((time.perf_counter() - self.started) * 1000, 2)
+
+    def finish(self, app):
+        """Cerrar la medición, registrarla y dejar una línea en el log"""
+        self.total = self.total_ms
+        app.extensions['startup'] = self
+
+        from app.utils.metrics import register_metrics
+        register_metrics(app, 'startup', self.stats)
+
+        desglose = ', '.join(f'{name}={ms:.1f}ms' for name, ms in self.phases.items())
+        app.logger.info('Arranque en %.1fms (%s)', self.total, desglose)
+
+    def stats(self):
+        return {
+            'total_ms': self.total,
+            'phases_ms': dict(self.phases)
+        }
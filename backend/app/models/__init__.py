@@ -2,11 +2,12 @@
 Modelos del sistema
 """
 
-from .models import PersonaBase, User, Departamento, Residente
+from .models import PersonaBase, User, TokenRevocado, Departamento, Residente
 
 __all__ = [
     'PersonaBase',
     'User', 
+    'TokenRevocado',
     'Departamento',
     'Residente'
 ]
\ No newline at end of file
@@ -5,15 +5,39 @@ Basados en el esquema real de PostgreSQL de la base de datos "Edificio"
 
 from app.core.database import db
 from datetime import datetime
-import bcrypt
+from app.core.hashing import get_password_hasher
+from app.models.serializers import SerializerMixin, float_or_none, get_serializer, isoformat_or_none
 
 
-class PersonaBase(db.Model):
+def _nombre_completo_persona(row):
+    """Une nombres y apellidos de una persona omitiendo los vacíos"""
+    partes = [row.nombres]
+    if row.apellido_paterno:
+        partes.append(row.apellido_paterno)
+    if row.apellido_materno:
+        partes.append(row.apellido_materno)
+    return ' '.join(partes)
+
+
+def _nombre_completo_usuario(row):
+    """Une nombres y apellidos de un usuario (apellido paterno obligatorio)"""
+    partes = [row.nombres, row.apellido_paterno]
+    if row.apellido_materno:
+        partes.append(row.apellido_materno)
+    return ' '.join(partes)
+
+
+class PersonaBase(SerializerMixin, db.Model):
     """
     Modelo principal de Persona basado en el esquema real de PostgreSQL
     Esta tabla es la base para todas las relaciones del sistema
     """
     __tablename__ = 'persona'
+    __table_args__ = (
+        # Listado de personas activas ordenado por ci
+        db.Index('ix_persona_activos_ci', 'ci', postgresql_where=db.text('activo'), sqlite_where=db.text('activo')),
+        db.Index('ix_persona_fecha_actualizacion', 'fecha_actualizacion'),
+    )
     
     # Campos según esquema real de PostgreSQL
     ci = db.Column(db.String(20), primary_key=True)  # Carnet de identidad
@@ -47,45 +71,37 @@ class PersonaBase(db.Model):
         self.foto_url = foto_url
         self.activo = activo
     
+    # Campos expuestos por to_dict, en orden (las fechas como ISO 8601)
+    SERIALIZABLE_FIELDS = (
+        'ci', 'nombres', 'apellido_paterno', 'apellido_materno', 'nombre_completo',
+        ('fecha_nacimiento', isoformat_or_none), 'sexo', 'telefono', 'correo', 'direccion', 'foto_url',
+        'activo', ('fecha_creacion', isoformat_or_none), ('fecha_actualizacion', isoformat_or_none)
+    )
+    
+    # Campos calculados: nombre -> (columnas de las que depende, función)
+    DERIVED_FIELDS = {
+        'nombre_completo': (('nombres', 'apellido_paterno', 'apellido_materno'), _nombre_completo_persona)
+    }
+    
     @property
     def nombre_completo(self):
         """Genera el nombre completo de la persona"""
-        nombres = [self.nombres]
-        if self.apellido_paterno:
-            nombres.append(self.apellido_paterno)
-        if self.apellido_materno:
-            nombres.append(self.apellido_materno)
-        return ' '.join(nombres)
-    
-    def to_dict(self):
-        """Convierte el modelo a diccionario para JSON"""
-        return {
-            'ci': self.ci,
-            'nombres': self.nombres,
-            'apellido_paterno': self.apellido_paterno,
-            'apellido_materno': self.apellido_materno,
-            'nombre_completo': self.nombre_completo,
-            'fecha_nacimiento': self.fecha_nacimiento.isoformat() if self.fecha_nacimiento else None,
-            'sexo': self.sexo,
-            'telefono': self.telefono,
-            'correo': self.correo,
-            'direccion': self.direccion,
-            'foto_url': self.foto_url,
-            'activo': self.activo,
-            'fecha_creacion': self.fecha_creacion.isoformat() if self.fecha_creacion else None,
-            'fecha_actualizacion': self.fecha_actualizacion.isoformat() if self.fecha_actualizacion else None
-        }
+        return _nombre_completo_persona(self)
     
     def __repr__(self):
         return f'<PersonaBase {self.ci}: {self.nombre_completo}>'
 
 
-class User(db.Model):
+class User(SerializerMixin, db.Model):
     """
     Modelo de Usuario para autenticación
     Utiliza la tabla 'personas' que ya existe en la DB para compatibilidad con auth
     """
     __tablename__ = 'personas'
+    __table_args__ = (
+        # Búsquedas de login / registro / OAuth sin distinguir mayúsculas
+        db.Index('ix_personas_correo_lower', db.func.lower(db.text('correo'))),
+    )
     
     ci = db.Column(db.String(20), primary_key=True)
     nombres = db.Column(db.String(100), nullable=False)
@@ -112,47 +128,61 @@ class User(db.Model):
     def set_password(self, password):
         """Establece la contraseña hasheada"""
         if password:
-            self.password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+            self.password_hash = get_password_hasher().hash(password)
     
     def check_password(self, password):
         """Verifica la contraseña"""
         if not self.password_hash:
             return False
-        return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
+        return get_password_hasher().verify(password, self.password_hash)
+    
+    def upgrade_password_hash(self, password):
+        """
+        Regenera el hash si se generó con un costo menor a BCRYPT_ROUNDS
+        
+        Args:
+            password: Contraseña en texto plano, ya verificada con check_password
+        
+        Returns:
+            True si el hash se regeneró (queda pendiente de commit)
+        """
+        hasher = get_password_hasher()
+        if not self.password_hash or not hasher.needs_rehash(self.password_hash):
+            return False
+        self.password_hash = hasher.rehash(password)
+        return True
     
     def is_oauth_user(self):
         """Verifica si el usuario se autenticó via OAuth"""
         return self.provider and self.provider != 'local'
     
+    # Campos expuestos por to_dict, en orden (password_hash solo con include_sensitive)
+    SERIALIZABLE_FIELDS = (
+        'ci', 'nombres', 'apellido_paterno', 'apellido_materno', 'nombre_completo',
+        ('fecha_nacimiento', isoformat_or_none), 'sexo', 'telefono', 'correo', 'direccion', 'activo', 'rol',
+        'provider', 'avatar_url', ('ultimo_acceso', isoformat_or_none),
+        ('fecha_creacion', isoformat_or_none), ('fecha_actualizacion', isoformat_or_none)
+    )
+    
+    # Campos calculados: nombre -> (columnas de las que depende, función)
+    DERIVED_FIELDS = {
+        'nombre_completo': (('nombres', 'apellido_paterno', 'apellido_materno'), _nombre_completo_usuario)
+    }
+    
     @property
     def nombre_completo(self):
         """Genera el nombre completo del usuario"""
-        nombres = [self.nombres, self.apellido_paterno]
-        if self.apellido_materno:
-            nombres.append(self.apellido_materno)
-        return ' '.join(nombres)
-    
-    def to_dict(self, include_sensitive=False):
-        """Convierte el modelo a diccionario"""
-        data = {
-            'ci': self.ci,
-            'nombres': self.nombres,
-            'apellido_paterno': self.apellido_paterno,
-            'apellido_materno': self.apellido_materno,
-            'nombre_completo': self.nombre_completo,
-            'fecha_nacimiento': self.fecha_nacimiento.isoformat() if self.fecha_nacimiento else None,
-            'sexo': self.sexo,
-            'telefono': self.telefono,
-            'correo': self.correo,
-            'direccion': self.direccion,
-            'activo': self.activo,
-            'rol': self.rol,
-            'provider': self.provider,
-            'avatar_url': self.avatar_url,
-            'ultimo_acceso': self.ultimo_acceso.isoformat() if self.ultimo_acceso else None,
-            'fecha_creacion': self.fecha_creacion.isoformat() if self.fecha_creacion else None,
-            'fecha_actualizacion': self.fecha_actualizacion.isoformat() if self.fecha_actualizacion else None
-        }
+        return _nombre_completo_usuario(self)
+    
+    def to_dict(self, include_sensitive=False, fields=None):
+        """
+        Convierte el modelo a diccionario
+        
+        Args:
+            include_sensitive: Incluir el hash de la contraseña
+            fields: Subconjunto de SERIALIZABLE_FIELDS a incluir (None = todos)
+        """
+        data = get_serializer(User, fields)(self)
         
         if include_sensitive:
             data['password_hash'] = self.password_hash
@@ -163,9 +193,21 @@ class User(db.Model):
         return f'<User {self.ci}: {self.correo}>'
 
 
+class TokenRevocado(db.Model):
+    """Tokens JWT revocados (logout); la fila deja de importar al expirar el token"""
+    __tablename__ = 'tokens_revocados'
+    
+    jti = db.Column(db.String(36), primary_key=True)
+    expira = db.Column(db.DateTime, nullable=False, index=True)
+    fecha_revocacion = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    
+    def __repr__(self):
+        return f'<TokenRevocado {self.jti}>'
+
+
 # Modelos adicionales del edificio (preparados para futuras funcionalidades)
 
-class Departamento(db.Model):
+class Departamento(SerializerMixin, db.Model):
     """Modelo para departamentos del edificio"""
     __tablename__ = 'departamento'
     
@@ -178,29 +220,22 @@ class Departamento(db.Model):
     fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow)
     fecha_actualizacion = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'numero': self.numero,
-            'piso': self.piso,
-            'tipo': self.tipo,
-            'metros_cuadrados': float(self.metros_cuadrados) if self.metros_cuadrados else None,
-            'estado': self.estado,
-            'fecha_creacion': self.fecha_creacion.isoformat() if self.fecha_creacion else None,
-            'fecha_actualizacion': self.fecha_actualizacion.isoformat() if self.fecha_actualizacion else None
-        }
+    SERIALIZABLE_FIELDS = (
+        'id', 'numero', 'piso', 'tipo', ('metros_cuadrados', float_or_none), 'estado',
+        ('fecha_creacion', isoformat_or_none), ('fecha_actualizacion', isoformat_or_none)
+    )
     
     def __repr__(self):
         return f'<Departamento {self.numero} - Piso {self.piso}>'
 
 
-class Residente(db.Model):
+class Residente(SerializerMixin, db.Model):
     """Modelo para residentes del edificio"""
     __tablename__ = 'residentes'
     
     id = db.Column(db.Integer, primary_key=True)
-    persona_ci = db.Column(db.String(20), db.ForeignKey('persona.ci'), nullable=False)
-    departamento_id = db.Column(db.Integer, db.ForeignKey('departamento.id'), nullable=False)
+    persona_ci = db.Column(db.String(20), db.ForeignKey('persona.ci'), nullable=False, index=True)
+    departamento_id = db.Column(db.Integer, db.ForeignKey('departamento.id'), nullable=False, index=True)
     fecha_inicio = db.Column(db.Date, nullable=False)
     fecha_fin = db.Column(db.Date, nullable=True)
     es_propietario = db.Column(db.Boolean, default=False)
@@ -211,17 +246,10 @@ class Residente(db.Model):
     persona = db.relationship('PersonaBase', backref='residencias')
     departamento = db.relationship('Departamento', backref='residentes')
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'persona_ci': self.persona_ci,
-            'departamento_id': self.departamento_id,
-            'fecha_inicio': self.fecha_inicio.isoformat() if self.fecha_inicio else None,
-            'fecha_fin': self.fecha_fin.isoformat() if self.fecha_fin else None,
-            'es_propietario': self.es_propietario,
-            'activo': self.activo,
-            'fecha_creacion': self.fecha_creacion.isoformat() if self.fecha_creacion else None
-        }
+    SERIALIZABLE_FIELDS = (
+        'id', 'persona_ci', 'departamento_id', ('fecha_inicio', isoformat_or_none),
+        ('fecha_fin', isoformat_or_none), 'es_propietario', 'activo', ('fecha_creacion', isoformat_or_none)
+    )
     
     def __repr__(self):
         return f'<Residente {self.persona_ci} - Depto {self.departamento_id}>'
\ No newline at end of file
@@ -0,0 +1,123 @@
+"""
+Serializadores de modelos generados a partir de los metadatos de las columnas
+
+Para cada modelo (y cada subconjunto de campos pedido con ?fields=) se genera
+una única vez una función equivalente a escribir el diccionario a mano:
+
+    def serializar(row):
+        return {'ci': row.ci, 'nombres': row.nombres, ...}
+
+SERIALIZABLE_FIELDS puede declarar un conversor para un campo con una tupla
+('campo', conversor); el serializador generado lo aplica al valor de la
+columna, de modo que to_dict() entrega fechas ISO 8601 y números float igual
+que los to_dict escritos a mano:
+
+    SERIALIZABLE_FIELDS = ('id', ('metros_cuadrados', float_or_none), ...)
+"""
+
+from functools import lru_cache
+
+
+def isoformat_or_none(value):
+    """Fecha u hora en ISO 8601 (None si no hay valor)"""
+    return value.isoformat() if value else None
+
+
+def float_or_none(value):
+    """Decimal como float (None si no hay valor)"""
+    return float(value) if value else None
+
+
+@lru_cache(maxsize=64)
+def field_converters(model):
+    """
+    Campos serializables del modelo y su conversor
+
+    Returns:
+        Diccionario ordenado campo -> conversor (None si el valor va tal cual),
+        tomado de SERIALIZABLE_FIELDS o, si no existe, de todas las columnas
+    """
+    declared = getattr(model, 'SERIALIZABLE_FIELDS', None) or tuple(
+        column.key for column in model.__mapper__.column_attrs
+    )
+    converters = {}
+    for entry in declared:
+        field, converter = entry if isinstance(entry, tuple) else (entry, None)
+        converters[field] = converter
+    return converters
+
+
+def field_names(model):
+    """Nombres de los campos serializables del modelo, en orden"""
+    return tuple(field_converters(model))
+
+
+def compile_serializer(model, fields):
+    """
+    Generar la función que serializa una fila del modelo
+
+    Args:
+        model: Modelo SQLAlchemy
+        fields: Tupla de campos a incluir, en orden
+
+    Returns:
+        Función serializar(row) -> dict. Acepta instancias del modelo o filas
+        de Core con las mismas columnas y solo lee los atributos necesarios.
+    """
+    derived_fields = getattr(model, 'DERIVED_FIELDS', {})
+    converters = field_converters(model)
+    namespace = {}
+    items = []
+
+    for index, field in enumerate(fields):
+        if not field.isidentifier():
+            raise ValueError(f'Campo inválido: {field}')
+        if field in derived_fields:
+            namespace[f'_derivado_{index}'] = derived_fields[field][1]
+            items.append(f'{field!r}: _derivado_{index}(row)')
+        elif converters.get(field) is not None:
+            namespace[f'_conversor_{index}'] = converters[field]
+            items.append(f'{field!r}: _conversor_{index}(row.{field})')
+        else:
+            items.append(f'{field!r}: row.{field}')
+
+    source = 'def serializar(row):\n    return {' + ', '.join(items) + '}\n'
+    exec(compile(source, f'<serializador {model.__name__}>', 'exec'), namespace)
+    return namespace['serializar']
+
+
+@lru_cache(maxsize=256)
+def get_serializer(model, fields=None):
+    """
+    Serializador en caché para el modelo y el subconjunto de campos
+
+    Args:
+        model: Modelo SQLAlchemy
+        fields: Tupla de campos o None para SERIALIZABLE_FIELDS (o todas las columnas)
+    """
+    if fields is None:
+        fields = field_names(model)
+    return compile_serializer(model, fields)
+
+
+class SerializerMixin:
+    """Agrega row_to_dict / to_dict basados en el serializador generado"""
+
+    @classmethod
+    def row_to_dict(cls, row, fields=None):
+        """
+        Convierte una fila a diccionario para JSON
+
+        Acepta tanto instancias del modelo como filas de SQLAlchemy Core con
+        las mismas columnas, lo que permite serializar resultados sin
+        construir objetos ORM.
+
+        Args:
+            row: Instancia o fila a serializar
+            fields: Subconjunto de campos a incluir (None = todos)
+        """
+        return get_serializer(cls, fields)(row)
+
+    def to_dict(self, fields=None):
+        """Convierte el modelo a diccionario para JSON"""
+        return get_serializer(type(self), fields)(self)
@@ -5,6 +5,7 @@ Esquemas de validación
 from .schemas import (
     PersonaCreateSchema,
     PersonaUpdateSchema,
+    PersonaBatchSchema,
     UserRegistrationSchema,
     UserLoginSchema,
     DepartamentoSchema,
@@ -14,6 +15,7 @@ from .schemas import (
 __all__ = [
     'PersonaCreateSchema',
     'PersonaUpdateSchema', 
+    'PersonaBatchSchema',
     'UserRegistrationSchema',
     'UserLoginSchema',
     'DepartamentoSchema',
@@ -91,6 +91,18 @@ class PersonaUpdateSchema(Schema):
                 raise ValidationError('Edad debe estar entre 0 y 120 años')
 
 
+class PersonaBatchSchema(Schema):
+    """Esquema para validar la consulta de varias personas por CI"""
+    ci = fields.List(fields.Str(), required=True)
+    campos = fields.Str(required=False, allow_none=True, data_key='fields')
+
+    @validates('ci')
+    def validate_ci(self, value):
+        """Validar que se envíe al menos un CI"""
+        if not value:
+            raise ValidationError('Debe enviar al menos un CI')
+
+
 class UserRegistrationSchema(Schema):
     """Esquema para validar el registro de usuarios"""
     ci = fields.Str(required=True)
@@ -3,7 +3,9 @@ Utilidades del sistema
 """
 
 from .responses import success_response, error_response, paginated_response, validation_error_response
-from .decorators import validate_json, require_role, require_auth
+from .decorators import validate_json, require_role, require_auth, read_only
+from .fieldsets import parse_fields, fields_options, InvalidFieldsError
+from .pagination import encode_cursor, decode_cursor, InvalidCursorError, count_rows, COUNT_STRATEGIES
 
 __all__ = [
     'success_response',
@@ -12,5 +14,14 @@ __all__ = [
     'validation_error_response',
     'validate_json',
     'require_role',
-    'require_auth'
+    'require_auth',
+    'read_only',
+    'encode_cursor',
+    'decode_cursor',
+    'InvalidCursorError',
+    'count_rows',
+    'COUNT_STRATEGIES',
+    'parse_fields',
+    'fields_options',
+    'InvalidFieldsError'
 ]
\ No newline at end of file
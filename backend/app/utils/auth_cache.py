@@ -0,0 +1,146 @@
+"""
+Caché por proceso del estado de autenticación de los usuarios
+
+require_auth / require_role solo necesitan saber si el usuario existe, si
+está activo y su rol. Esos tres datos se guardan con un TTL corto para no
+consultar la tabla personas en cada petición autenticada. Las
+actualizaciones del rol o del estado activo hechas a través del ORM
+invalidan la entrada al momento; en otros workers la entrada expira por TTL.
+
+Opcionalmente (AUTH_TRUST_TOKEN_CLAIMS) el rol y el estado viajan como
+claims firmados en el access token y la consulta se omite hasta que el token
+expira.
+
+Los decoradores dejan ese estado en request.current_principal. La instancia
+completa de User sigue disponible en request.current_user, que se carga de
+la base de datos solo si la vista la usa (ver AuthRequest).
+"""
+
+import time
+from collections import namedtuple
+from functools import cached_property
+
+from flask import Request, current_app, has_app_context
+from sqlalchemy import event, inspect, select
+
+from app.core.database import db
+from app.models import User
+from app.utils.cache import MemoryCache
+from app.utils.metrics import register_metrics
+
+
+# Datos del usuario autenticado disponibles en request.current_principal
+CurrentUser = namedtuple('CurrentUser', ['ci', 'rol', 'activo'])
+
+
+class AuthRequest(Request):
+    """Request con el usuario autenticado cargado bajo demanda"""
+
+    current_principal = None
+
+    @cached_property
+    def current_user(self):
+        """Instancia de User del usuario autenticado (una consulta, al primer acceso)"""
+        if self.current_principal is None:
+            return None
+        return db.session.get(User, self.current_principal.ci)
+
+
+class AuthUserCache:
+    """Caché TTL de (rol, activo) por CI con medición del tiempo ahorrado"""
+
+    def __init__(self, ttl=60, max_entries=10000):
+        self.ttl = ttl
+        self._cache = MemoryCache(max_entries=max_entries)
+        self._lookups = 0
+        self._lookup_seconds = 0.0
+
+    def get_user(self, ci):
+        """
+        Obtener el estado de autenticación de un usuario
+
+        Returns:
+            CurrentUser, o None si el usuario no existe
+        """
+        entry = self._cache.get(ci)
+        if entry is not None:
+            return entry or None
+
+        inicio = time.perf_counter()
+        row = db.session.execute(
+            select(User.ci, User.rol, User.activo).where(User.ci == ci)
+        ).first()
+        self._lookups += 1
+        self._lookup_seconds += time.perf_counter() - inicio
+
+        user = CurrentUser(row.ci, row.rol, row.activo) if row else None
+        # Los usuarios inexistentes también se guardan (como tupla vacía)
+        self._cache.set(ci, user or (), self.ttl)
+        return user
+
+    def invalidate(self, ci):
+        """Descartar la entrada de un usuario"""
+        self._cache.delete(ci)
+
+    def stats(self):
+        stats = self._cache.stats()
+        promedio = self._lookup_seconds / self._lookups if self._lookups else 0.0
+        stats.update({
+            'ttl_seconds': self.ttl,
+            'avg_lookup_ms': round(promedio * 1000, 3),
+            'estimated_saved_ms': round(stats['hits'] * promedio * 1000, 1)
+        })
+        return stats
+
+
+def init_auth_cache(app):
+    """Crear la caché de usuarios autenticados y registrar sus métricas"""
+    cache = AuthUserCache(
+        ttl=app.config['AUTH_USER_CACHE_TTL'],
+        max_entries=app.config['AUTH_USER_CACHE_MAX_ENTRIES']
+    )
+    app.extensions['auth_user_cache'] = cache
+    app.request_class = AuthRequest
+    register_metrics(app, 'auth_user_cache', cache.stats)
+    return cache
+
+
+def get_auth_cache():
+    """Caché de usuarios autenticados de la aplicación actual"""
+    return current_app.extensions['auth_user_cache']
+
+
+def invalidate_user(ci):
+    """Invalidar explícitamente el estado de un usuario (ej. tras cambiar su rol con SQL directo)"""
+    if has_app_context() and 'auth_user_cache' in current_app.extensions:
+        get_auth_cache().invalidate(ci)
+
+
+def token_claims(user):
+    """Claims firmados con el rol y el estado del usuario para el access token"""
+    return {'rol': user.rol, 'activo': user.activo}
+
+
+def user_from_claims(identity, claims):
+    """
+    Construir el usuario actual a partir de los claims del token
+
+    Returns:
+        CurrentUser, o None si el token no trae los claims
+    """
+    if 'rol' not in claims or 'activo' not in claims:
+        return None
+    return CurrentUser(identity, claims['rol'], claims['activo'])
+
+
+@event.listens_for(User, 'after_update')
+def _invalidar_usuario_actualizado(mapper, connection, target):
+    """Invalidar la entrada cuando cambia el rol o el estado activo"""
+    state = inspect(target)
+    if state.attrs.rol.history.has_changes() or state.attrs.activo.history.has_changes():
+        invalidate_user(target.ci)
+
+
+@event.listens_for(User, 'after_delete')
+def _invalidar_usuario_eliminado(mapper, connection, target):
+    invalidate_user(target.ci)
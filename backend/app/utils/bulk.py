@@ -0,0 +1,198 @@
+"""
+Utilidades para la carga masiva de datos
+
+Las filas se leen del cuerpo de la petición como un flujo (NDJSON o CSV) y se
+procesan por lotes de tamaño fijo, de modo que la memoria usada no depende del
+tamaño del archivo.
+"""
+
+import csv
+import io
+import json
+from itertools import islice
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+
+BULK_FORMATS = {
+    'ndjson': ('application/x-ndjson', 'application/ndjson', 'application/jsonl'),
+    'csv': ('text/csv', 'application/csv'),
+}
+
+
+class InvalidRowError(ValueError):
+    """Fila que no puede interpretarse en el formato declarado"""
+
+
+def detect_format(explicit_format, mimetype):
+    """
+    Determinar el formato del flujo de entrada
+
+    Args:
+        explicit_format: Valor del parámetro ?format= (puede ser None)
+        mimetype: Content-Type de la petición sin parámetros
+
+    Returns:
+        'ndjson', 'csv' o None si no se reconoce
+    """
+    if explicit_format:
+        return explicit_format if explicit_format in BULK_FORMATS else None
+
+    for name, mimetypes in BULK_FORMATS.items():
+        if mimetype in mimetypes:
+            return name
+    return None
+
+
+def _iter_text_lines(stream):
+    """Decodificar el flujo binario línea por línea"""
+    first = True
+    for raw_line in stream:
+        line = raw_line.decode('utf-8')
+        if first:
+            line = line.lstrip('\ufeff')
+            first = False
+        yield line
+
+
+def iter_rows(stream, fmt):
+    """
+    Iterar las filas de un flujo NDJSON o CSV
+
+    Args:
+        stream: Flujo binario (ej. request.stream)
+        fmt: 'ndjson' o 'csv'
+
+    Yields:
+        Tuplas (numero_fila, datos) donde datos es un dict o una
+        instancia de InvalidRowError si la fila no pudo interpretarse
+    """
+    lines = _iter_text_lines(stream)
+
+    if fmt == 'csv':
+        reader = csv.DictReader(lines)
+        for row in reader:
+            if None in row:
+                yield reader.line_num, InvalidRowError('La fila tiene más columnas que la cabecera')
+                continue
+            # En CSV una celda vacía equivale a un valor ausente: la columna no se envía
+            yield reader.line_num, {key: value for key, value in row.items() if value != ''}
+        return
+
+    for line_num, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield line_num, InvalidRowError('JSON inválido')
+            continue
+        if not isinstance(row, dict):
+            yield line_num, InvalidRowError('Cada línea debe ser un objeto JSON')
+            continue
+        yield line_num, row
+
+
+def chunked(iterable, size):
+    """Agrupar un iterable en listas de como máximo size elementos"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def upsert_rows(session, table, rows, conflict_column, update_columns, use_copy=True):
+    """
+    Insertar o actualizar un lote de filas en una sola operación
+
+    En PostgreSQL (psycopg2 o psycopg 3) las filas se cargan con COPY en una
+    tabla temporal y se fusionan con INSERT ... ON CONFLICT. Sin COPY (otros
+    motores, SQLite en pruebas, o use_copy=False detrás de PgBouncer en modo
+    transaction, donde no conviene depender de tablas temporales) se usa un
+    INSERT ... ON CONFLICT de varias filas.
+
+    Args:
+        session: Sesión de SQLAlchemy
+        table: Tabla destino
+        rows: Lista de dicts con todas las columnas de la tabla (las filas nuevas
+            se insertan completas)
+        conflict_column: Columna única para detectar filas existentes
+        update_columns: Columnas que se sobrescriben en las filas existentes; el
+            resto conserva su valor actual
+        use_copy: Permitir la carga vía COPY en PostgreSQL
+    """
+    if not rows:
+        return
+
+    columns = [column.name for column in table.columns]
+    update_columns = [name for name in columns if name in set(update_columns) and name != conflict_column]
+
+    connection = session.connection()
+    dialect = connection.dialect
+    if dialect.name == 'postgresql' and use_copy and dialect.driver in ('psycopg2', 'psycopg'):
+        _copy_upsert(connection, table, rows, columns, update_columns, conflict_column)
+        return
+
+    # executemany: SQLAlchemy lo agrupa en INSERT de varias filas (insertmanyvalues)
+    statement = (pg_insert if dialect.name == 'postgresql' else sqlite_insert)(table)
+    if update_columns:
+        statement = statement.on_conflict_do_update(
+            index_elements=[conflict_column],
+            set_={name: statement.excluded[name] for name in update_columns}
+        )
+    else:
+        statement = statement.on_conflict_do_nothing(index_elements=[conflict_column])
+    connection.execute(statement, rows)
+
+
+def _on_conflict_clause(conflict_column, update_columns):
+    if not update_columns:
+        return f'ON CONFLICT ({conflict_column}) DO NOTHING'
+    assignments = ', '.join(f'{name} = EXCLUDED.{name}' for name in update_columns)
+    return f'ON CONFLICT ({conflict_column}) DO UPDATE SET {assignments}'
+
+
+def _copy_field(value):
+    """Formatear un valor para COPY en CSV: NULL es el único campo sin comillas"""
+    if value is None:
+        return ''
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def _copy_upsert(connection, table, rows, columns, update_columns, conflict_column):
+    """Cargar el lote vía COPY en una tabla temporal y fusionarlo"""
+    staging = f'{table.name}_staging'
+    column_list = ', '.join(columns)
+
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(','.join(_copy_field(row.get(name)) for name in columns))
+        buffer.write('\n')
+    buffer.seek(0)
+
+    copy_sql = f'COPY {staging} ({column_list}) FROM STDIN WITH (FORMAT csv)'
+    cursor = connection.connection.driver_connection.cursor()
+    try:
+        cursor.execute(
+            f'CREATE TEMP TABLE IF NOT EXISTS {staging} '
+            f'(LIKE {table.name} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS'
+        )
+        # Varias llamadas pueden compartir la transacción (un upsert por grupo
+        # de columnas): las filas de la anterior no deben volver a fusionarse
+        cursor.execute(f'TRUNCATE {staging}')
+        if connection.dialect.driver == 'psycopg':
+            # psycopg 3: cursor.copy() reemplaza a copy_expert
+            with cursor.copy(copy_sql) as copy:
+                copy.write(buffer.getvalue())
+        else:
+            cursor.copy_expert(copy_sql, buffer)
+        cursor.execute(
+            f'INSERT INTO {table.name} ({column_list}) '
+            f'SELECT {column_list} FROM {staging} '
+            f'{_on_conflict_clause(conflict_column, update_columns)}'
+        )
+    finally:
+        cursor.close()
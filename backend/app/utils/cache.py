@@ -0,0 +1,316 @@
+"""
+Caché de respuestas para endpoints de lectura
+
+La clave de cada entrada combina el endpoint, sus argumentos de ruta, los
+parámetros de consulta normalizados y el rol de quien llama. Cada entrada
+lleva etiquetas (ej. 'personas:lista', 'personas:<ci>') que las escrituras
+invalidan de forma precisa.
+
+El backend en memoria es por proceso: con varios workers cada uno tiene su
+propia copia y una escritura solo invalida la del worker que la atendió. Por
+eso en producción el backend por defecto es 'null'; para invalidación
+compartida se configura un backend externo que implemente CacheBackend
+(CACHE_BACKEND='paquete.modulo:Clase').
+
+Una lectura que se cruza con una escritura no debe volver a guardar lo que la
+escritura acaba de invalidar: la generación del backend se toma antes de
+ejecutar la vista y set() descarta el valor si hubo invalidaciones desde
+entonces.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import Response, current_app, g, request
+from werkzeug.utils import import_string
+
+from app.utils.metrics import register_metrics
+
+
+class CacheBackend:
+    """
+    Interfaz de un backend de caché
+
+    Los valores son tuplas (status, headers, body) ya serializadas, por lo que
+    un backend externo solo necesita guardar bytes.
+    """
+
+    @classmethod
+    def from_config(cls, config):
+        """Construir el backend a partir de la configuración de la aplicación"""
+        return cls()
+
+    def get(self, key):
+        """Devolver el valor guardado o None"""
+        raise NotImplementedError
+
+    def generation(self):
+        """
+        Valor que cambia con cada invalidación (None si el backend no lo lleva)
+
+        Se toma antes de generar una respuesta y se pasa a set().
+        """
+        return None
+
+    def set(self, key, value, ttl, tags=(), generation=None):
+        """
+        Guardar un valor durante ttl segundos asociado a las etiquetas dadas
+
+        Si se pasa generation y hubo invalidaciones desde que se tomó, el
+        valor puede estar desactualizado y no se guarda.
+        """
+        raise NotImplementedError
+
+    def delete(self, key):
+        """Eliminar una entrada"""
+        raise NotImplementedError
+
+    def invalidate_tags(self, tags):
+        """Eliminar todas las entradas asociadas a alguna de las etiquetas"""
+        raise NotImplementedError
+
+    def clear(self):
+        """Eliminar todas las entradas"""
+        raise NotImplementedError
+
+    def stats(self):
+        """Contadores del backend"""
+        return {}
+
+
+class NullCache(CacheBackend):
+    """Backend que no guarda nada (caché desactivada)"""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl, tags=(), generation=None):
+        pass
+
+    def delete(self, key):
+        pass
+
+    def invalidate_tags(self, tags):
+        pass
+
+    def clear(self):
+        pass
+
+
+class MemoryCache(CacheBackend):
+    """Caché LRU en memoria con expiración por TTL y límite de entradas"""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expira_en, value, tags)
+        self._tags = {}  # tag -> set(keys)
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.stale_sets = 0
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(max_entries=config['CACHE_MAX_ENTRIES'])
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def generation(self):
+        return self._generation
+
+    def set(self, key, value, ttl, tags=(), generation=None):
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                self.stale_sets += 1
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, value, tuple(tags))
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._generation += 1
+            if key in self._entries:
+                self._remove(key)
+                self.invalidations += 1
+
+    def invalidate_tags(self, tags):
+        with self._lock:
+            self._generation += 1
+            for tag in tags:
+                for key in self._tags.pop(tag, ()):
+                    if key in self._entries:
+                        self._remove(key)
+                        self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._tags.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else None,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'stale_sets': self.stale_sets
+            }
+
+    def _remove(self, key):
+        """Eliminar una entrada y sus referencias en el índice de etiquetas (con el lock tomado)"""
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+_BACKENDS = {
+    'memory': MemoryCache,
+    'null': NullCache,
+}
+
+
+def init_cache(app):
+    """Crear el backend de caché configurado y registrar sus métricas"""
+    name = app.config.get('CACHE_BACKEND', 'memory')
+    backend_class = _BACKENDS.get(name) or import_string(name.replace(':', '.'))
+    backend = backend_class.from_config(app.config)
+    app.extensions['response_cache'] = backend
+    register_metrics(app, 'cache', backend.stats)
+    return backend
+
+
+def get_cache():
+    """Backend de caché de la aplicación actual"""
+    return current_app.extensions.get('response_cache') or NullCache()
+
+
+def invalidate(*tags):
+    """Invalidar las entradas asociadas a las etiquetas dadas"""
+    get_cache().invalidate_tags(tags)
+
+
+def _caller_role():
+    """
+    Rol de quien llama para separar las entradas de la caché
+
+    Se usa el rol ya resuelto por require_auth / require_role o el claim 'rol'
+    del token. Si el token no trae el claim la entrada se separa por usuario.
+    """
+    principal = getattr(request, 'current_principal', None)
+    if principal is not None:
+        return f'rol:{principal.rol}'
+
+    if 'Authorization' not in request.headers:
+        return 'anon'
+
+    from flask_jwt_extended import verify_jwt_in_request, get_jwt
+    try:
+        verify_jwt_in_request(optional=True)
+        claims = get_jwt()
+    except Exception:
+        # En endpoints públicos un token inválido no cambia la respuesta
+        return 'anon'
+    if not claims:
+        return 'anon'
+    if 'rol' in claims:
+        return f"rol:{claims['rol']}"
+    return f"sub:{claims.get('sub')}"
+
+
+def _cache_key():
+    """Clave normalizada: endpoint, argumentos de ruta, consulta ordenada y rol"""
+    view_args = sorted((request.view_args or {}).items())
+    query = sorted(request.args.items(multi=True))
+    return f'{request.endpoint}|{view_args}|{query}|{_caller_role()}'
+
+
+# Encabezados que no se guardan junto con la respuesta
+_UNCACHED_HEADERS = {'set-cookie', 'content-length', 'x-cache'}
+
+
+def cached_response(tags, ttl=None):
+    """
+    Decorador que guarda en caché las respuestas 200 de un endpoint GET
+
+    Args:
+        tags: Función que recibe los argumentos de la vista y devuelve las
+              etiquetas de la entrada
+        ttl: Segundos de vida (por defecto CACHE_DEFAULT_TTL)
+
+    Returns:
+        Decorador de la vista
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            cache = get_cache()
+            if request.method != 'GET' or isinstance(cache, NullCache):
+                return f(*args, **kwargs)
+
+            key = _cache_key()
+            # Un cliente que acaba de escribir lee del primario (app/core/replicas.py):
+            # no se le sirve una entrada que pudo llenarse desde una réplica atrasada
+            cached = None if g.get('db_read_your_writes') else cache.get(key)
+            if cached is not None:
+                status, headers, body = cached
+                response = Response(body, status=status, headers=headers)
+                response.headers['X-Cache'] = 'HIT'
+                # Responde 304 si el cliente ya tiene el ETag guardado
+                return response.make_conditional(request)
+
+            # Antes de leer: si una escritura invalida mientras tanto, no se guarda
+            generation = cache.generation()
+            response = current_app.make_response(f(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                headers = [
+                    (name, value) for name, value in response.headers.items()
+                    if name.lower() not in _UNCACHED_HEADERS
+                ]
+                cache.set(
+                    key,
+                    (response.status_code, headers, response.get_data()),
+                    ttl if ttl is not None else current_app.config['CACHE_DEFAULT_TTL'],
+                    tags(*args, **kwargs),
+                    generation=generation
+                )
+                response.headers['X-Cache'] = 'MISS'
+            return response
+
+        return decorated_function
+    return decorator
@@ -0,0 +1,126 @@
+"""
+Utilidades para peticiones condicionales (ETag / Last-Modified / 304)
+
+La versión de un recurso es su fecha_actualizacion expresada en microsegundos
+desde epoch (UTC). El ETag fuerte de un recurso individual contiene esa
+versión, de modo que un If-Match puede traducirse directamente a una
+condición en el WHERE sin leer antes la fila.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+
+from flask import request, make_response
+from werkzeug.http import is_resource_modified
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _as_utc(timestamp):
+    """Las fechas sin zona horaria se interpretan como UTC"""
+    if timestamp.tzinfo is None:
+        return timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.astimezone(timezone.utc)
+
+
+def version_from_timestamp(timestamp):
+    """Versión entera (microsegundos UTC) de una fecha de actualización"""
+    if timestamp is None:
+        return 0
+    delta = _as_utc(timestamp) - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+
+
+def timestamp_from_version(version):
+    """Fecha de actualización (UTC) correspondiente a una versión"""
+    seconds, microseconds = divmod(version, 1_000_000)
+    return datetime.fromtimestamp(seconds, tz=timezone.utc).replace(microsecond=microseconds)
+
+
+def resource_etag(timestamp, variant=None):
+    """
+    ETag fuerte de un recurso individual
+
+    Args:
+        timestamp: fecha_actualizacion del recurso
+        variant: Valores que cambian la representación (ej. los campos pedidos)
+
+    Returns:
+        ETag sin comillas ('<version>' o '<version>-<hash de la variante>')
+    """
+    etag = str(version_from_timestamp(timestamp))
+    if variant:
+        etag += '-' + hashlib.sha1(repr(variant).encode('utf-8')).hexdigest()[:12]
+    return etag
+
+
+def parse_resource_versions(etags):
+    """
+    Extraer las versiones de un encabezado If-Match
+
+    Args:
+        etags: request.if_match
+
+    Returns:
+        Conjunto de versiones enteras (los ETags que no son de recurso se ignoran)
+    """
+    versions = set()
+    for etag in etags.as_set():
+        prefix = etag.split('-', 1)[0]
+        if prefix.isdigit():
+            versions.add(int(prefix))
+    return versions
+
+
+def collection_etag(rows, *extra):
+    """
+    ETag fuerte de una colección: agregado de los ids y versiones de la página
+
+    Args:
+        rows: Pares (id, fecha_actualizacion) de los elementos de la página
+        *extra: Valores adicionales de la representación (total, parámetros...)
+
+    Returns:
+        ETag sin comillas
+    """
+    digest = hashlib.sha1()
+    for key, timestamp in rows:
+        digest.update(f'{key}:{version_from_timestamp(timestamp)};'.encode('utf-8'))
+    digest.update(repr(extra).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def is_not_modified(etag, last_modified=None):
+    """Indica si las precondiciones If-None-Match / If-Modified-Since permiten responder 304"""
+    if not request.if_none_match and not request.if_modified_since:
+        return False
+    return not is_resource_modified(request.environ, etag=etag, last_modified=last_modified)
+
+
+def not_modified_response(etag, last_modified=None):
+    """Respuesta 304 sin cuerpo con los validadores del recurso"""
+    response = make_response('', 304)
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    return response
+
+
+def with_validators(result, etag, last_modified=None):
+    """
+    Agregar ETag y Last-Modified a una respuesta de success_response
+
+    Args:
+        result: Tupla (respuesta, status) devuelta por success_response
+        etag: ETag sin comillas
+        last_modified: Fecha de última modificación
+
+    Returns:
+        La misma tupla con los encabezados agregados
+    """
+    response, status_code = result
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    return response, status_code
@@ -3,12 +3,12 @@ Decoradores para la API
 """
 
 from functools import wraps
-from flask import request
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import request, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from marshmallow import ValidationError
 
 from app.utils.responses import validation_error_response
-from app.models import User
+from app.utils.auth_cache import get_auth_cache, user_from_claims
 
 
 def validate_json(schema_class):
@@ -39,6 +39,32 @@ def validate_json(schema_class):
     return decorator
 
 
+def read_only(f):
+    """
+    Marcar una vista como de solo lectura
+
+    Sus SELECT pueden atenderse desde una réplica (ver app/core/replicas.py).
+    Debe ir inmediatamente debajo de @route.
+    """
+    f.read_only = True
+    return f
+
+
+def _resolve_current_user():
+    """
+    Estado (ci, rol, activo) del usuario del token actual
+
+    Usa los claims del token si AUTH_TRUST_TOKEN_CLAIMS está activo y el token
+    los trae; si no, la caché de usuarios autenticados.
+    """
+    current_user_ci = get_jwt_identity()
+    if current_app.config['AUTH_TRUST_TOKEN_CLAIMS']:
+        user = user_from_claims(current_user_ci, get_jwt())
+        if user is not None:
+            return user
+    return get_auth_cache().get_user(current_user_ci)
+
+
 def require_role(role):
     """
     Decorador que requiere un rol específico
@@ -53,8 +79,7 @@ def require_role(role):
         @wraps(f)
         @jwt_required()
         def decorated_function(*args, **kwargs):
-            current_user_ci = get_jwt_identity()
-            user = User.query.get(current_user_ci)
+            user = _resolve_current_user()
             
             if not user or not user.activo:
                 return validation_error_response({'auth': ['Usuario no válido o inactivo']})
@@ -62,7 +87,7 @@ def require_role(role):
             if user.rol != role and user.rol != 'admin':  # Admin siempre tiene acceso
                 return validation_error_response({'auth': [f'Se requiere rol {role}']})
             
-            request.current_user = user
+            request.current_principal = user
             return f(*args, **kwargs)
             
         return decorated_function
@@ -80,13 +105,12 @@ def require_auth():
         @wraps(f)
         @jwt_required()
         def decorated_function(*args, **kwargs):
-            current_user_ci = get_jwt_identity()
-            user = User.query.get(current_user_ci)
+            user = _resolve_current_user()
             
             if not user or not user.activo:
                 return validation_error_response({'auth': ['Usuario no válido o inactivo']})
             
-            request.current_user = user
+            request.current_principal = user
             return f(*args, **kwargs)
             
         return decorated_function
@@ -0,0 +1,65 @@
+"""
+Utilidades para respuestas con subconjuntos de campos (?fields=)
+"""
+
+from sqlalchemy.orm import load_only
+
+from app.models.serializers import field_names
+
+
+class InvalidFieldsError(ValueError):
+    """Se pidieron campos que el recurso no expone"""
+
+
+def parse_fields(raw, model):
+    """
+    Interpretar el parámetro ?fields= de una petición
+
+    Args:
+        raw: Valor del parámetro (ej. 'ci,nombres,activo') o None
+        model: Modelo con SERIALIZABLE_FIELDS
+
+    Returns:
+        Tupla de campos sin duplicados, o None si no se pidió un subconjunto
+
+    Raises:
+        InvalidFieldsError: Si algún campo no existe en el modelo
+    """
+    if raw is None:
+        return None
+
+    requested = [field.strip() for field in raw.split(',') if field.strip()]
+    if not requested:
+        return None
+
+    available = field_names(model)
+    unknown = [field for field in requested if field not in available]
+    if unknown:
+        raise InvalidFieldsError(f"Campos desconocidos: {', '.join(unknown)}")
+
+    return tuple(dict.fromkeys(requested))
+
+
+def fields_options(model, fields, always=()):
+    """
+    Opciones de carga para traer de la base de datos solo las columnas necesarias
+
+    Args:
+        model: Modelo con DERIVED_FIELDS
+        fields: Campos pedidos (None = todos)
+        always: Columnas que se necesitan aunque no se devuelvan (ej. 'activo')
+
+    Returns:
+        Tupla de opciones para query.options(*opciones)
+    """
+    if fields is None:
+        return ()
+
+    columns = dict.fromkeys(always)
+    for field in fields:
+        if field in model.DERIVED_FIELDS:
+            columns.update(dict.fromkeys(model.DERIVED_FIELDS[field][0]))
+        else:
+            columns[field] = None
+
+    return (load_only(*[getattr(model, column) for column in columns]),)
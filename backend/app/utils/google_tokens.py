@@ -0,0 +1,224 @@
+"""
+Verificación local de ID tokens de Google
+
+En lugar de consultar oauth2.googleapis.com/tokeninfo en cada login, la
+firma del ID token se verifica contra las claves públicas de Google (JWKS).
+Las claves se guardan en memoria y en disco durante el max-age que indica el
+encabezado Cache-Control de la respuesta. Si un token trae un 'kid'
+desconocido (rotación de claves) se lanza una única recarga en segundo plano
+y la petición espera su resultado un tiempo acotado.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+
+import jwt
+from flask import current_app
+
+from app.utils.http_client import get_http_client
+from app.utils.metrics import register_metrics
+
+
+GOOGLE_ISSUERS = ('accounts.google.com', 'https://accounts.google.com')
+
+# Vigencia usada si la respuesta no trae Cache-Control: max-age
+_DEFAULT_MAX_AGE = 3600
+
+_MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+
+class InvalidGoogleTokenError(ValueError):
+    """El ID token de Google no es válido"""
+
+
+class JWKSCache:
+    """Claves públicas de un emisor con caché en memoria y en disco"""
+
+    def __init__(self, url, cache_path=None, timeout=5.0, refresh_wait=2.0, min_refresh_interval=60.0):
+        self.url = url
+        self.cache_path = cache_path
+        self.timeout = timeout
+        self.refresh_wait = refresh_wait
+        self.min_refresh_interval = min_refresh_interval
+        self._keys = {}  # kid -> PyJWK
+        self._expires_at = 0.0  # time.time() en que vence la caché
+        self._last_fetch = 0.0
+        self._lock = threading.Lock()
+        self._refresh_thread = None
+        self.fetches = 0
+        self.fetch_errors = 0
+        self.unknown_kids = 0
+        self._disk_loaded = False
+
+    def get_key(self, kid):
+        """
+        Clave pública para el kid dado
+
+        Returns:
+            PyJWK o None si el kid no existe en el JWKS vigente
+        """
+        if not self._disk_loaded:
+            self._load_from_disk()
+
+        if not self._keys:
+            # Sin claves: no hay alternativa a una descarga síncrona
+            self.refresh()
+        elif time.time() >= self._expires_at:
+            # Claves vencidas: se siguen usando mientras se renuevan
+            self._refresh_in_background()
+
+        key = self._keys.get(kid)
+        if key is None:
+            self.unknown_kids += 1
+            thread = self._refresh_in_background()
+            if thread is not None:
+                thread.join(self.refresh_wait)
+            key = self._keys.get(kid)
+        return key
+
+    def refresh(self):
+        """Descargar el JWKS y actualizar la caché en memoria y en disco"""
+        self._last_fetch = time.time()
+        try:
+            response = get_http_client().get(self.url, timeout=self.timeout)
+            response.raise_for_status()
+            jwks = response.json()
+            max_age = _parse_max_age(response.headers.get('Cache-Control'))
+            self._store(jwks, time.time() + max_age)
+        except Exception as e:
+            self.fetch_errors += 1
+            current_app.logger.warning('No se pudo descargar el JWKS de %s: %s', self.url, e)
+            return False
+
+        self.fetches += 1
+        self._save_to_disk(jwks)
+        return True
+
+    def _refresh_in_background(self):
+        """
+        Lanzar una recarga si no hay otra en curso y no se hizo una recientemente
+
+        Returns:
+            Hilo de la recarga en curso o None si no corresponde recargar
+        """
+        with self._lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return self._refresh_thread
+            if time.time() - self._last_fetch < self.min_refresh_interval:
+                return None
+            app = current_app._get_current_object()
+
+            def run():
+                with app.app_context():
+                    self.refresh()
+
+            self._last_fetch = time.time()
+            self._refresh_thread = threading.Thread(target=run, name='jwks-refresh', daemon=True)
+            self._refresh_thread.start()
+            return self._refresh_thread
+
+    def _store(self, jwks, expires_at):
+        keys = {}
+        for jwk in jwks.get('keys', []):
+            try:
+                keys[jwk['kid']] = jwt.PyJWK(jwk)
+            except (KeyError, jwt.PyJWTError):
+                continue
+        if not keys:
+            raise ValueError('JWKS sin claves utilizables')
+        self._keys = keys
+        self._expires_at = expires_at
+
+    def _load_from_disk(self):
+        """Cargar las claves guardadas por una ejecución anterior si siguen vigentes"""
+        self._disk_loaded = True
+        if not self.cache_path:
+            return
+        try:
+            with open(self.cache_path, encoding='utf-8') as f:
+                cached = json.load(f)
+            if cached['url'] == self.url and cached['expires_at'] > time.time():
+                self._store(cached['jwks'], cached['expires_at'])
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    def _save_to_disk(self, jwks):
+        if not self.cache_path:
+            return
+        try:
+            # Escritura atómica: otros workers pueden estar leyendo el archivo
+            tmp_path = f'{self.cache_path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'url': self.url, 'expires_at': self._expires_at, 'jwks': jwks}, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            current_app.logger.warning('No se pudo guardar el JWKS en %s: %s', self.cache_path, e)
+
+    def stats(self):
+        return {
+            'keys': len(self._keys),
+            'expires_in_seconds': max(0, round(self._expires_at - time.time())) if self._keys else None,
+            'fetches': self.fetches,
+            'fetch_errors': self.fetch_errors,
+            'unknown_kids': self.unknown_kids
+        }
+
+
+def _parse_max_age(cache_control):
+    """Segundos de max-age de un encabezado Cache-Control"""
+    match = _MAX_AGE_RE.search(cache_control or '')
+    return int(match.group(1)) if match else _DEFAULT_MAX_AGE
+
+
+def init_google_tokens(app):
+    """Crear la caché del JWKS de Google y registrar sus métricas"""
+    cache = JWKSCache(
+        app.config['GOOGLE_JWKS_URL'],
+        cache_path=app.config['GOOGLE_JWKS_CACHE_PATH'],
+        timeout=app.config['GOOGLE_JWKS_TIMEOUT']
+    )
+    app.extensions['google_jwks'] = cache
+    register_metrics(app, 'google_jwks', cache.stats)
+    return cache
+
+
+def verify_google_id_token(token):
+    """
+    Verificar firma, emisor, audiencia y vigencia de un ID token de Google
+
+    Args:
+        token: ID token (JWT) recibido del frontend
+
+    Returns:
+        Claims del token (email, sub, given_name, family_name, picture, ...)
+
+    Raises:
+        InvalidGoogleTokenError: Si el token no es válido
+    """
+    try:
+        header = jwt.get_unverified_header(token)
+    except jwt.PyJWTError as e:
+        raise InvalidGoogleTokenError(f'Token mal formado: {e}')
+
+    key = current_app.extensions['google_jwks'].get_key(header.get('kid'))
+    if key is None:
+        raise InvalidGoogleTokenError('Clave de firma desconocida')
+
+    try:
+        claims = jwt.decode(
+            token,
+            key=key,
+            algorithms=['RS256'],
+            audience=current_app.config['GOOGLE_CLIENT_ID'],
+            options={'require': ['exp', 'iat', 'iss', 'aud', 'sub']},
+            leeway=30
+        )
+    except jwt.PyJWTError as e:
+        raise InvalidGoogleTokenError(str(e))
+
+    if claims['iss'] not in GOOGLE_ISSUERS:
+        raise InvalidGoogleTokenError('Emisor inválido')
+    return claims
@@ -0,0 +1,257 @@
+"""
+Cliente HTTP saliente compartido
+
+Todas las llamadas a servicios externos (Google OAuth, JWKS, discovery)
+pasan por un único cliente que mantiene:
+
+  - un pool de conexiones keep-alive por host
+  - timeouts de conexión y lectura por defecto
+  - reintentos acotados con backoff exponencial y jitter (solo métodos
+    idempotentes y errores transitorios)
+  - un circuit breaker por host: tras HTTP_BREAKER_FAILURES fallos seguidos
+    las llamadas fallan de inmediato durante HTTP_BREAKER_RESET_TIMEOUT
+    segundos en lugar de ocupar hilos esperando a un proveedor degradado
+
+Los pools no sobreviven a un fork (gunicorn con preload_app): un proceso
+hijo descarta los heredados y abre sus propias conexiones.
+"""
+
+import os
+import random
+import threading
+import time
+from collections import namedtuple
+from urllib.parse import urlsplit
+
+import requests
+from flask import current_app
+from requests.adapters import HTTPAdapter
+
+from app.utils.metrics import register_metrics
+
+
+# Métodos que se pueden reintentar sin efectos secundarios
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+# Respuestas que indican un problema transitorio del proveedor
+RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """El circuit breaker del host está abierto"""
+
+
+class CircuitBreaker:
+    """Circuit breaker cerrado / abierto / semiabierto por cantidad de fallos seguidos"""
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trips = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def allow(self):
+        """Indica si se puede hacer una llamada (en semiabierto solo una de prueba)"""
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._probe_in_flight or self.failures >= self.failure_threshold:
+                if self.opened_at is None or self._probe_in_flight:
+                    self.trips += 1
+                self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+
+_Host = namedtuple('_Host', ['session', 'adapter', 'breaker', 'counters'])
+
+
+class HTTPClient:
+    """Cliente HTTP con sesiones por host, timeouts, reintentos y circuit breaker"""
+
+    def __init__(self, connect_timeout=3.05, read_timeout=10.0, max_retries=2,
+                 backoff_base=0.2, backoff_max=2.0, pool_maxsize=10,
+                 breaker_failures=5, breaker_reset_timeout=30.0):
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.pool_maxsize = pool_maxsize
+        self.breaker_failures = breaker_failures
+        self.breaker_reset_timeout = breaker_reset_timeout
+        self._hosts = {}  # host -> _Host
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def _reset_after_fork(self):
+        """
+        Descartar lo heredado del proceso padre
+
+        Los sockets keep-alive son del padre y un lock tomado por uno de sus
+        hilos durante el fork quedaría tomado para siempre: no se cierran ni se
+        adquieren, se reemplazan. Sin tomar el lock viejo; si dos hilos del hijo
+        llegan a la vez, a lo sumo se descarta una sesión recién creada.
+        """
+        self._lock = threading.Lock()
+        self._hosts = {}
+        self._pid = os.getpid()
+
+    def _host(self, url):
+        """Sesión, adaptador, breaker y contadores del host de la URL (se crean al primer uso)"""
+        if self._pid != os.getpid():
+            self._reset_after_fork()
+        host = urlsplit(url).netloc
+        entry = self._hosts.get(host)
+        if entry is None:
+            with self._lock:
+                entry = self._hosts.get(host)
+                if entry is None:
+                    # Sin reintentos propios del adaptador: los maneja request()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize, max_retries=0)
+                    session = requests.Session()
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    entry = self._hosts[host] = _Host(
+                        session, adapter,
+                        CircuitBreaker(self.breaker_failures, self.breaker_reset_timeout),
+                        {'requests': 0, 'retries': 0, 'failures': 0, 'rejected': 0}
+                    )
+        return entry
+
+    def adapter_for(self, url):
+        """Adaptador con el pool keep-alive del host (para montarlo en otras sesiones)"""
+        return self._host(url).adapter
+
+    def guarded(self, url, send):
+        """
+        Ejecutar un único intento de petición bajo el circuit breaker del host
+
+        Args:
+            url: URL de la petición (determina el host)
+            send: Función sin argumentos que hace la petición y devuelve la respuesta
+
+        Raises:
+            CircuitOpenError: Si el host está marcado como degradado
+        """
+        host = self._host(url)
+        if not host.breaker.allow():
+            host.counters['rejected'] += 1
+            raise CircuitOpenError(f'Circuito abierto para {urlsplit(url).netloc}')
+
+        host.counters['requests'] += 1
+        exito = False
+        try:
+            response = send()
+            exito = response.status_code not in RETRY_STATUS
+            return response
+        finally:
+            # Cualquier salida registra el resultado y libera la llamada de
+            # prueba del semiabierto, también ante excepciones inesperadas
+            if exito:
+                host.breaker.record_success()
+            else:
+                host.breaker.record_failure()
+                host.counters['failures'] += 1
+
+    def request(self, method, url, retries=None, **kwargs):
+        """
+        Hacer una petición HTTP
+
+        Args:
+            method: Método HTTP
+            url: URL absoluta
+            retries: Reintentos máximos (por defecto HTTP_MAX_RETRIES; 0 para
+                     métodos no idempotentes)
+            **kwargs: Argumentos de requests (timeout, params, json, headers...)
+
+        Returns:
+            requests.Response (también para respuestas 4xx/5xx)
+
+        Raises:
+            CircuitOpenError: Si el host está marcado como degradado
+            requests.RequestException: Si fallan todos los intentos
+        """
+        method = method.upper()
+        host = self._host(url)
+        kwargs.setdefault('timeout', self.timeout)
+        if retries is None:
+            retries = self.max_retries if method in IDEMPOTENT_METHODS else 0
+
+        attempt = 0
+        while True:
+            try:
+                response = self.guarded(url, lambda: host.session.request(method, url, **kwargs))
+            except CircuitOpenError:
+                raise
+            except requests.RequestException:
+                if attempt >= retries:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUS or attempt >= retries:
+                    return response
+                response.close()
+
+            attempt += 1
+            host.counters['retries'] += 1
+            time.sleep(self._backoff(attempt))
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def _backoff(self, attempt):
+        """Espera antes del reintento: backoff exponencial con jitter completo"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def stats(self):
+        return {
+            name: dict(host.counters, breaker=host.breaker.state, breaker_trips=host.breaker.trips)
+            for name, host in list(self._hosts.items())
+        }
+
+
+def init_http_client(app):
+    """Crear el cliente HTTP saliente con la configuración de la aplicación"""
+    client = HTTPClient(
+        connect_timeout=app.config['HTTP_CONNECT_TIMEOUT'],
+        read_timeout=app.config['HTTP_READ_TIMEOUT'],
+        max_retries=app.config['HTTP_MAX_RETRIES'],
+        pool_maxsize=app.config['HTTP_POOL_MAXSIZE'],
+        breaker_failures=app.config['HTTP_BREAKER_FAILURES'],
+        breaker_reset_timeout=app.config['HTTP_BREAKER_RESET_TIMEOUT']
+    )
+    app.extensions['http_client'] = client
+    register_metrics(app, 'http_client', client.stats)
+    return client
+
+
+def get_http_client():
+    """Cliente HTTP saliente de la aplicación actual"""
+    return current_app.extensions['http_client']
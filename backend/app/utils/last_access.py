@@ -0,0 +1,170 @@
+"""
+Escritura diferida (write-behind) de User.ultimo_acceso
+
+Cada inicio de sesión registra su marca de tiempo en un buffer en memoria en
+lugar de hacer UPDATE + commit en la petición. Un hilo de fondo agrupa las
+entradas pendientes (la más reciente por CI) y las escribe con un único
+UPDATE por lotes cada LAST_ACCESS_FLUSH_INTERVAL segundos o al acumular
+LAST_ACCESS_FLUSH_MAX_PENDING usuarios. Lo pendiente se escribe también al
+terminar el proceso.
+"""
+
+import atexit
+import os
+import threading
+import time
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import bindparam, or_
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.core.database import db
+from app.models import User
+from app.utils.metrics import register_metrics
+
+
+class LastAccessBuffer:
+    """Buffer de últimos accesos con vaciado periódico en segundo plano"""
+
+    def __init__(self, app, interval=5.0, max_pending=500):
+        self.app = app
+        self.interval = interval
+        self.max_pending = max_pending
+        self._pending = {}  # ci -> (ultimo_acceso, registrado_en)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+        self.flushes = 0
+        self.rows_flushed = 0
+        self.errors = 0
+        self.last_flush_at = None
+        self.last_flush_ms = None
+
+    def record(self, ci, when):
+        """Registrar un acceso; se conserva la marca más reciente por usuario"""
+        self._ensure_flusher()
+        with self._lock:
+            previous = self._pending.get(ci)
+            if previous is None or previous[0] < when:
+                registrado_en = previous[1] if previous else time.monotonic()
+                self._pending[ci] = (when, registrado_en)
+            pending = len(self._pending)
+        if pending >= self.max_pending:
+            self._wakeup.set()
+
+    def flush(self):
+        """
+        Escribir todas las entradas pendientes en un UPDATE por lotes
+
+        Returns:
+            Número de usuarios escritos
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+
+            table = User.__table__
+            statement = (
+                table.update()
+                .where(table.c.ci == bindparam('b_ci'))
+                # No retroceder la marca si otro worker ya escribió una más reciente
+                .where(or_(table.c.ultimo_acceso.is_(None), table.c.ultimo_acceso < bindparam('b_ts')))
+                .values(ultimo_acceso=bindparam('b_ts'))
+            )
+            params = [{'b_ci': ci, 'b_ts': when} for ci, (when, _) in batch.items()]
+
+            inicio = time.perf_counter()
+            try:
+                with self.app.app_context():
+                    with db.engine.begin() as connection:
+                        connection.execute(statement, params)
+            except Exception as e:
+                # Reintentar en el próximo ciclo sin pisar accesos más nuevos
+                with self._lock:
+                    for ci, entry in batch.items():
+                        current = self._pending.get(ci)
+                        if current is None or current[0] < entry[0]:
+                            self._pending[ci] = entry
+                    self.errors += 1
+                self.app.logger.warning('No se pudo escribir ultimo_acceso: %s', e)
+                return 0
+
+            self.flushes += 1
+            self.rows_flushed += len(batch)
+            self.last_flush_at = time.monotonic()
+            self.last_flush_ms = round((time.perf_counter() - inicio) * 1000, 2)
+            return len(batch)
+
+    def _ensure_flusher(self):
+        """Iniciar el hilo de vaciado en este proceso (los hilos no sobreviven a un fork)"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                # Proceso hijo: lo heredado pertenece al padre, que lo escribe
+                self._pending = {}
+            self._thread = threading.Thread(target=self._run, name='last-access-flusher', daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def stats(self):
+        ahora = time.monotonic()
+        with self._lock:
+            pending = len(self._pending)
+            oldest = min((entry[1] for entry in self._pending.values()), default=None)
+        return {
+            'pending': pending,
+            'max_pending': self.max_pending,
+            'flush_interval_seconds': self.interval,
+            'flushes': self.flushes,
+            'rows_flushed': self.rows_flushed,
+            'errors': self.errors,
+            # Antigüedad del acceso pendiente más viejo (retraso del write-behind)
+            'lag_seconds': round(ahora - oldest, 3) if oldest is not None else 0.0,
+            'seconds_since_last_flush': round(ahora - self.last_flush_at, 3) if self.last_flush_at else None,
+            'last_flush_ms': self.last_flush_ms
+        }
+
+
+def init_last_access(app):
+    """Crear el buffer de últimos accesos, registrar sus métricas y el vaciado al salir"""
+    buffer = LastAccessBuffer(
+        app,
+        interval=app.config['LAST_ACCESS_FLUSH_INTERVAL'],
+        max_pending=app.config['LAST_ACCESS_FLUSH_MAX_PENDING']
+    )
+    app.extensions['last_access'] = buffer
+    register_metrics(app, 'last_access', buffer.stats)
+    atexit.register(buffer.flush)
+    return buffer
+
+
+def touch_last_access(user):
+    """
+    Registrar el acceso de un usuario sin escribir en la base de datos
+
+    El atributo se actualiza como valor ya confirmado, de modo que la
+    respuesta lo muestra pero la sesión no genera un UPDATE por él.
+
+    Args:
+        user: Instancia de User que acaba de iniciar sesión
+    """
+    # Leer el CI primero: si la instancia expiró tras un commit, la recarga
+    # no debe pisar el valor asignado a continuación
+    ci = user.ci
+    now = datetime.utcnow()
+    set_committed_value(user, 'ultimo_acceso', now)
+    current_app.extensions['last_access'].record(ci, now)
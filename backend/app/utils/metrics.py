@@ -0,0 +1,26 @@
+"""
+Registro de métricas internas del proceso
+
+Cada componente registra una función que devuelve un dict con sus contadores;
+el endpoint /metrics las reúne en una sola respuesta.
+"""
+
+from flask import current_app
+
+
+def register_metrics(app, name, provider):
+    """
+    Registrar una fuente de métricas
+
+    Args:
+        app: Aplicación Flask
+        name: Nombre de la sección (ej. 'cache')
+        provider: Función sin argumentos que devuelve un dict serializable
+    """
+    app.extensions.setdefault('metrics', {})[name] = provider
+
+
+def collect_metrics():
+    """Reunir las métricas de todas las fuentes registradas en la aplicación actual"""
+    providers = current_app.extensions.get('metrics', {})
+    return {name: provider() for name, provider in providers.items()}
@@ -0,0 +1,303 @@
+"""
+Ejecutor de migraciones en línea
+
+Herramientas para cambiar el esquema de tablas grandes y con tráfico sin
+bloqueos largos:
+
+  - DDL protegido por lock_timeout: cada sentencia va en su propia
+    transacción corta y, si no obtiene el lock a tiempo, se reintenta con
+    espera creciente en lugar de encolar a todas las consultas detrás de ella
+  - índices con CREATE INDEX CONCURRENTLY (los inválidos de una ejecución
+    interrumpida se eliminan y se vuelven a crear)
+  - backfills por lotes según la clave primaria, con pausa entre lotes,
+    punto de control en la misma transacción que cada lote (se reanudan
+    donde quedaron) y reporte de avance con ETA
+
+Funciona sobre PostgreSQL y SQLite (en SQLite no hay locks que proteger y
+algunas operaciones se omiten), por lo que se puede probar localmente.
+"""
+
+import time
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import OperationalError
+
+from app.core.database import sqlstate
+
+
+# SQLSTATE de PostgreSQL cuando se agota lock_timeout
+_LOCK_NOT_AVAILABLE = '55P03'
+
+CHECKPOINT_TABLE = 'migraciones_checkpoint'
+
+
+class MigrationError(RuntimeError):
+    """La migración no pudo completarse"""
+
+
+class OnlineMigrator:
+    """
+    Ejecutor de pasos de migración sobre un engine de SQLAlchemy
+
+    Args:
+        engine: Engine de la base de datos
+        lock_timeout: Espera máxima por un lock en cada DDL (ej. '2s')
+        max_attempts: Intentos por DDL antes de abortar
+        retry_wait: Espera base entre intentos (se duplica en cada uno)
+        log: Función que recibe los mensajes de avance
+    """
+
+    def __init__(self, engine, lock_timeout='2s', max_attempts=10, retry_wait=1.0, log=print):
+        self.engine = engine
+        self.lock_timeout = lock_timeout
+        self.max_attempts = max_attempts
+        self.retry_wait = retry_wait
+        self.log = log
+        self.postgresql = engine.dialect.name == 'postgresql'
+
+    # ---------- DDL ----------
+
+    def run_ddl(self, sql):
+        """
+        Ejecutar una sentencia DDL en su propia transacción con lock_timeout
+
+        Raises:
+            MigrationError: Si el lock no se obtuvo en ningún intento
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                with self.engine.begin() as connection:
+                    if self.postgresql:
+                        connection.execute(text(f"SET LOCAL lock_timeout = '{self.lock_timeout}'"))
+                    connection.execute(text(sql))
+                return
+            except OperationalError as e:
+                if not self._is_lock_timeout(e):
+                    raise
+                if attempt == self.max_attempts:
+                    raise MigrationError(
+                        f'No se obtuvo el lock tras {attempt} intentos: {sql}'
+                    ) from e
+                wait = self.retry_wait * 2 ** (attempt - 1)
+                self.log(f'  lock no disponible (intento {attempt}/{self.max_attempts}), reintentando en {wait:.1f}s')
+                time.sleep(wait)
+
+    @staticmethod
+    def _is_lock_timeout(error):
+        return sqlstate(error) == _LOCK_NOT_AVAILABLE
+
+    def has_column(self, table, column):
+        return column in {c['name'] for c in inspect(self.engine).get_columns(table)}
+
+    def add_column(self, table, column, column_type):
+        """
+        Agregar una columna nullable sin valor por defecto
+
+        En PostgreSQL solo modifica el catálogo (no reescribe la tabla); los
+        valores iniciales se cargan después con backfill().
+        """
+        if self.has_column(table, column):
+            self.log(f'= {table}.{column} ya existe')
+            return
+        self.log(f'+ {table}.{column} {column_type}')
+        self.run_ddl(f'ALTER TABLE {table} ADD COLUMN {column} {column_type}')
+
+    def drop_not_null(self, table, column):
+        """Permitir NULL en una columna (solo catálogo en PostgreSQL)"""
+        if not self.postgresql:
+            # SQLite no tiene ALTER COLUMN; sus esquemas de prueba salen de los modelos
+            self.log(f'= {table}.{column}: DROP NOT NULL no aplica en {self.engine.dialect.name}')
+            return
+        nullable = next(c['nullable'] for c in inspect(self.engine).get_columns(table) if c['name'] == column)
+        if nullable:
+            self.log(f'= {table}.{column} ya admite NULL')
+            return
+        self.log(f'~ {table}.{column} DROP NOT NULL')
+        self.run_ddl(f'ALTER TABLE {table} ALTER COLUMN {column} DROP NOT NULL')
+
+    def create_index(self, name, table, columns, where=None, unique=False):
+        """
+        Crear un índice sin bloquear escrituras
+
+        Args:
+            name: Nombre del índice
+            table: Tabla
+            columns: Expresión de columnas (ej. 'lower(correo)')
+            where: Condición de índice parcial
+            unique: Índice único
+        """
+        if self.postgresql:
+            with self.engine.connect() as connection:
+                valido = connection.execute(text(
+                    'SELECT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid '
+                    'WHERE c.relname = :name'
+                ), {'name': name}).scalar()
+            if valido:
+                self.log(f'= índice {name} ya existe')
+                return
+            if valido is False:
+                self.log(f'- índice {name} inválido (construcción interrumpida), se recrea')
+                self._autocommit(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+        elif name in {index['name'] for index in inspect(self.engine).get_indexes(table)}:
+            self.log(f'= índice {name} ya existe')
+            return
+
+        sql = 'CREATE {unique}INDEX {concurrently}IF NOT EXISTS {name} ON {table} ({columns}){where}'.format(
+            unique='UNIQUE ' if unique else '',
+            concurrently='CONCURRENTLY ' if self.postgresql else '',
+            name=name, table=table, columns=columns,
+            where=f' WHERE {where}' if where else ''
+        )
+        self.log(f'+ índice {name}')
+        inicio = time.monotonic()
+        self._autocommit(sql)
+        self.log(f'  listo en {time.monotonic() - inicio:.1f}s')
+
+    def _autocommit(self, sql):
+        """CONCURRENTLY no puede ejecutarse dentro de una transacción"""
+        with self.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+            if self.postgresql:
+                connection.execute(text(f"SET lock_timeout = '{self.lock_timeout}'"))
+            connection.execute(text(sql))
+
+    # ---------- Backfill ----------
+
+    def _ensure_checkpoint_table(self):
+        self.run_ddl(
+            f'CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} ('
+            ' nombre VARCHAR(100) PRIMARY KEY,'
+            ' ultima_clave VARCHAR(255),'
+            ' filas INTEGER NOT NULL DEFAULT 0,'
+            ' completado BOOLEAN NOT NULL DEFAULT FALSE,'
+            ' actualizado TIMESTAMP NOT NULL)'
+        )
+
+    def _load_checkpoint(self, name):
+        with self.engine.connect() as connection:
+            row = connection.execute(
+                text(f'SELECT ultima_clave, filas, completado FROM {CHECKPOINT_TABLE} WHERE nombre = :nombre'),
+                {'nombre': name}
+            ).first()
+        return row
+
+    def _count_pending(self, table, key, where, last_key):
+        """Filas que faltan por recorrer (estimación por catálogo en tablas grandes de PostgreSQL)"""
+        condiciones = [f'({where})'] if where else []
+        params = {}
+        if last_key is not None:
+            condiciones.append(f'{key} > :ultima')
+            params['ultima'] = last_key
+        sql = f'SELECT count(*) FROM {table}'
+        if condiciones:
+            sql += ' WHERE ' + ' AND '.join(condiciones)
+        with self.engine.connect() as connection:
+            if self.postgresql:
+                estimado = connection.execute(
+                    text('SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:tabla)'),
+                    {'tabla': table}
+                ).scalar()
+                if estimado and estimado > 1_000_000:
+                    # Cota superior barata: el count exacto recorrería toda la tabla
+                    return int(estimado)
+            return connection.execute(text(sql), params).scalar()
+
+    def backfill(self, name, table, key, set_sql, where=None, batch_size=1000, sleep=0.1):
+        """
+        Actualizar una tabla por lotes de clave primaria
+
+        Cada lote es una transacción corta que también guarda el punto de
+        control, de modo que interrumpir y volver a ejecutar continúa desde el
+        último lote confirmado.
+
+        Args:
+            name: Identificador del backfill (clave del punto de control)
+            table: Tabla a actualizar
+            key: Columna de clave primaria (orden de recorrido)
+            set_sql: Asignaciones SET (ej. "provider = 'local'")
+            where: Condición de las filas a actualizar
+            batch_size: Filas por lote
+            sleep: Pausa entre lotes en segundos (throttling)
+
+        Returns:
+            Filas actualizadas en esta ejecución
+        """
+        self._ensure_checkpoint_table()
+        checkpoint = self._load_checkpoint(name)
+        if checkpoint is not None and checkpoint.completado:
+            self.log(f'= backfill {name} ya completado ({checkpoint.filas} filas)')
+            return 0
+
+        last_key = checkpoint.ultima_clave if checkpoint else None
+        filas_previas = checkpoint.filas if checkpoint else 0
+        pendientes = self._count_pending(table, key, where, last_key)
+        self.log(f'> backfill {name}: ~{pendientes} filas pendientes'
+                 + (f' (reanudando después de {key}={last_key})' if last_key is not None else ''))
+
+        filtro = f' AND ({where})' if where else ''
+        actualizadas = 0
+        inicio = time.monotonic()
+        while True:
+            with self.engine.begin() as connection:
+                if self.postgresql:
+                    connection.execute(text(f"SET LOCAL lock_timeout = '{self.lock_timeout}'"))
+                condiciones = [f'{key} > :ultima'] if last_key is not None else []
+                if where:
+                    condiciones.append(f'({where})')
+                sql = f'SELECT {key} FROM {table}'
+                if condiciones:
+                    sql += ' WHERE ' + ' AND '.join(condiciones)
+                claves = connection.execute(
+                    text(f'{sql} ORDER BY {key} LIMIT :limite'),
+                    {'ultima': last_key, 'limite': batch_size}
+                ).scalars().all()
+                if not claves:
+                    self._save_checkpoint(connection, name, last_key, filas_previas + actualizadas, True)
+                    break
+
+                resultado = connection.execute(
+                    text(f'UPDATE {table} SET {set_sql} WHERE {key} >= :primera AND {key} <= :ultima{filtro}'),
+                    {'primera': claves[0], 'ultima': claves[-1]}
+                )
+                actualizadas += resultado.rowcount
+                last_key = claves[-1]
+                self._save_checkpoint(connection, name, last_key, filas_previas + actualizadas, False)
+
+            self._report(name, actualizadas, pendientes, inicio)
+            if len(claves) < batch_size:
+                with self.engine.begin() as connection:
+                    self._save_checkpoint(connection, name, last_key, filas_previas + actualizadas, True)
+                break
+            if sleep:
+                time.sleep(sleep)
+
+        self.log(f'  backfill {name} completado: {actualizadas} filas en {time.monotonic() - inicio:.1f}s')
+        return actualizadas
+
+    def _save_checkpoint(self, connection, name, last_key, filas, completado):
+        params = {
+            'nombre': name,
+            'ultima': None if last_key is None else str(last_key),
+            'filas': filas,
+            'completado': completado,
+            'ahora': datetime.utcnow()
+        }
+        actualizado = connection.execute(text(
+            f'UPDATE {CHECKPOINT_TABLE} SET ultima_clave = :ultima, filas = :filas, '
+            'completado = :completado, actualizado = :ahora WHERE nombre = :nombre'
+        ), params).rowcount
+        if not actualizado:
+            connection.execute(text(
+                f'INSERT INTO {CHECKPOINT_TABLE} (nombre, ultima_clave, filas, completado, actualizado) '
+                'VALUES (:nombre, :ultima, :filas, :completado, :ahora)'
+            ), params)
+
+    def _report(self, name, hechas, pendientes, inicio):
+        transcurrido = time.monotonic() - inicio
+        if pendientes:
+            porcentaje = min(100.0, hechas * 100 / pendientes)
+            eta = transcurrido / hechas * (pendientes - hechas) if hechas else 0
+            self.log(f'  {name}: {hechas}/{pendientes} ({porcentaje:.1f}%) '
+                     f'{hechas / transcurrido if transcurrido else 0:.0f} filas/s, ETA {max(0, eta):.0f}s')
+        else:
+            self.log(f'  {name}: {hechas} filas')
@@ -0,0 +1,130 @@
+"""
+Utilidades de paginación para la API
+"""
+
+import base64
+import json
+from datetime import date, datetime
+
+
+class InvalidCursorError(ValueError):
+    """Cursor de paginación malformado o manipulado"""
+
+
+def encode_cursor(values):
+    """
+    Codificar la posición de la última fila como cursor opaco
+
+    Args:
+        values: Diccionario con los valores de las columnas de ordenamiento
+                (las fechas se guardan en ISO 8601)
+
+    Returns:
+        Cursor en base64 urlsafe, sin relleno
+    """
+    raw = json.dumps(values, separators=(',', ':'), sort_keys=True, default=_isoformat).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def _isoformat(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f'Valor no serializable en el cursor: {value!r}')
+
+
+def decode_cursor(cursor, keys):
+    """
+    Decodificar un cursor generado por encode_cursor
+
+    Args:
+        cursor: Cursor recibido del cliente
+        keys: Diccionario clave -> tipo esperado (str, int, date o datetime)
+
+    Returns:
+        Diccionario con los valores de las columnas de ordenamiento, con las
+        fechas ya convertidas a date/datetime
+
+    Raises:
+        InvalidCursorError: Si el cursor no puede decodificarse o algún valor
+            no tiene el tipo esperado
+    """
+    try:
+        padding = '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError('Cursor inválido') from e
+
+    if not isinstance(values, dict) or set(values) != set(keys):
+        raise InvalidCursorError('Cursor inválido')
+
+    return {key: _cursor_value(values[key], expected) for key, expected in keys.items()}
+
+
+def _cursor_value(value, expected):
+    """Validar (y convertir, si es fecha) un valor del cursor"""
+    if expected in (date, datetime):
+        if not isinstance(value, str):
+            raise InvalidCursorError('Cursor inválido')
+        try:
+            return expected.fromisoformat(value)
+        except ValueError as e:
+            raise InvalidCursorError('Cursor inválido') from e
+
+    # bool es subclase de int, pero true/false no es una posición válida
+    if not isinstance(value, expected) or isinstance(value, bool):
+        raise InvalidCursorError('Cursor inválido')
+    return value
+
+
+COUNT_STRATEGIES = ('exact', 'estimated', 'none')
+
+
+def count_rows(query, strategy='exact'):
+    """
+    Obtener el total de filas de una consulta según la estrategia pedida
+
+    Args:
+        query: Consulta ORM (sin limit/offset)
+        strategy: 'exact' (COUNT real), 'estimated' (estimación del planificador)
+                  o 'none' (no contar)
+
+    Returns:
+        Tupla (total, estrategia_usada). La estrategia usada puede diferir de la
+        pedida cuando no hay estimación disponible (ej. SQLite o tabla sin ANALYZE),
+        en cuyo caso se recurre al conteo exacto.
+    """
+    if strategy == 'none':
+        return None, 'none'
+
+    if strategy == 'estimated':
+        total = _estimate_rows(query)
+        if total is not None:
+            return total, 'estimated'
+
+    return query.order_by(None).count(), 'exact'
+
+
+def _estimate_rows(query):
+    """Leer la estimación de filas del planificador de PostgreSQL"""
+    connection = query.session.connection()
+    if connection.dialect.name != 'postgresql':
+        return None
+
+    if query.whereclause is None:
+        # Sin filtros basta con las estadísticas de la tabla
+        table = query.column_descriptions[0]['entity'].__table__
+        reltuples = connection.exec_driver_sql(
+            'SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%(tabla)s)',
+            {'tabla': table.fullname}
+        ).scalar()
+        # reltuples = -1 indica que la tabla nunca fue analizada
+        return reltuples if reltuples is not None and reltuples >= 0 else None
+
+    statement = query.order_by(None).statement
+    compiled = statement.compile(dialect=connection.dialect)
+    plan = connection.exec_driver_sql(
+        f'EXPLAIN (FORMAT JSON) {compiled}', compiled.params
+    ).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
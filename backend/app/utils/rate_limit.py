@@ -0,0 +1,201 @@
+"""
+Limitación de tasa con token buckets
+
+Los límites se definen en Config.RATE_LIMITS por endpoint ('auth.login') o
+por blueprint ('auth'); el más específico gana. Cada regla puede limitar por
+IP y/o por cuenta (el campo 'correo' del cuerpo JSON), por ejemplo:
+
+    RATE_LIMITS = {
+        'auth.login': {'ip': '20/minute', 'account': '5/minute'},
+        'auth.refresh': {},
+        'auth': {'ip': '120/minute'},
+    }
+
+Una regla de endpoint tiene su propio bucket; la de un blueprint comparte un
+solo bucket entre todos los endpoints del blueprint que no tienen regla
+propia. Una regla vacía ({}) exime al endpoint de la del blueprint. Una
+petición solo consume tokens si todos sus alcances lo permiten: un rechazo
+por cuenta no gasta el bucket de la IP.
+
+La IP es request.remote_addr: detrás de un proxy inverso hay que configurar
+PROXY_FIX_X_FOR para que refleje la del cliente y no la del proxy.
+
+La verificación ocurre en before_request, antes de validar el cuerpo, el JWT
+o tocar la base de datos: rechazar una petición cuesta unos microsegundos.
+Los buckets viven en memoria, repartidos en shards con su propio lock para
+que los hilos no compitan por uno solo; con varios workers cada uno aplica
+el límite por separado.
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from flask import request
+
+from app.utils.metrics import register_metrics
+from app.utils.responses import error_response
+
+
+_PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+
+def parse_limit(limit):
+    """
+    Convertir '10/minute' en (capacidad, tokens por segundo)
+
+    La capacidad (ráfaga máxima) es igual a la cantidad del periodo.
+    """
+    amount, _, period = limit.partition('/')
+    period = period.strip().rstrip('s')
+    if period not in _PERIODS:
+        raise ValueError(f'Periodo de límite inválido: {limit}')
+    amount = int(amount)
+    return amount, amount / _PERIODS[period]
+
+
+class TokenBucketLimiter:
+    """
+    Token buckets por clave repartidos en shards
+
+    Cada shard es un LRU acotado: al llegar a max_keys_per_shard se descarta el
+    bucket usado hace más tiempo en O(1). Claves nuevas en cada petición (ej.
+    un correo distinto por intento) no hacen crecer la memoria ni el costo.
+    """
+
+    def __init__(self, shards=16, max_keys_per_shard=10000):
+        self.max_keys_per_shard = max_keys_per_shard
+        self.evictions = 0
+        # Cada shard: clave -> [tokens, última recarga, capacidad, tokens por segundo]
+        self._shards = [(OrderedDict(), threading.Lock()) for _ in range(shards)]
+
+    def consume(self, key, capacity, rate):
+        """
+        Tomar un token del bucket de la clave
+
+        Returns:
+            (permitido, segundos hasta que haya un token disponible)
+        """
+        buckets, lock = self._shards[hash(key) % len(self._shards)]
+        now = time.monotonic()
+        with lock:
+            bucket = buckets.get(key)
+            if bucket is None:
+                if len(buckets) >= self.max_keys_per_shard:
+                    buckets.popitem(last=False)
+                    self.evictions += 1
+                bucket = buckets[key] = [capacity, now, capacity, rate]
+            else:
+                buckets.move_to_end(key)
+                bucket[0] = min(capacity, bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return True, 0.0
+            return False, (1 - bucket[0]) / rate
+
+    def refund(self, key):
+        """Devolver un token tomado con consume (la petición no llegó a pasar)"""
+        buckets, lock = self._shards[hash(key) % len(self._shards)]
+        with lock:
+            bucket = buckets.get(key)
+            if bucket is not None:
+                bucket[0] = min(bucket[2], bucket[0] + 1)
+
+    def size(self):
+        return sum(len(buckets) for buckets, _ in self._shards)
+
+
+class RateLimiter:
+    """Aplica las reglas de RATE_LIMITS a cada petición"""
+
+    def __init__(self, limits, shards=16):
+        self.buckets = TokenBucketLimiter(shards=shards)
+        self.rules = {
+            target: {scope: parse_limit(limit) for scope, limit in rule.items()}
+            for target, rule in limits.items()
+        }
+        self.allowed = 0
+        self.rejected = {}  # 'destino:scope' -> rechazos
+
+    def rule_for(self, endpoint, blueprint):
+        """
+        Regla aplicable a un endpoint
+
+        Returns:
+            (destino, regla): destino es el endpoint o el blueprint dueño de la
+            regla y forma parte de la clave de los buckets
+        """
+        if endpoint in self.rules:
+            return endpoint, self.rules[endpoint]
+        return blueprint, self.rules.get(blueprint)
+
+    def check(self):
+        """
+        Verificar la petición actual
+
+        Returns:
+            None si se permite, o la respuesta 429 a devolver
+        """
+        if request.method == 'OPTIONS' or request.endpoint is None:
+            return None
+        target, rule = self.rule_for(request.endpoint, request.blueprint)
+        if not rule:
+            return None
+
+        consumidos = []
+        for scope, (capacity, rate) in rule.items():
+            identifier = self._identifier(scope)
+            if identifier is None:
+                continue
+            bucket_key = (target, scope, identifier)
+            permitido, espera = self.buckets.consume(bucket_key, capacity, rate)
+            if permitido:
+                consumidos.append(bucket_key)
+                continue
+
+            # Rechazada: devolver los tokens ya tomados en los demás alcances
+            for consumido in consumidos:
+                self.buckets.refund(consumido)
+            key = f'{target}:{scope}'
+            self.rejected[key] = self.rejected.get(key, 0) + 1
+            response, status_code = error_response(
+                'Demasiadas solicitudes, intente nuevamente más tarde', 429
+            )
+            response.headers['Retry-After'] = str(max(1, math.ceil(espera)))
+            return response, status_code
+
+        self.allowed += 1
+        return None
+
+    @staticmethod
+    def _identifier(scope):
+        if scope == 'ip':
+            return request.remote_addr
+        if scope == 'account':
+            data = request.get_json(silent=True)
+            correo = data.get('correo') if isinstance(data, dict) else None
+            return correo.strip().lower() if isinstance(correo, str) and correo.strip() else None
+        raise ValueError(f'Alcance de límite desconocido: {scope}')
+
+    def stats(self):
+        return {
+            'allowed': self.allowed,
+            'rejected': dict(self.rejected),
+            'buckets': self.buckets.size(),
+            'evictions': self.buckets.evictions
+        }
+
+
+def init_rate_limiter(app):
+    """Crear el limitador y registrarlo antes de cada petición"""
+    if not app.config['RATE_LIMIT_ENABLED']:
+        return None
+
+    limiter = RateLimiter(app.config['RATE_LIMITS'], shards=app.config['RATE_LIMIT_SHARDS'])
+    app.extensions['rate_limiter'] = limiter
+    app.before_request(limiter.check)
+    register_metrics(app, 'rate_limit', limiter.stats)
+    return limiter
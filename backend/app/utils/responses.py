@@ -53,7 +53,7 @@ def error_response(message, status_code=400, errors=None):
     return jsonify(response), status_code
 
 
-def paginated_response(items, page, per_page, total, endpoint, **kwargs):
+def paginated_response(items, page, per_page, total, endpoint, count_strategy='exact', has_next=None, **kwargs):
     """
     Crear respuesta paginada estándar
     
@@ -61,8 +61,11 @@ def paginated_response(items, page, per_page, total, endpoint, **kwargs):
         items: Lista de elementos
         page: Página actual
         per_page: Elementos por página
-        total: Total de elementos
+        total: Total de elementos (None si no se contó)
         endpoint: Endpoint para links de paginación
+        count_strategy: Estrategia que produjo el total ('exact', 'estimated', 'none')
+        has_next: Indicador explícito de página siguiente; obligatorio cuando
+                  el total no es exacto
         **kwargs: Parámetros adicionales para URLs
     
     Returns:
@@ -72,8 +75,9 @@ def paginated_response(items, page, per_page, total, endpoint, **kwargs):
     
     # Calcular información de paginación
     has_prev = page > 1
-    has_next = page * per_page < total
-    total_pages = (total + per_page - 1) // per_page
+    if has_next is None:
+        has_next = total is not None and page * per_page < total
+    total_pages = (total + per_page - 1) // per_page if total is not None else None
     
     # Generar URLs de paginación
     def get_page_url(page_num):
@@ -87,6 +91,7 @@ def paginated_response(items, page, per_page, total, endpoint, **kwargs):
         'per_page': per_page,
         'total': total,
         'total_pages': total_pages,
+        'count_strategy': count_strategy,
         'has_prev': has_prev,
         'has_next': has_next
     }
@@ -97,9 +102,10 @@ def paginated_response(items, page, per_page, total, endpoint, **kwargs):
     if has_next:
         pagination_info['next_url'] = get_page_url(page + 1)
         
-    # Primera y última página
-    if total_pages > 0:
+    # Primera y última página (la última solo se conoce con un total)
+    if total_pages is None or total_pages > 0:
         pagination_info['first_url'] = get_page_url(1)
+    if total_pages:
         pagination_info['last_url'] = get_page_url(total_pages)
     
     response_data = {
@@ -0,0 +1,160 @@
+"""
+Revocación de tokens JWT
+
+Los jti revocados se guardan en la tabla tokens_revocados hasta que el token
+expira. Cada proceso mantiene en memoria el conjunto de jti revocados aún
+vigentes y lo sincroniza con la tabla de forma incremental cada
+JWT_REVOCATION_SYNC_INTERVAL segundos, por lo que verificar un token no
+revocado (el caso común) nunca consulta la base de datos. Una revocación
+hecha en otro worker se aplica aquí en, como máximo, ese intervalo; una hecha
+en este proceso se aplica de inmediato, también si ocurre durante una
+sincronización.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+
+from app.core.database import db, is_unique_violation, jwt
+from app.models import TokenRevocado
+from app.utils.metrics import register_metrics
+
+
+# Margen al sincronizar por fecha_revocacion (relojes de distintos hosts)
+_SYNC_OVERLAP = timedelta(seconds=30)
+
+
+def _exp_to_datetime(exp):
+    """Convertir el claim exp (epoch) a datetime UTC naive, como el resto de columnas"""
+    return datetime.fromtimestamp(exp, timezone.utc).replace(tzinfo=None)
+
+
+class RevocationStore:
+    """Conjunto en memoria de jti revocados respaldado por la tabla tokens_revocados"""
+
+    def __init__(self, sync_interval=5.0):
+        self.sync_interval = sync_interval
+        self._revoked = {}  # jti -> expira
+        self._watermark = None  # mayor fecha_revocacion vista
+        self._last_sync = 0.0
+        self._sync_lock = threading.Lock()
+        # Protege las escrituras en _revoked y el reemplazo del conjunto en sync()
+        self._lock = threading.Lock()
+        self.checks = 0
+        self.revoked_hits = 0
+        self.syncs = 0
+        self.last_sync_ms = None
+
+    def is_revoked(self, jti):
+        """Indica si el jti está revocado (sin consultar la base salvo en la sincronización periódica)"""
+        if time.monotonic() - self._last_sync >= self.sync_interval:
+            self.sync()
+        self.checks += 1
+        if jti in self._revoked:
+            self.revoked_hits += 1
+            return True
+        return False
+
+    def revoke(self, jti, exp):
+        """
+        Revocar un token hasta su expiración
+
+        Args:
+            jti: Identificador único del token
+            exp: Claim exp del token (epoch en segundos)
+        """
+        expira = _exp_to_datetime(exp)
+        self._remember(jti, expira)
+        # Las filas de tokens ya expirados no aportan nada: se limpian aquí
+        # (los logouts son poco frecuentes comparados con las verificaciones)
+        db.session.execute(delete(TokenRevocado).where(TokenRevocado.expira <= datetime.utcnow()))
+        db.session.add(TokenRevocado(jti=jti, expira=expira))
+        try:
+            db.session.commit()
+        except IntegrityError as e:
+            db.session.rollback()
+            # Revocar dos veces el mismo token no es un error
+            if not is_unique_violation(e):
+                raise
+
+    def _remember(self, jti, expira):
+        """Agregar un jti al conjunto en memoria de este proceso"""
+        with self._lock:
+            self._revoked[jti] = expira
+
+    def sync(self):
+        """
+        Traer las revocaciones hechas por otros procesos y olvidar las expiradas
+
+        Si otro hilo ya está sincronizando se sigue con el conjunto actual.
+        """
+        if not self._sync_lock.acquire(blocking=False):
+            return
+        try:
+            inicio = time.perf_counter()
+            now = datetime.utcnow()
+            query = select(
+                TokenRevocado.jti, TokenRevocado.expira, TokenRevocado.fecha_revocacion
+            ).where(TokenRevocado.expira > now)
+            if self._watermark is not None:
+                query = query.where(TokenRevocado.fecha_revocacion >= self._watermark - _SYNC_OVERLAP)
+
+            # Siempre del primario (db.engine), nunca de la réplica que use la
+            # petición: una revocación recién hecha no puede depender del retraso
+            with db.engine.connect() as connection:
+                rows = connection.execute(query).all()
+
+            for _, _, fecha_revocacion in rows:
+                if self._watermark is None or fecha_revocacion > self._watermark:
+                    self._watermark = fecha_revocacion
+            if self._watermark is None:
+                self._watermark = now
+
+            # Con el lock tomado: una revocación local hecha mientras se
+            # consultaba la tabla ya está en _revoked y pasa al conjunto nuevo
+            with self._lock:
+                revoked = {jti: expira for jti, expira in self._revoked.items() if expira > now}
+                revoked.update((jti, expira) for jti, expira, _ in rows)
+                self._revoked = revoked
+
+            self.syncs += 1
+            self._last_sync = time.monotonic()
+            self.last_sync_ms = round((time.perf_counter() - inicio) * 1000, 2)
+        except Exception as e:
+            # Reintentar en la próxima verificación sin bloquear las peticiones
+            self._last_sync = time.monotonic()
+            current_app.logger.warning('No se pudo sincronizar la revocación de tokens: %s', e)
+        finally:
+            self._sync_lock.release()
+
+    def stats(self):
+        return {
+            'revoked_in_memory': len(self._revoked),
+            'checks': self.checks,
+            'revoked_hits': self.revoked_hits,
+            'syncs': self.syncs,
+            'sync_interval_seconds': self.sync_interval,
+            'last_sync_ms': self.last_sync_ms
+        }
+
+
+def init_revocation(app):
+    """Crear el almacén de revocación y conectarlo al blocklist de Flask-JWT-Extended"""
+    store = RevocationStore(sync_interval=app.config['JWT_REVOCATION_SYNC_INTERVAL'])
+    app.extensions['token_revocation'] = store
+    register_metrics(app, 'token_revocation', store.stats)
+    return store
+
+
+def get_revocation_store():
+    """Almacén de revocación de la aplicación actual"""
+    return current_app.extensions['token_revocation']
+
+
+@jwt.token_in_blocklist_loader
+def _token_revocado(jwt_header, jwt_payload):
+    return get_revocation_store().is_revoked(jwt_payload['jti'])
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark de latencia de otros endpoints durante una ráfaga de logins
+
+Lanza --logins hilos que verifican contraseñas sin pausa (como un worker con
+threaded=True atendiendo una ráfaga de POST /login) y, en paralelo, mide la
+latencia de una petición liviana (GET /api/personas/?per_page=10 con la caché
+de respuestas desactivada). Se compara:
+
+  - inline:  bcrypt.checkpw en el hilo de la petición (comportamiento anterior)
+  - acotado: PasswordHasher con BCRYPT_MAX_CONCURRENCY hashes simultáneos
+
+Uso:
+    python benchmarks/bench_login_storm.py [--logins 16] [--segundos 5] [--rounds 12]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import bcrypt
+
+from app.app import create_app
+from app.core.hashing import HashingBusyError, PasswordHasher
+from app.utils.cache import NullCache
+
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p / 100))]
+
+
+def ejecutar(app, verificar, logins, segundos):
+    """Devuelve (latencias del endpoint liviano en ms, logins completados, rechazados)"""
+    password = b'password123'
+    password_hash = bcrypt.hashpw(password, bcrypt.gensalt(rounds=app.config['BCRYPT_ROUNDS']))
+    fin = time.monotonic() + segundos
+    contadores = {'ok': 0, 'rechazados': 0}
+    lock = threading.Lock()
+
+    def tormenta():
+        while time.monotonic() < fin:
+            try:
+                verificar(password, password_hash)
+                clave = 'ok'
+            except HashingBusyError:
+                clave = 'rechazados'
+            with lock:
+                contadores[clave] += 1
+
+    hilos = [threading.Thread(target=tormenta) for _ in range(logins)]
+    for hilo in hilos:
+        hilo.start()
+
+    client = app.test_client()
+    latencias = []
+    while time.monotonic() < fin:
+        inicio = time.perf_counter()
+        client.get('/api/personas/?per_page=10')
+        latencias.append((time.perf_counter() - inicio) * 1000)
+        time.sleep(0.005)
+
+    for hilo in hilos:
+        hilo.join()
+    return latencias, contadores['ok'], contadores['rechazados']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--logins', type=int, default=16, help='Hilos haciendo login en paralelo')
+    parser.add_argument('--segundos', type=float, default=5, help='Duración de cada escenario')
+    parser.add_argument('--rounds', type=int, default=12, help='Costo bcrypt')
+    args = parser.parse_args()
+
+    app = create_app('testing')
+    app.extensions['response_cache'] = NullCache()
+    app.config['BCRYPT_ROUNDS'] = args.rounds
+
+    with app.app_context():
+        hasher = PasswordHasher(
+            rounds=args.rounds,
+            max_concurrency=app.config['BCRYPT_MAX_CONCURRENCY'],
+            queue_timeout=app.config['BCRYPT_QUEUE_TIMEOUT']
+        )
+
+        base, _, _ = ejecutar(app, lambda p, h: None, 0, args.segundos)
+        escenarios = [
+            ('sin logins', base, 0, 0),
+            ('inline', *ejecutar(app, bcrypt.checkpw, args.logins, args.segundos)),
+            ('acotado', *ejecutar(app, lambda p, h: hasher.verify(p.decode(), h.decode()), args.logins, args.segundos)),
+        ]
+
+    print(f'CPUs: {os.cpu_count()}  logins concurrentes: {args.logins}  '
+          f'rounds: {args.rounds}  BCRYPT_MAX_CONCURRENCY: {hasher.max_concurrency}')
+    print(f"{'escenario':<12} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} {'logins':>8} {'503':>6}")
+    for nombre, latencias, ok, rechazados in escenarios:
+        print(f'{nombre:<12} {statistics.median(latencias):>8.2f} {percentil(latencias, 99):>8.2f} '
+              f'{max(latencias):>8.2f} {ok:>8} {rechazados:>6}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Costo de REQUEST_TIMING por petición
+
+Crea la aplicación en un proceso nuevo con REQUEST_TIMING apagado y
+encendido y mide con el cliente de pruebas (sin red) el tiempo medio de:
+
+  - GET /health                       (sin base de datos: solo el costo fijo)
+  - GET /api/personas/?limit=<filas>  (consultas SQL + serialización)
+
+La caché de respuestas se desactiva (CACHE_BACKEND=null) para que cada
+petición llegue a la base de datos.
+
+Uso:
+    python benchmarks/bench_request_timing.py [--repeticiones 1000] [--rondas 3] [--filas 20] [--config development]
+
+Los modos se alternan en --rondas procesos cada uno y se toma el mejor
+resultado, para que el ruido de la máquina no se confunda con el costo.
+
+La base de datos se toma de DATABASE_URL y debe tener el esquema aplicado
+(flask --app main db upgrade).
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+SONDA = '''
+import json, logging, sys, timeit
+from app.app import create_app
+config_name, repeticiones, filas = sys.argv[1], int(sys.argv[2]), sys.argv[3]
+app = create_app(config_name)
+app.logger.setLevel(logging.WARNING)  # medir el encabezado, no la escritura del log
+cliente = app.test_client()
+resultados = {}
+for nombre, url in (('health', '/health'), ('personas', f'/api/personas/?limit={filas}')):
+    assert cliente.get(url).status_code == 200, url
+    segundos = min(timeit.repeat(lambda: cliente.get(url), number=repeticiones, repeat=5)) / repeticiones
+    resultados[nombre] = segundos * 1e6
+print(json.dumps(resultados))
+'''
+
+
+def medir(config_name, activo, repeticiones, filas):
+    env = dict(os.environ, REQUEST_TIMING='true' if activo else 'false', CACHE_BACKEND='null')
+    salida = subprocess.run(
+        [sys.executable, '-c', SONDA, config_name, str(repeticiones), str(filas)],
+        cwd=BACKEND, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(salida.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeticiones', type=int, default=1000)
+    parser.add_argument('--rondas', type=int, default=3)
+    parser.add_argument('--filas', type=int, default=20)
+    parser.add_argument('--config', default='development')
+    args = parser.parse_args()
+
+    rondas = {False: [], True: []}
+    for _ in range(args.rondas):
+        for activo in (False, True):
+            rondas[activo].append(medir(args.config, activo, args.repeticiones, args.filas))
+    apagado, encendido = (
+        {nombre: min(r[nombre] for r in rondas[activo]) for nombre in rondas[activo][0]}
+        for activo in (False, True)
+    )
+
+    print(f'{args.repeticiones} peticiones por caso (mejor de {args.rondas} rondas x 5)')
+    for nombre in apagado:
+        diferencia = encendido[nombre] - apagado[nombre]
+        print(f'  {nombre:10s} apagado {apagado[nombre]:8.1f} µs  encendido {encendido[nombre]:8.1f} µs'
+              f'  ({diferencia:+.1f} µs, {diferencia / apagado[nombre] * 100:+.1f}%)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark de serialización de una página de 100 personas
+
+Compara el camino anterior (to_dict escrito a mano con isoformat() campo por
+campo + codificador JSON estándar de Flask) con el actual (serializador
+generado + FastJSONProvider, con y sin orjson).
+
+Uso:
+    python benchmarks/bench_serializacion.py [--filas 100] [--repeticiones 2000]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+from datetime import date, datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from app.core import json_provider as json_provider_module
+from app.core.json_provider import FastJSONProvider
+from app.models import PersonaBase
+from app.models.serializers import get_serializer
+
+
+def to_dict_anterior(persona):
+    """Copia del to_dict escrito a mano que usaba PersonaBase"""
+    return {
+        'ci': persona.ci,
+        'nombres': persona.nombres,
+        'apellido_paterno': persona.apellido_paterno,
+        'apellido_materno': persona.apellido_materno,
+        'nombre_completo': persona.nombre_completo,
+        'fecha_nacimiento': persona.fecha_nacimiento.isoformat() if persona.fecha_nacimiento else None,
+        'sexo': persona.sexo,
+        'telefono': persona.telefono,
+        'correo': persona.correo,
+        'direccion': persona.direccion,
+        'foto_url': persona.foto_url,
+        'activo': persona.activo,
+        'fecha_creacion': persona.fecha_creacion.isoformat() if persona.fecha_creacion else None,
+        'fecha_actualizacion': persona.fecha_actualizacion.isoformat() if persona.fecha_actualizacion else None
+    }
+
+
+def crear_personas(filas):
+    ahora = datetime(2024, 5, 17, 12, 30, 15, 123456)
+    personas = []
+    for i in range(filas):
+        persona = PersonaBase(
+            ci=f'{10000000 + i}',
+            nombres='Juan Carlos',
+            apellido_paterno='Pérez',
+            apellido_materno='González',
+            fecha_nacimiento=date(1990, 5, 15),
+            sexo='M',
+            telefono='78901234',
+            correo=f'persona{i}@edificio.com',
+            direccion='Av. Principal 123, Piso 4',
+            foto_url='https://example.com/foto.jpg'
+        )
+        persona.fecha_creacion = ahora
+        persona.fecha_actualizacion = ahora
+        personas.append(persona)
+    return personas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filas', type=int, default=100)
+    parser.add_argument('--repeticiones', type=int, default=2000)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    anterior = DefaultJSONProvider(app)
+    actual = FastJSONProvider(app)
+    personas = crear_personas(args.filas)
+    serializar = get_serializer(PersonaBase)
+
+    def camino_anterior():
+        return anterior.dumps({'success': True, 'data': {'personas': [to_dict_anterior(p) for p in personas]}})
+
+    def camino_actual():
+        return actual.dumps({'success': True, 'data': {'personas': [serializar(p) for p in personas]}})
+
+    orjson = json_provider_module.orjson
+
+    def camino_actual_stdlib():
+        json_provider_module.orjson = None
+        try:
+            return camino_actual()
+        finally:
+            json_provider_module.orjson = orjson
+
+    casos = [('anterior (to_dict + json estándar)', camino_anterior)]
+    if orjson is not None:
+        casos.append(('actual (serializador generado + orjson)', camino_actual))
+    casos.append(('actual (serializador generado + json estándar)', camino_actual_stdlib))
+
+    print(f'Página de {args.filas} personas, {args.repeticiones} repeticiones (mejor de 5)')
+    base = None
+    for nombre, funcion in casos:
+        segundos = min(timeit.repeat(funcion, number=args.repeticiones, repeat=5)) / args.repeticiones
+        base = base or segundos
+        print(f'  {nombre:<48} {segundos * 1e6:9.1f} µs/página  {1 / segundos:9.0f} páginas/s  x{base / segundos:.2f}')
+
+
+if __name__ == '__main__':
+    main()
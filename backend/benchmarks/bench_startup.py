@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark de arranque en frío
+
+Lanza --repeticiones procesos nuevos de Python que importan la aplicación y
+ejecutan create_app(), como hace cada worker al arrancar. Para cada modo mide:
+
+  - import: tiempo de importar app.app (desde un intérprete vacío)
+  - create_app: tiempo total y desglose por fase (app.extensions['startup'])
+  - primera petición: GET /health con la aplicación recién creada
+
+Se compara:
+  - completo: FAST_STARTUP=false (Swagger y Flask-Migrate al arrancar)
+  - rápido:   FAST_STARTUP=true (se cargan al primer uso)
+
+Con --importtime se listan además los módulos más caros de importar según
+python -X importtime en el modo rápido.
+
+Uso:
+    python benchmarks/bench_startup.py [--repeticiones 10] [--config production] [--importtime]
+
+La base de datos se toma de DATABASE_URL; create_app no se conecta (salvo
+AUTO_CREATE_TABLES), por lo que sirve cualquier URL válida.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+SONDA = '''
+import json, sys, time
+inicio = time.perf_counter()
+from app.app import create_app
+importado = time.perf_counter()
+app = create_app(sys.argv[1])
+creado = time.perf_counter()
+app.test_client().get('/health')
+fin = time.perf_counter()
+print(json.dumps({
+    'import_ms': (importado - inicio) * 1000,
+    'create_app_ms': (creado - importado) * 1000,
+    'primera_peticion_ms': (fin - creado) * 1000,
+    'fases_ms': app.extensions['startup'].phases,
+}))
+'''
+
+
+def medir(config_name, fast_startup, repeticiones):
+    """Ejecutar la sonda en procesos nuevos y devolver sus mediciones"""
+    env = dict(os.environ, FAST_STARTUP='true' if fast_startup else 'false')
+    mediciones = []
+    for _ in range(repeticiones):
+        salida = subprocess.run(
+            [sys.executable, '-c', SONDA, config_name],
+            cwd=BACKEND, env=env, capture_output=True, text=True, check=True
+        ).stdout
+        mediciones.append(json.loads(salida.strip().splitlines()[-1]))
+    return mediciones
+
+
+def resumir(nombre, mediciones):
+    def mediana(clave):
+        return statistics.median(m[clave] for m in mediciones)
+
+    print(f'\n{nombre}')
+    for clave in ('import_ms', 'create_app_ms', 'primera_peticion_ms'):
+        print(f'  {clave:22s} {mediana(clave):8.1f}')
+    total = mediana('import_ms') + mediana('create_app_ms')
+    print(f'  {"total arranque":22s} {total:8.1f}')
+    print('  fases de create_app (mediana ms):')
+    for fase in mediciones[0]['fases_ms']:
+        print(f'    {fase:20s} {statistics.median(m["fases_ms"].get(fase, 0) for m in mediciones):8.1f}')
+    return total
+
+
+def importtime(config_name, top):
+    """Módulos de mayor tiempo acumulado de importación (python -X importtime)"""
+    env = dict(os.environ, FAST_STARTUP='true')
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c',
+         f'from app.app import create_app; create_app({config_name!r})'],
+        cwd=BACKEND, env=env, capture_output=True, text=True, check=True
+    ).stderr
+    filas = []
+    for linea in stderr.splitlines():
+        if not linea.startswith('import time:') or 'cumulative' in linea:
+            continue
+        _, acumulado, modulo = linea[len('import time:'):].split('|')
+        filas.append((int(acumulado), modulo.strip()))
+    print('\nMódulos más caros de importar (modo rápido, ms acumulados):')
+    for acumulado, modulo in sorted(filas, reverse=True)[:top]:
+        print(f'  {acumulado / 1000:8.1f}  {modulo}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeticiones', type=int, default=10)
+    parser.add_argument('--config', default='production', help="Configuración de create_app ('production', ...)")
+    parser.add_argument('--importtime', action='store_true', help='Listar los imports más costosos')
+    parser.add_argument('--top', type=int, default=20)
+    args = parser.parse_args()
+
+    completo = resumir('completo (FAST_STARTUP=false)', medir(args.config, False, args.repeticiones))
+    rapido = resumir('rápido (FAST_STARTUP=true)', medir(args.config, True, args.repeticiones))
+    print(f'\nArranque: {completo:.1f}ms -> {rapido:.1f}ms ({(1 - rapido / completo) * 100:.0f}% menos)')
+
+    if args.importtime:
+        importtime(args.config, args.top)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Captura de planes de ejecución de las consultas frecuentes
+
+Ejecuta EXPLAIN para cada consulta caliente (login, registro, listado de
+personas activas, sincronización por fecha_actualizacion y claves foráneas de
+residentes) contra la base configurada y guarda los planes en un archivo de
+texto. Se usa antes y después de aplicar la migración de índices:
+
+    python benchmarks/explain_hot_queries.py --output planes_antes.txt
+    flask --app main db upgrade
+    python benchmarks/explain_hot_queries.py --output planes_despues.txt
+    diff planes_antes.txt planes_despues.txt
+
+En PostgreSQL se usa EXPLAIN (ANALYZE, BUFFERS) salvo con --sin-analyze
+(ANALYZE ejecuta la consulta; todas son de solo lectura). En SQLite se usa
+EXPLAIN QUERY PLAN.
+
+Uso:
+    python benchmarks/explain_hot_queries.py [--output planes.txt] [--sin-analyze]
+"""
+
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from dotenv import load_dotenv
+from sqlalchemy import func, select
+
+from app.app import create_app
+from app.core.database import db
+from app.models import PersonaBase, User, Residente
+
+
+def valor_de_ejemplo(columna, por_defecto):
+    """Tomar un valor real de la tabla para que el plan refleje datos reales"""
+    valor = db.session.execute(select(columna).where(columna.isnot(None)).limit(1)).scalar()
+    return valor if valor is not None else por_defecto
+
+
+def consultas_frecuentes():
+    """Nombre -> sentencia SELECT de cada consulta caliente"""
+    correo = valor_de_ejemplo(User.correo, 'usuario@ejemplo.com').lower()
+    ci = valor_de_ejemplo(PersonaBase.ci, '1234567')
+    fecha = valor_de_ejemplo(PersonaBase.fecha_actualizacion, datetime.utcnow()) - timedelta(days=1)
+    departamento_id = valor_de_ejemplo(Residente.departamento_id, 1)
+
+    activos = select(PersonaBase).filter_by(activo=True)
+    return {
+        'login (personas.lower(correo))': (
+            select(User).where(func.lower(User.correo) == correo).limit(1)
+        ),
+        'registro (ci o lower(correo))': (
+            select(User).where((User.ci == ci) | (func.lower(User.correo) == correo)).limit(1)
+        ),
+        'listado de activos por offset': activos.order_by(PersonaBase.ci).offset(100).limit(21),
+        'listado de activos por cursor': (
+            activos.where(PersonaBase.ci > ci).order_by(PersonaBase.ci).limit(21)
+        ),
+        'conteo de activos': (
+            select(func.count()).select_from(PersonaBase).filter_by(activo=True)
+        ),
+        'sincronización por fecha_actualizacion': (
+            select(PersonaBase).where(PersonaBase.fecha_actualizacion > fecha)
+            .order_by(PersonaBase.fecha_actualizacion)
+        ),
+        'última modificación (validadores)': select(func.max(PersonaBase.fecha_actualizacion)),
+        'residentes por persona_ci': select(Residente).where(Residente.persona_ci == ci),
+        'residentes por departamento_id': (
+            select(Residente).where(Residente.departamento_id == departamento_id)
+        ),
+    }
+
+
+def explicar(statement, analyze):
+    """Plan de ejecución de una sentencia como lista de líneas"""
+    dialect = db.engine.dialect
+    sql = str(statement.compile(dialect=dialect, compile_kwargs={'literal_binds': True}))
+    if dialect.name == 'postgresql':
+        prefijo = 'EXPLAIN (ANALYZE, BUFFERS) ' if analyze else 'EXPLAIN '
+        filas = db.session.execute(db.text(prefijo + sql)).all()
+        return sql, [fila[0] for fila in filas]
+    filas = db.session.execute(db.text('EXPLAIN QUERY PLAN ' + sql)).all()
+    return sql, [' '.join(str(columna) for columna in fila[1:]) for fila in filas]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', help='Archivo donde guardar los planes (por defecto, salida estándar)')
+    parser.add_argument('--sin-analyze', action='store_true', help='Solo EXPLAIN, sin ejecutar las consultas')
+    args = parser.parse_args()
+
+    load_dotenv()
+    app = create_app(os.environ.get('FLASK_ENV', 'development'))
+
+    lineas = []
+    with app.app_context():
+        lineas.append(f'# Planes capturados {datetime.utcnow():%Y-%m-%d %H:%M:%S} UTC '
+                      f'({db.engine.dialect.name}, {db.engine.url.render_as_string(hide_password=True)})')
+        for nombre, statement in consultas_frecuentes().items():
+            sql, plan = explicar(statement, analyze=not args.sin_analyze)
+            lineas.append('')
+            lineas.append(f'## {nombre}')
+            lineas.append(sql.replace('\n', ' '))
+            lineas.extend(f'    {linea}' for linea in plan)
+        db.session.rollback()
+
+    salida = '\n'.join(lineas) + '\n'
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(salida)
+        print(f'Planes guardados en {args.output}')
+    else:
+        print(salida, end='')
+
+
+if __name__ == '__main__':
+    main()
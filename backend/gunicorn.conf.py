@@ -0,0 +1,107 @@
+"""
+Configuración de gunicorn para producción
+
+    gunicorn wsgi:app          (desde backend/, gunicorn lee este archivo solo)
+
+- La aplicación se crea una vez en el proceso maestro (preload_app) y los
+  workers la heredan al hacer fork: el código y los datos cargados se
+  comparten copy-on-write en lugar de repetirse en cada worker. gc.freeze()
+  antes del fork evita que el recolector de basura toque esos objetos y
+  fuerce la copia de sus páginas.
+- Workers y threads se derivan de las CPU disponibles para el proceso.
+  Cada worker tiene su propio pool de conexiones (DB_POOL_PROFILE): el
+  total hacia la base de datos es workers x (pool_size + max_overflow).
+- Tras el fork cada worker descarta las conexiones heredadas del maestro
+  (base de datos y cliente HTTP saliente). El maestro no inicia hilos en
+  segundo plano: cada worker inicia los suyos con su primera petición.
+- max_requests (con jitter, para que no se reinicien todos a la vez)
+  recicla cada worker tras N peticiones y contiene el crecimiento de memoria.
+
+Recarga sin cortes (con GUNICORN_PID_FILE definido):
+
+    kill -HUP $(cat $GUNICORN_PID_FILE)
+
+Arranca workers nuevos y deja que los viejos terminen sus peticiones
+(graceful_timeout). Con preload_app los workers nuevos siguen usando el
+código cargado por el maestro; para desplegar código nuevo:
+
+    OLD=$(cat $GUNICORN_PID_FILE)
+    kill -USR2 $OLD    # maestro nuevo con el código nuevo, en el mismo socket
+    kill -QUIT $OLD    # con el nuevo ya atendiendo: el viejo termina sus peticiones y sale
+
+Variables de entorno (todas opcionales):
+    PORT, GUNICORN_BIND, WEB_CONCURRENCY (workers), GUNICORN_THREADS,
+    GUNICORN_MAX_REQUESTS, GUNICORN_MAX_REQUESTS_JITTER, GUNICORN_TIMEOUT,
+    GUNICORN_GRACEFUL_TIMEOUT, GUNICORN_KEEPALIVE, GUNICORN_PID_FILE,
+    FORWARDED_ALLOW_IPS
+"""
+
+import gc
+import os
+
+
+def _cpu_count():
+    """CPU que el proceso puede usar (respeta la afinidad fijada por el contenedor)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _int_env(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+_cpus = _cpu_count()
+
+bind = os.environ.get('GUNICORN_BIND', f"0.0.0.0:{os.environ.get('PORT', '5000')}")
+
+# Las peticiones pasan la mayor parte del tiempo esperando a la base de datos:
+# threads por worker cubren esa espera sin multiplicar procesos (ni pools)
+workers = _int_env('WEB_CONCURRENCY', _cpus + 1)
+threads = _int_env('GUNICORN_THREADS', 4)
+worker_class = 'gthread'
+
+preload_app = True
+
+max_requests = _int_env('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = _int_env('GUNICORN_MAX_REQUESTS_JITTER', max_requests // 10)
+
+timeout = _int_env('GUNICORN_TIMEOUT', 30)
+graceful_timeout = _int_env('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = _int_env('GUNICORN_KEEPALIVE', 5)
+
+pidfile = os.environ.get('GUNICORN_PID_FILE') or None
+# Solo afecta a wsgi.url_scheme: la IP del cliente (REMOTE_ADDR) la corrige
+# ProxyFix en la aplicación con PROXY_FIX_X_FOR
+forwarded_allow_ips = os.environ.get('FORWARDED_ALLOW_IPS', '127.0.0.1,::1')
+
+# El latido de los workers en memoria y no en disco (en contenedores /tmp
+# puede ser un overlay lento y bloquear al worker)
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+accesslog = '-'
+
+
+def when_ready(server):
+    server.log.info(
+        'Workers: %s x %s threads (%s CPU), max_requests=%s (+%s)',
+        server.cfg.workers, server.cfg.threads, _cpus, server.cfg.max_requests, server.cfg.max_requests_jitter
+    )
+
+
+def pre_fork(server, worker):
+    # Todo lo cargado hasta aquí es permanente: fuera del alcance del GC
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from app.core.database import reset_after_fork
+
+    reset_after_fork(server.app.wsgi())
+
+
+def on_reload(server):
+    server.log.info('Recarga: iniciando workers nuevos; los actuales terminan sus peticiones')
@@ -1,6 +1,9 @@
 #!/usr/bin/env python3
 """
 Punto de entrada para el Sistema de Gestión del Edificio Multifuncional
+
+Levanta el servidor de desarrollo de Werkzeug; en producción usar
+`gunicorn wsgi:app` (ver wsgi.py y gunicorn.conf.py).
 """
 
 import os
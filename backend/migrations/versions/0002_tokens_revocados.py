@@ -0,0 +1,42 @@
+"""tokens revocados
+
+Tabla del almacén de revocación de tokens JWT (logout). Puede existir ya si
+la aplicación arrancó con db.create_all() después de agregarse el modelo.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 10:25:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if not op.get_context().as_sql and sa.inspect(op.get_bind()).has_table('tokens_revocados'):
+        return
+
+    op.create_table('tokens_revocados',
+    sa.Column('jti', sa.String(length=36), nullable=False),
+    sa.Column('expira', sa.DateTime(), nullable=False),
+    sa.Column('fecha_revocacion', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('jti')
+    )
+    with op.batch_alter_table('tokens_revocados', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_tokens_revocados_expira'), ['expira'], unique=False)
+        batch_op.create_index(batch_op.f('ix_tokens_revocados_fecha_revocacion'), ['fecha_revocacion'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('tokens_revocados', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_tokens_revocados_fecha_revocacion'))
+        batch_op.drop_index(batch_op.f('ix_tokens_revocados_expira'))
+
+    op.drop_table('tokens_revocados')
@@ -0,0 +1,62 @@
+"""indices para consultas frecuentes
+
+- ix_personas_correo_lower: login, registro y OAuth buscan por
+  lower(correo) (la restricción UNIQUE existente distingue mayúsculas)
+- ix_persona_activos_ci: índice parcial para el listado de personas
+  activas ordenado por ci (paginación por offset y por cursor)
+- ix_persona_fecha_actualizacion: sincronización y validadores ETag /
+  Last-Modified
+- ix_residentes_persona_ci / ix_residentes_departamento_id: claves
+  foráneas (joins y borrados en las tablas referenciadas)
+
+En PostgreSQL los índices se crean con CREATE INDEX CONCURRENTLY (fuera de
+la transacción de la migración) para no bloquear escrituras; IF NOT EXISTS
+permite reintentar si una ejecución anterior se interrumpió. Un índice
+concurrente interrumpido queda INVALID y debe eliminarse antes de reintentar
+(DROP INDEX CONCURRENTLY <nombre>).
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+# nombre -> (tabla, expresión de columnas, condición WHERE del índice parcial)
+INDICES = {
+    'ix_personas_correo_lower': ('personas', 'lower(correo)', None),
+    'ix_persona_activos_ci': ('persona', 'ci', 'activo'),
+    'ix_persona_fecha_actualizacion': ('persona', 'fecha_actualizacion', None),
+    'ix_residentes_persona_ci': ('residentes', 'persona_ci', None),
+    'ix_residentes_departamento_id': ('residentes', 'departamento_id', None),
+}
+
+
+def upgrade():
+    postgresql = op.get_bind().dialect.name == 'postgresql'
+    concurrently = 'CONCURRENTLY ' if postgresql else ''
+
+    with op.get_context().autocommit_block():
+        for nombre, (tabla, columnas, condicion) in INDICES.items():
+            where = f' WHERE {condicion}' if condicion else ''
+            op.execute(
+                f'CREATE INDEX {concurrently}IF NOT EXISTS {nombre} ON {tabla} ({columnas}){where}'
+            )
+
+
+def downgrade():
+    postgresql = op.get_bind().dialect.name == 'postgresql'
+    concurrently = 'CONCURRENTLY ' if postgresql else ''
+
+    with op.get_context().autocommit_block():
+        for nombre in INDICES:
+            op.execute(f'DROP INDEX {concurrently}IF EXISTS {nombre}')
@@ -0,0 +1,132 @@
+"""
+Importación masiva de personas (POST /api/personas/bulk)
+"""
+
+import json
+from datetime import date
+
+import pytest
+
+from app.app import create_app
+from app.core.database import db
+from app.models import PersonaBase
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def _persona(ci, **kwargs):
+    persona = PersonaBase(ci=ci, nombres='Original', apellido_paterno='Pérez', fecha_nacimiento=date(1990, 5, 15),
+                          correo=f'{ci}@edificio.com', **kwargs)
+    db.session.add(persona)
+    db.session.commit()
+    return persona
+
+
+def _importar(client, filas, fmt='ndjson'):
+    if fmt == 'ndjson':
+        body = '\n'.join(json.dumps(fila) for fila in filas)
+    else:
+        body = filas
+    response = client.post(f'/api/personas/bulk?format={fmt}', data=body.encode('utf-8'))
+    assert response.status_code == 200
+    return response.get_json()['data']
+
+
+def _leer(ci):
+    db.session.expire_all()
+    return db.session.get(PersonaBase, ci)
+
+
+def test_fila_parcial_conserva_columnas_no_enviadas(client):
+    _persona('100')
+
+    resumen = _importar(client, [{'ci': '100', 'nombres': 'Actualizado'}])
+
+    assert resumen['importadas'] == 1
+    persona = _leer('100')
+    assert persona.nombres == 'Actualizado'
+    assert persona.apellido_paterno == 'Pérez'
+    assert persona.correo == '100@edificio.com'
+    assert persona.fecha_nacimiento == date(1990, 5, 15)
+
+
+def test_fila_parcial_no_reactiva_persona_eliminada(client):
+    persona = _persona('101')
+    persona.activo = False
+    db.session.commit()
+
+    _importar(client, [{'ci': '101', 'nombres': 'Actualizado'}])
+
+    assert _leer('101').activo is False
+
+
+def test_activo_enviado_explicitamente_se_aplica(client):
+    persona = _persona('102')
+    persona.activo = False
+    db.session.commit()
+
+    _importar(client, [{'ci': '102', 'nombres': 'Actualizado', 'activo': True}])
+
+    assert _leer('102').activo is True
+
+
+def test_null_explicito_limpia_la_columna(client):
+    _persona('103')
+
+    _importar(client, [{'ci': '103', 'nombres': 'Actualizado', 'apellido_paterno': None}])
+
+    assert _leer('103').apellido_paterno is None
+
+
+def test_csv_celda_vacia_conserva_valor(client):
+    _persona('104')
+
+    _importar(client, 'ci,nombres,apellido_paterno\n104,Actualizado,\n', fmt='csv')
+
+    persona = _leer('104')
+    assert persona.nombres == 'Actualizado'
+    assert persona.apellido_paterno == 'Pérez'
+
+
+def test_persona_nueva_se_inserta_activa(client):
+    _importar(client, [{'ci': '105', 'nombres': 'Nueva'}])
+
+    persona = _leer('105')
+    assert persona.nombres == 'Nueva'
+    assert persona.activo is True
+
+
+def test_ci_repetido_en_el_lote_cuenta_una_vez(client):
+    resumen = _importar(client, [{'ci': '106', 'nombres': 'Primera'}, {'ci': '106', 'nombres': 'Segunda'}])
+
+    assert resumen['procesadas'] == 2
+    assert resumen['importadas'] == 1
+    assert _leer('106').nombres == 'Segunda'
+
+
+def test_copy_grupos_de_columnas_no_se_pisan(client):
+    if db.engine.dialect.name != 'postgresql':
+        pytest.skip('La carga vía COPY requiere PostgreSQL (TEST_DATABASE_URL)')
+    _persona('107')
+    _persona('108')
+
+    # La celda vacía deja a la primera fila sin apellido_paterno: dos grupos de columnas en el mismo lote
+    _importar(client, 'ci,nombres,apellido_paterno\n107,Actualizado,\n108,Otro,Rojas\n', fmt='csv')
+
+    primera = _leer('107')
+    assert primera.nombres == 'Actualizado'
+    assert primera.apellido_paterno == 'Pérez'
+    segunda = _leer('108')
+    assert (segunda.nombres, segunda.apellido_paterno) == ('Otro', 'Rojas')
@@ -0,0 +1,36 @@
+"""
+Caché de respuestas: invalidación y lecturas concurrentes con escrituras
+"""
+
+from app.utils.cache import MemoryCache
+
+
+def test_set_con_generacion_vigente_guarda():
+    cache = MemoryCache()
+    generation = cache.generation()
+
+    cache.set('personas|100', 'v1', 30, ('personas:100',), generation=generation)
+
+    assert cache.get('personas|100') == 'v1'
+
+
+def test_lectura_que_cruza_una_invalidacion_no_se_guarda():
+    cache = MemoryCache()
+    # La lectura empieza, una escritura invalida y la lectura termina con datos viejos
+    generation = cache.generation()
+    cache.invalidate_tags(('personas:100',))
+    cache.set('personas|100', 'viejo', 30, ('personas:100',), generation=generation)
+
+    assert cache.get('personas|100') is None
+    assert cache.stats()['stale_sets'] == 1
+
+
+def test_invalidar_etiqueta_elimina_solo_sus_entradas():
+    cache = MemoryCache()
+    cache.set('personas|100', 'a', 30, ('personas:100', 'personas:lista'))
+    cache.set('personas|101', 'b', 30, ('personas:101',))
+
+    cache.invalidate_tags(('personas:100',))
+
+    assert cache.get('personas|100') is None
+    assert cache.get('personas|101') == 'b'
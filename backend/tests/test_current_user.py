@@ -0,0 +1,46 @@
+"""
+Usuario autenticado en request.current_principal / request.current_user
+"""
+
+from datetime import date
+
+import pytest
+from flask import request
+from flask_jwt_extended import create_access_token
+
+from app.app import create_app
+from app.core.database import db
+from app.models import User
+from app.utils import require_auth
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+
+    @app.get('/_prueba/usuario')
+    @require_auth()
+    def usuario_actual():
+        return {
+            'principal': request.current_principal.rol,
+            'es_modelo': isinstance(request.current_user, User),
+            'correo': request.current_user.correo
+        }
+
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def test_current_user_es_la_instancia_completa(app):
+    user = User(ci='200', nombres='Ana', apellido_paterno='Rojas', fecha_nacimiento=date(1990, 1, 1), sexo='F',
+                correo='ana@edificio.com', rol='user', activo=True)
+    db.session.add(user)
+    db.session.commit()
+    token = create_access_token(identity='200')
+
+    response = app.test_client().get('/_prueba/usuario', headers={'Authorization': f'Bearer {token}'})
+
+    assert response.status_code == 200
+    assert response.get_json() == {'principal': user.rol, 'es_modelo': True, 'correo': 'ana@edificio.com'}
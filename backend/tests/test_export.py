@@ -0,0 +1,45 @@
+"""
+Exportación en flujo de personas (GET /api/personas/export)
+"""
+
+import csv
+import io
+import json
+from datetime import date
+
+import pytest
+
+from app.app import create_app
+from app.core.database import db
+from app.models import PersonaBase
+
+
+@pytest.fixture
+def client():
+    app = create_app('testing')
+    # Lotes chicos: la exportación se arma con varios lotes
+    app.config['PERSONAS_EXPORT_BATCH_SIZE'] = 2
+    with app.app_context():
+        for i in range(5):
+            db.session.add(PersonaBase(ci=f'10{i}', nombres=f'Nombre, {i}', apellido_paterno='Pérez',
+                                       fecha_nacimiento=date(1990, 5, 15), correo=f'10{i}@edificio.com'))
+        db.session.commit()
+        yield app.test_client()
+        db.session.remove()
+        db.drop_all()
+
+
+def test_csv_escribe_cada_fila_una_vez(client):
+    response = client.get('/api/personas/export?format=csv')
+
+    filas = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert [fila['ci'] for fila in filas] == ['100', '101', '102', '103', '104']
+    assert filas[0]['nombres'] == 'Nombre, 0'
+    assert filas[0]['fecha_nacimiento'] == '1990-05-15'
+
+
+def test_ndjson_una_persona_por_linea(client):
+    response = client.get('/api/personas/export?format=ndjson')
+
+    personas = [json.loads(linea) for linea in response.get_data(as_text=True).splitlines()]
+    assert [persona['ci'] for persona in personas] == ['100', '101', '102', '103', '104']
@@ -0,0 +1,139 @@
+"""
+Verificación local de ID tokens de Google con claves RSA generadas en la prueba
+"""
+
+import json
+import time
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from app.app import create_app
+from app.utils.google_tokens import InvalidGoogleTokenError, JWKSCache, verify_google_id_token
+
+CLIENT_ID = 'cliente-prueba.apps.googleusercontent.com'
+JWKS_URL = 'https://www.googleapis.com/oauth2/v3/certs'
+
+
+def _clave(kid):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+    jwk.update(kid=kid, alg='RS256', use='sig')
+    return private_key, jwk
+
+
+class _Respuesta:
+    def __init__(self, jwks):
+        self._jwks = jwks
+        self.headers = {'Cache-Control': 'public, max-age=3600'}
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._jwks
+
+
+class _ClienteJWKS:
+    """Cliente HTTP que sirve el JWKS publicado y cuenta las descargas"""
+
+    def __init__(self, *jwks):
+        self.publicadas = list(jwks)
+        self.descargas = 0
+
+    def get(self, url, timeout=None):
+        assert url == JWKS_URL
+        self.descargas += 1
+        return _Respuesta({'keys': list(self.publicadas)})
+
+
+@pytest.fixture
+def claves():
+    return {kid: _clave(kid) for kid in ('clave-1', 'clave-2')}
+
+
+@pytest.fixture
+def cliente(claves):
+    return _ClienteJWKS(claves['clave-1'][1])
+
+
+@pytest.fixture
+def app(cliente):
+    app = create_app('testing')
+    app.config['GOOGLE_CLIENT_ID'] = CLIENT_ID
+    app.extensions['http_client'] = cliente
+    app.extensions['google_jwks'] = JWKSCache(JWKS_URL)
+    with app.app_context():
+        yield app
+
+
+def _token(claves, kid='clave-1', algorithm='RS256', key=None, **claims):
+    ahora = int(time.time())
+    payload = {
+        'iss': 'https://accounts.google.com', 'aud': CLIENT_ID, 'sub': '1234567890',
+        'email': 'ana@gmail.com', 'iat': ahora, 'exp': ahora + 3600, **claims
+    }
+    return jwt.encode(payload, key or claves[kid][0], algorithm=algorithm, headers={'kid': kid})
+
+
+def test_token_valido(app, claves):
+    claims = verify_google_id_token(_token(claves))
+
+    assert claims['email'] == 'ana@gmail.com'
+    assert claims['sub'] == '1234567890'
+
+
+@pytest.mark.parametrize('claims', [
+    {'aud': 'otro-cliente.apps.googleusercontent.com'},
+    {'iss': 'https://accounts.example.com'},
+    {'iat': int(time.time()) - 7200, 'exp': int(time.time()) - 3600},
+])
+def test_claims_invalidos_se_rechazan(app, claves, claims):
+    with pytest.raises(InvalidGoogleTokenError):
+        verify_google_id_token(_token(claves, **claims))
+
+
+def test_algoritmo_distinto_de_rs256_se_rechaza(app, claves):
+    token = _token(claves, algorithm='HS256', key='secreto-compartido-de-al-menos-32-bytes')
+
+    with pytest.raises(InvalidGoogleTokenError):
+        verify_google_id_token(token)
+
+
+def test_firma_con_otra_clave_se_rechaza(app, claves):
+    # kid de la clave publicada, firmado con la privada de otra
+    token = _token(claves, kid='clave-1', key=claves['clave-2'][0])
+
+    with pytest.raises(InvalidGoogleTokenError):
+        verify_google_id_token(token)
+
+
+def test_kid_desconocido_dispara_una_sola_recarga(app, claves, cliente):
+    verify_google_id_token(_token(claves))
+    assert cliente.descargas == 1
+
+    # Google rota sus claves: la nueva se publica después de la última descarga
+    cliente.publicadas.append(claves['clave-2'][1])
+    app.extensions['google_jwks']._last_fetch -= 120
+
+    for _ in range(5):
+        assert verify_google_id_token(_token(claves, kid='clave-2'))['sub'] == '1234567890'
+    assert cliente.descargas == 2
+
+    # Un kid que nadie publicó no provoca más descargas dentro del intervalo mínimo
+    with pytest.raises(InvalidGoogleTokenError):
+        verify_google_id_token(_token(claves, kid='inexistente', key=claves['clave-1'][0]))
+    assert cliente.descargas == 2
+
+
+def test_claves_se_reutilizan_desde_disco(app, claves, cliente, tmp_path):
+    ruta = str(tmp_path / 'jwks.json')
+    app.extensions['google_jwks'] = JWKSCache(JWKS_URL, cache_path=ruta)
+    verify_google_id_token(_token(claves))
+
+    # Otro proceso (nuevo worker) arranca con el archivo ya escrito
+    app.extensions['google_jwks'] = JWKSCache(JWKS_URL, cache_path=ruta)
+    verify_google_id_token(_token(claves))
+
+    assert cliente.descargas == 1
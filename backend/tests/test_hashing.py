@@ -0,0 +1,43 @@
+"""
+Hashing de contraseñas con concurrencia acotada
+"""
+
+import threading
+
+import bcrypt
+import pytest
+
+from app.core.hashing import HashingBusyError, PasswordHasher
+
+
+def test_solo_se_regenera_al_subir_el_costo():
+    hasher = PasswordHasher(rounds=10)
+
+    assert hasher.needs_rehash(bcrypt.hashpw(b'clave', bcrypt.gensalt(rounds=4)).decode())
+    assert not hasher.needs_rehash(bcrypt.hashpw(b'clave', bcrypt.gensalt(rounds=10)).decode())
+    # Bajar BCRYPT_ROUNDS no degrada un hash más fuerte
+    assert not hasher.needs_rehash(bcrypt.hashpw(b'clave', bcrypt.gensalt(rounds=12)).decode())
+
+
+def test_sin_cupo_se_rechaza_con_retry_after():
+    hasher = PasswordHasher(rounds=4, max_concurrency=1, queue_timeout=0.01)
+    ocupado = threading.Event()
+    liberar = threading.Event()
+
+    def hash_lento():
+        ocupado.set()
+        liberar.wait(5)
+
+    hilo = threading.Thread(target=hasher._run, args=(hash_lento,))
+    hilo.start()
+    ocupado.wait(5)
+    try:
+        with pytest.raises(HashingBusyError) as error:
+            hasher.hash('clave')
+        assert error.value.retry_after >= 1
+    finally:
+        liberar.set()
+        hilo.join()
+
+    assert hasher.verify('clave', hasher.hash('clave'))
+    assert hasher.stats()['rejected'] == 1
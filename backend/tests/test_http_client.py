@@ -0,0 +1,58 @@
+"""
+Circuit breaker del cliente HTTP saliente
+"""
+
+import pytest
+import requests
+
+from app.utils.http_client import CircuitOpenError, HTTPClient
+
+URL = 'https://proveedor.example.com/recurso'
+
+
+class _Respuesta:
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+def _fallar(excepcion):
+    def send():
+        raise excepcion
+    return send
+
+
+def test_excepcion_desconocida_cuenta_como_fallo():
+    client = HTTPClient(breaker_failures=2)
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            client.guarded(URL, _fallar(ValueError('respuesta ilegible')))
+
+    with pytest.raises(CircuitOpenError):
+        client.guarded(URL, lambda: _Respuesta(200))
+    assert client.stats()['proveedor.example.com']['failures'] == 2
+
+
+def test_excepcion_en_la_prueba_libera_el_semiabierto():
+    client = HTTPClient(breaker_failures=1, breaker_reset_timeout=0)
+    with pytest.raises(requests.ConnectionError):
+        client.guarded(URL, _fallar(requests.ConnectionError()))
+
+    # La llamada de prueba falla con una excepción ajena a requests
+    with pytest.raises(RuntimeError):
+        client.guarded(URL, _fallar(RuntimeError()))
+
+    # Sin quedar bloqueado: la siguiente prueba pasa y cierra el circuito
+    assert client.guarded(URL, lambda: _Respuesta(200)).status_code == 200
+    assert client.stats()['proveedor.example.com']['breaker'] == 'closed'
+
+
+def test_proceso_hijo_descarta_pools_y_locks_heredados():
+    client = HTTPClient()
+    heredado = client.adapter_for(URL)
+    # Simula el fork: otro pid y un lock tomado por un hilo del padre
+    client._pid = -1
+    client._lock.acquire()
+
+    assert client.adapter_for(URL) is not heredado
+    assert client.stats()['proveedor.example.com']['requests'] == 0
@@ -0,0 +1,98 @@
+"""
+Ejecutor de migraciones en línea (sobre SQLite)
+"""
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.exc import OperationalError
+
+from app.utils.online_migration import MigrationError, OnlineMigrator
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'migracion.db'}")
+    with engine.begin() as connection:
+        connection.execute(text('CREATE TABLE personas (ci VARCHAR(20) PRIMARY KEY, password_hash VARCHAR(255), provider VARCHAR(50))'))
+        for i in range(25):
+            connection.execute(text('INSERT INTO personas (ci, password_hash) VALUES (:ci, :hash)'),
+                               {'ci': f'{i:03d}', 'hash': None if i % 5 == 0 else 'x'})
+    yield engine
+    engine.dispose()
+
+
+def _providers(engine):
+    with engine.connect() as connection:
+        return dict(connection.execute(text('SELECT ci, provider FROM personas ORDER BY ci')).all())
+
+
+class _Interrupcion(Exception):
+    pass
+
+
+def test_backfill_por_lotes_se_reanuda_tras_interrupcion(engine):
+    argumentos = dict(table='personas', key='ci', set_sql="provider = 'local'",
+                      where='password_hash IS NOT NULL', batch_size=10, sleep=0)
+
+    def cortar_tras_el_primer_lote(mensaje):
+        if mensaje.startswith('  prueba:'):
+            raise _Interrupcion()
+
+    with pytest.raises(_Interrupcion):
+        OnlineMigrator(engine, log=cortar_tras_el_primer_lote).backfill('prueba', **argumentos)
+
+    # El primer lote (10 filas con contraseña) quedó confirmado junto con su punto de control
+    con_password = [f'{i:03d}' for i in range(25) if i % 5]
+    providers = _providers(engine)
+    assert [ci for ci, provider in providers.items() if provider] == con_password[:10]
+
+    actualizadas = OnlineMigrator(engine, log=lambda mensaje: None).backfill('prueba', **argumentos)
+
+    providers = _providers(engine)
+    assert actualizadas == 10
+    assert all((provider == 'local') == (int(ci) % 5 != 0) for ci, provider in providers.items())
+    # Ya completado: no vuelve a recorrer la tabla
+    assert OnlineMigrator(engine, log=lambda mensaje: None).backfill('prueba', **argumentos) == 0
+
+
+class _LockNoDisponible(Exception):
+    sqlstate = '55P03'
+
+
+class _EngineConLock:
+    """Engine cuyas primeras transacciones fallan como un lock_timeout de PostgreSQL"""
+
+    def __init__(self, engine, fallos):
+        self._engine = engine
+        self.fallos = fallos
+        self.dialect = engine.dialect
+
+    def begin(self):
+        if self.fallos:
+            self.fallos -= 1
+            raise OperationalError('ALTER TABLE', {}, _LockNoDisponible())
+        return self._engine.begin()
+
+
+def test_ddl_se_reintenta_ante_lock_timeout(engine):
+    migrator = OnlineMigrator(_EngineConLock(engine, fallos=2), retry_wait=0, log=lambda mensaje: None)
+
+    migrator.run_ddl('ALTER TABLE personas ADD COLUMN avatar_url VARCHAR(500)')
+
+    assert 'avatar_url' in {column['name'] for column in inspect(engine).get_columns('personas')}
+
+
+def test_ddl_aborta_al_agotar_los_intentos(engine):
+    migrator = OnlineMigrator(_EngineConLock(engine, fallos=5), max_attempts=3, retry_wait=0, log=lambda mensaje: None)
+
+    with pytest.raises(MigrationError):
+        migrator.run_ddl('ALTER TABLE personas ADD COLUMN avatar_url VARCHAR(500)')
+
+
+def test_create_index_es_idempotente(engine):
+    migrator = OnlineMigrator(engine, log=lambda mensaje: None)
+
+    migrator.create_index('ix_personas_provider', 'personas', 'provider')
+    migrator.create_index('ix_personas_provider', 'personas', 'provider')
+
+    assert 'ix_personas_provider' in {index['name'] for index in inspect(engine).get_indexes('personas')}
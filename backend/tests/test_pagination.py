@@ -0,0 +1,72 @@
+"""
+Cursores de paginación (encode_cursor / decode_cursor)
+"""
+
+from datetime import date, datetime
+
+import pytest
+
+from app.app import create_app
+from app.core.database import db
+from app.models import PersonaBase
+from app.utils import InvalidCursorError, decode_cursor, encode_cursor
+
+
+def test_cursor_conserva_tipos():
+    creado = datetime(2024, 3, 1, 12, 30, 15)
+    cursor = encode_cursor({'ci': '100', 'fecha_creacion': creado})
+
+    assert decode_cursor(cursor, {'ci': str, 'fecha_creacion': datetime}) == {'ci': '100', 'fecha_creacion': creado}
+
+
+@pytest.mark.parametrize('values', [
+    {'ci': 100, 'fecha_creacion': '2024-03-01T12:30:15'},
+    {'ci': ['100'], 'fecha_creacion': '2024-03-01T12:30:15'},
+    {'ci': '100', 'fecha_creacion': 'ayer'},
+    {'ci': '100', 'fecha_creacion': 1709296215},
+])
+def test_cursor_con_tipos_incorrectos_se_rechaza(values):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(encode_cursor(values), {'ci': str, 'fecha_creacion': datetime})
+
+
+@pytest.fixture
+def client():
+    app = create_app('testing')
+    with app.app_context():
+        for i in range(3):
+            db.session.add(PersonaBase(ci=f'10{i}', nombres='Ana', apellido_paterno='Rojas',
+                                       fecha_nacimiento=date(1990, 1, 1), correo=f'10{i}@edificio.com'))
+        db.session.commit()
+        yield app.test_client()
+        db.session.remove()
+        db.drop_all()
+
+
+def test_listado_responde_400_con_cursor_manipulado(client):
+    response = client.get(f"/api/personas/?cursor={encode_cursor({'ci': {'$gt': ''}})}")
+
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('per_page', ['0', '-5'])
+def test_cursor_con_per_page_fuera_de_rango_usa_minimo(client, per_page):
+    response = client.get(f'/api/personas/?cursor=&per_page={per_page}')
+
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert [persona['ci'] for persona in data['personas']] == ['100']
+    assert data['per_page'] == 1
+    assert data['has_next'] is True
+
+
+@pytest.mark.parametrize('count', ['exact', 'estimated', 'none'])
+@pytest.mark.parametrize('per_page,page', [('0', '1'), ('-5', '1'), ('2', '0')])
+def test_metadatos_reportan_la_paginacion_efectiva(client, count, per_page, page):
+    response = client.get(f'/api/personas/?per_page={per_page}&page={page}&count={count}')
+
+    assert response.status_code == 200
+    data = response.get_json()['data']
+    assert data['page'] == 1
+    assert data['per_page'] == len(data['personas'])
+    assert data['has_next'] is True
@@ -0,0 +1,30 @@
+"""
+Token buckets del limitador de tasa
+"""
+
+from app.utils.rate_limit import TokenBucketLimiter
+
+
+def test_claves_unicas_no_superan_el_limite_por_shard():
+    limiter = TokenBucketLimiter(shards=2, max_keys_per_shard=10)
+
+    # Un correo distinto por intento: los buckets nunca llegan a rellenarse
+    for i in range(1000):
+        limiter.consume(('auth.login', 'account', f'atacante{i}@x.com'), 5, 5 / 60)
+
+    assert limiter.size() <= 20
+    assert limiter.evictions >= 980
+
+
+def test_se_descarta_la_clave_usada_hace_mas_tiempo():
+    limiter = TokenBucketLimiter(shards=1, max_keys_per_shard=2)
+    limiter.consume('a', 1, 0.001)
+    limiter.consume('b', 1, 0.001)
+    # 'a' se vuelve a usar: la más antigua pasa a ser 'b'
+    assert limiter.consume('a', 1, 0.001)[0] is False
+
+    limiter.consume('c', 1, 0.001)
+
+    # 'a' conserva su bucket vacío; 'b' se descartó y vuelve lleno
+    assert limiter.consume('a', 1, 0.001)[0] is False
+    assert limiter.consume('b', 1, 0.001)[0] is True
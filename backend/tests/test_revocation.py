@@ -0,0 +1,92 @@
+"""
+Revocación de tokens JWT (logout)
+"""
+
+import time
+from datetime import date, datetime, timedelta
+
+import pytest
+from flask_jwt_extended import create_access_token, decode_token
+from sqlalchemy import event, select
+
+from app.app import create_app
+from app.core.database import db
+from app.models import TokenRevocado, User
+from app.utils.revocation import get_revocation_store
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        db.session.add(User(ci='300', nombres='Ana', apellido_paterno='Rojas', fecha_nacimiento=date(1990, 1, 1),
+                            sexo='F', correo='ana@edificio.com', rol='user', activo=True))
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+def _auth(token):
+    return {'Authorization': f'Bearer {token}'}
+
+
+def test_token_revocado_se_rechaza(app):
+    client = app.test_client()
+    token = create_access_token(identity='300')
+    assert client.get('/api/auth/me', headers=_auth(token)).status_code == 200
+
+    assert client.post('/api/auth/logout', headers=_auth(token)).status_code == 200
+
+    assert client.get('/api/auth/me', headers=_auth(token)).status_code == 401
+    # También tras sincronizar con la tabla
+    get_revocation_store().sync()
+    assert client.get('/api/auth/me', headers=_auth(token)).status_code == 401
+
+
+def test_revocacion_de_otro_proceso_llega_con_la_sincronizacion(app):
+    token = create_access_token(identity='300')
+    claims = decode_token(token)
+    store = get_revocation_store()
+    store.sync()
+
+    # Otro worker escribe la fila directamente
+    db.session.add(TokenRevocado(jti=claims['jti'], expira=datetime.utcnow() + timedelta(hours=1)))
+    db.session.commit()
+    store.sync()
+
+    assert store.is_revoked(claims['jti'])
+
+
+def test_revocacion_local_durante_la_sincronizacion_no_se_pierde(app):
+    store = get_revocation_store()
+    store.sync()
+
+    def revocar_en_medio(conn, cursor, statement, parameters, context, executemany):
+        if 'FROM tokens_revocados' in statement:
+            store._remember('jti-concurrente', datetime.utcnow() + timedelta(hours=1))
+
+    event.listen(db.engine, 'before_cursor_execute', revocar_en_medio)
+    try:
+        store.sync()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', revocar_en_medio)
+
+    assert store.is_revoked('jti-concurrente')
+
+
+def test_expirados_se_olvidan_y_se_limpian(app):
+    store = get_revocation_store()
+    store.sync()
+    store.revoke('jti-expirado', time.time() - 60)
+    assert store.stats()['revoked_in_memory'] == 1
+
+    # La sincronización olvida en memoria los ya expirados
+    store.sync()
+    assert store.stats()['revoked_in_memory'] == 0
+    assert not store.is_revoked('jti-expirado')
+
+    # La próxima revocación borra sus filas de la tabla
+    store.revoke('jti-vigente', time.time() + 3600)
+    jtis = db.session.execute(select(TokenRevocado.jti)).scalars().all()
+    assert jtis == ['jti-vigente']
@@ -0,0 +1,36 @@
+"""
+Tipos de los valores que entrega to_dict()
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+
+from app.models import Departamento, PersonaBase, Residente
+
+
+def test_departamento_convierte_decimal_y_fechas():
+    creado = datetime(2024, 3, 1, 12, 30)
+    departamento = Departamento(id=1, numero='4B', piso=4, tipo='simple', metros_cuadrados=Decimal('85.50'),
+                                estado='ocupado', fecha_creacion=creado, fecha_actualizacion=None)
+
+    assert departamento.to_dict() == {
+        'id': 1, 'numero': '4B', 'piso': 4, 'tipo': 'simple', 'metros_cuadrados': 85.5, 'estado': 'ocupado',
+        'fecha_creacion': '2024-03-01T12:30:00', 'fecha_actualizacion': None
+    }
+
+
+def test_residente_entrega_fechas_iso():
+    residente = Residente(id=7, persona_ci='100', departamento_id=1, fecha_inicio=date(2024, 1, 15), fecha_fin=None,
+                          es_propietario=True, activo=True, fecha_creacion=datetime(2024, 1, 15, 9, 0))
+
+    data = residente.to_dict()
+
+    assert data['fecha_inicio'] == '2024-01-15'
+    assert data['fecha_fin'] is None
+    assert data['fecha_creacion'] == '2024-01-15T09:00:00'
+
+
+def test_subconjunto_de_campos_conserva_conversores():
+    persona = PersonaBase(ci='100', nombres='Ana', apellido_paterno='Rojas', fecha_nacimiento=date(1990, 5, 15))
+
+    assert persona.to_dict(('ci', 'fecha_nacimiento')) == {'ci': '100', 'fecha_nacimiento': '1990-05-15'}
@@ -1,95 +1,91 @@
 #!/usr/bin/env python3
 """
 Script para actualizar la base de datos con campos OAuth
+
+Aplica los cambios en línea, sin bloquear la tabla personas mientras recibe
+tráfico:
+
+  1. Agrega provider, provider_id y avatar_url (nullable, sin default: solo
+     cambia el catálogo)
+  2. Permite NULL en password_hash para usuarios OAuth
+
+Cada DDL usa lock_timeout y se reintenta si no obtiene el lock. El script es
+idempotente y funciona sobre PostgreSQL o SQLite:
+
+    python update_oauth_db.py
+    python update_oauth_db.py --database-url sqlite:///local.db --lock-timeout 5s
 """
 
+import argparse
 import os
 import sys
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from dotenv import load_dotenv
 load_dotenv()
 
-import psycopg2
-from psycopg2.extras import RealDictCursor
+from sqlalchemy import create_engine, inspect
+
+from app.core.config import Config
+from app.utils.online_migration import OnlineMigrator
+
+
+OAUTH_COLUMNS = [
+    ('provider', 'VARCHAR(50)'),
+    ('provider_id', 'VARCHAR(255)'),
+    ('avatar_url', 'VARCHAR(500)')
+]
+
+
+def database_url(url=None):
+    """URL de conexión (psycopg2 explícito para PostgreSQL, como requirements.txt)"""
+    url = url or Config.SQLALCHEMY_DATABASE_URI
+    if url.startswith('postgresql://'):
+        url = 'postgresql+psycopg2://' + url[len('postgresql://'):]
+    return url
 
-def update_database():
+
+def update_database(migrator):
     """Actualizar base de datos con campos OAuth"""
-    
-    # Configuración de conexión
-    DB_CONFIG = {
-        'host': os.getenv('DB_HOST', '127.0.0.1'),
-        'port': os.getenv('DB_PORT', '5432'),
-        'database': os.getenv('DB_NAME', 'Edificio'),
-        'user': os.getenv('DB_USER', 'postgres'),
-        'password': os.getenv('DB_PASSWORD', 'admin')
-    }
-    
+    print("Verificando estructura de tabla personas...")
+    for col_name, col_type in OAUTH_COLUMNS:
+        migrator.add_column('personas', col_name, col_type)
+
+    # Hacer nullable el password_hash para usuarios OAuth
+    migrator.drop_not_null('personas', 'password_hash')
+
+
+def print_structure(engine):
+    """Mostrar estructura actualizada"""
+    print("\nEstructura actual de tabla 'personas':")
+    for column in inspect(engine).get_columns('personas'):
+        nullable = "NULL" if column['nullable'] else "NOT NULL"
+        print(f"  - {column['name']}: {column['type']} ({nullable})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url', help='URL de la base (por defecto DATABASE_URL o DB_*)')
+    parser.add_argument('--lock-timeout', default='2s', help='Espera máxima por un lock en cada DDL')
+    parser.add_argument('--max-attempts', type=int, default=10, help='Intentos por DDL antes de abortar')
+    args = parser.parse_args()
+
+    engine = create_engine(database_url(args.database_url))
+    print(f"Conectando a {engine.url.render_as_string(hide_password=True)}...")
+    migrator = OnlineMigrator(engine, lock_timeout=args.lock_timeout, max_attempts=args.max_attempts)
+
     try:
-        print("Conectando a PostgreSQL...")
-        conn = psycopg2.connect(**DB_CONFIG)
-        cursor = conn.cursor(cursor_factory=RealDictCursor)
-        
-        print("Verificando estructura de tabla personas...")
-        
-        # Verificar si las columnas OAuth ya existen
-        cursor.execute("""
-            SELECT column_name 
-            FROM information_schema.columns 
-            WHERE table_name = 'personas' 
-            AND column_name IN ('provider', 'provider_id', 'avatar_url')
-        """)
-        
-        existing_columns = [row['column_name'] for row in cursor.fetchall()]
-        
-        # Agregar columnas OAuth si no existen
-        oauth_columns = [
-            ('provider', 'VARCHAR(50)'),
-            ('provider_id', 'VARCHAR(255)'),
-            ('avatar_url', 'VARCHAR(500)')
-        ]
-        
-        for col_name, col_type in oauth_columns:
-            if col_name not in existing_columns:
-                print(f"Agregando columna {col_name}...")
-                cursor.execute(f"""
-                    ALTER TABLE personas 
-                    ADD COLUMN {col_name} {col_type}
-                """)
-        
-        # Hacer nullable el password_hash para usuarios OAuth
-        print("Actualizando password_hash para OAuth...")
-        cursor.execute("""
-            ALTER TABLE personas 
-            ALTER COLUMN password_hash DROP NOT NULL
-        """)
-        
-        # Confirmar cambios
-        conn.commit()
+        update_database(migrator)
         print("Base de datos actualizada exitosamente!")
-        
-        # Mostrar estructura actualizada
-        cursor.execute("""
-            SELECT column_name, data_type, is_nullable
-            FROM information_schema.columns 
-            WHERE table_name = 'personas'
-            ORDER BY ordinal_position
-        """)
-        
-        print("\nEstructura actual de tabla 'personas':")
-        for row in cursor.fetchall():
-            nullable = "NULL" if row['is_nullable'] == 'YES' else "NOT NULL"
-            print(f"  - {row['column_name']}: {row['data_type']} ({nullable})")
-        
+        print_structure(engine)
     except Exception as e:
+        # Cada paso confirmó su propia transacción: volver a ejecutar continúa desde aquí
         print(f"Error: {e}")
-        if 'conn' in locals():
-            conn.rollback()
+        sys.exit(1)
     finally:
-        if 'cursor' in locals():
-            cursor.close()
-        if 'conn' in locals():
-            conn.close()
+        engine.dispose()
+
 
 if __name__ == '__main__':
-    update_database()
\ No newline at end of file
+    main()
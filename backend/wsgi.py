@@ -0,0 +1,19 @@
+"""
+Punto de entrada WSGI para producción
+
+    gunicorn wsgi:app
+
+Toma la configuración de gunicorn.conf.py (en este mismo directorio). A
+diferencia de main.py, que levanta el servidor de desarrollo de Werkzeug,
+aquí la configuración por defecto es 'production'.
+"""
+
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.app import create_app  # noqa: E402 (las variables de .env deben cargarse antes)
+
+app = create_app(os.environ.get('FLASK_ENV', 'production'))